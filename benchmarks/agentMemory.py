@@ -0,0 +1,109 @@
+'''Bytes per dwelling held by the household and resident agents of a built EnergyModel.
+
+Compares the model's table-backed agents (CompactHouseholdAgent / CompactPersonAgent plus the
+household and person tables they read from) with the same population built as plain HouseholdAgent /
+PersonAgent objects, every attribute in a per-instance __dict__.
+
+Counts each agent object and everything reachable only through it: attribute storage, lists, floats,
+strings and geometries. Objects shared by many agents are counted once. The model itself and other
+agents they reference are not counted.
+
+Run from the repository root:  python -m benchmarks.agentMemory [n_households]'''
+
+import sys
+import tempfile
+
+import numpy as np
+
+from benchmarks.parallelStepping import syntheticCity
+from digitalTwin.modelling.agent import HouseholdAgent, PersonAgent
+from digitalTwin.modelling.model import EnergyModel
+
+# HouseholdAgent keyword arguments read straight from the gdf column of the same name
+KWARGS = ["floor_area_m2", "main_fuel_type", "main_heating_system", "retrofit_envelope_score", "imd_decile",
+          "is_heatpump_candidate", "heatpump_candidate_class", "schedule_type", "hh_n_people", "hh_children",
+          "tenure", "size_band"]
+
+
+def deepSize(roots, seen):
+    '''Bytes of `roots` and the objects reachable from them that are not in `seen` (ids), which it extends.'''
+    total = 0
+    stack = list(roots)
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen:
+            continue
+        seen.add(id(obj))
+        if isinstance(obj, np.ndarray):
+            total += sys.getsizeof(obj) if obj.base is None else sys.getsizeof(obj) - obj.nbytes
+            if obj.dtype == object:
+                stack.extend(obj.ravel().tolist())
+            continue
+        total += sys.getsizeof(obj)
+        if isinstance(obj, dict):
+            stack.extend(obj.keys())
+            stack.extend(obj.values())
+        elif isinstance(obj, (list, tuple, set, frozenset)):
+            stack.extend(obj)
+        else:
+            if hasattr(obj, '__dict__'):
+                stack.append(obj.__dict__)
+            for cls in type(obj).__mro__:
+                for slot in getattr(cls, '__slots__', ()):
+                    if hasattr(obj, slot):
+                        stack.append(getattr(obj, slot))
+    return total
+
+
+def referenceAgents(model, gdf):
+    '''The model's population rebuilt as plain HouseholdAgent / PersonAgent objects.'''
+    houses, people = [], []
+    for (_, row), compact in zip(gdf.iterrows(), model.household_agents):
+        house = HouseholdAgent(unique_id=str(row['UPRN']), model=model, geometry=compact.geometry,
+                               property_type=row['property_type'], sap_rating=row['sap_rating'],
+                               crs=gdf.crs, **{k: row.get(k) for k in KWARGS})
+        house.clim_idx = compact.clim_idx
+        for p in compact.residents:
+            person = PersonAgent(unique_id=p.unique_id, model=model, home=house,
+                                 schedule_profile=p.schedule_profile, leave_hour=p.leave_hour,
+                                 return_hour=p.return_hour, wealth=p.wealth, sap=p.sap)
+            house.residents.append(person)
+            people.append(person)
+        houses.append(house)
+    return houses, people
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+
+    with tempfile.TemporaryDirectory() as tmp:
+        gdf, climate = syntheticCity(n, tmp)
+        model = EnergyModel(gdf=gdf, climate_parquet=climate, climate_start="2020-01-01",
+                            engine="array", collect_agent_level=False, seed=0)
+    houses, people = referenceAgents(model, gdf)
+    for h in houses + model.household_agents:
+        h.reset_energy()
+
+    # the model (and what hangs off it) is shared by every agent; both sets share the geometries
+    shared = [model, *vars(model).values(), *(h.geometry for h in houses)]
+    tables = [model.household_table, model.person_table, model.person_presence_by_hour]
+    sizes = {}
+    for kind, groups in [('reference', [[], houses, people]),
+                         ('compact', [tables, model.household_agents, model.person_agents])]:
+        # tables first, then agents: homes and residents point at each other, so each group
+        # is counted with the groups after it marked seen
+        seen = {id(obj) for obj in shared if not any(obj is t for t in tables)}
+        seen.update(id(a) for a in groups[1] + groups[2])
+        sizes[kind] = []
+        for group in groups:
+            seen.difference_update(id(obj) for obj in group)
+            sizes[kind].append(deepSize(group, seen))
+    reference, compact = sum(sizes['reference']), sum(sizes['compact'])
+    rows = sizes['reference'] + sizes['compact']
+
+    print(f"{n:,} households, {len(model.person_agents):,} residents (geometries not counted)")
+    print(f"                      reference   compact   (bytes per dwelling)")
+    print(f"attribute tables:    {rows[0] / n:9.0f} {rows[3] / n:9.0f}")
+    print(f"household agents:    {rows[1] / n:9.0f} {rows[4] / n:9.0f}")
+    print(f"resident agents:     {rows[2] / n:9.0f} {rows[5] / n:9.0f}")
+    print(f"total:               {reference / n:9.0f} {compact / n:9.0f}   ({reference / compact:.1f}x)")
@@ -0,0 +1,84 @@
+'''Cost of the agent loop's cap-and-aggregate stage: the old per-household loops against the masked one.
+
+Builds one synthetic city (agent loop), steps it once and sets the cap so that about 5% of dwellings
+are clipped. Then it times the end of the tick on that tick's totals: the per-household cap and
+aggregation loops the model used to run, and EnergyModel._cap_and_aggregate with cap diagnostics
+off and on. Last, a day of array-engine steps is timed with diagnostics off and on.
+
+Run from the repository root:  python -m benchmarks.capStage [n_households]'''
+
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from benchmarks.parallelStepping import syntheticCity
+from digitalTwin.modelling.agent import PROPERTY_TYPES
+from digitalTwin.modelling.model import EnergyModel
+
+REPEATS = 20
+STEPS = 24
+
+
+def loopStage(model, max_total):
+    '''The per-household cap (with its proportional attribution) and aggregation loops EnergyModel used to run.'''
+    for h in model.household_agents:
+        h.cap_clip_total = h.cap_clip_base = h.cap_clip_heat = h.cap_clip_spike = 0.0  # was in reset_energy
+        if h.energy_consumption > max_total:
+            pre = h.energy_consumption
+            clip = pre - max_total
+            denom = h.base_kwh + h.heat_kwh + h.spike_kwh
+            h.cap_clip_total = clip
+            h.cap_clip_base = clip * (h.base_kwh / denom) if denom > 0 else 0.0
+            h.cap_clip_heat = clip * (h.heat_kwh / denom) if denom > 0 else 0.0
+            h.cap_clip_spike = clip * (h.spike_kwh / denom) if denom > 0 else 0.0
+            h.energy_consumption = max_total
+    model.energy_by_type = {t: 0.0 for t in PROPERTY_TYPES}
+    for h in model.household_agents:
+        if h.property_type in model.energy_by_type:
+            model.energy_by_type[h.property_type] += h.energy_consumption
+    return sum(h.energy_consumption for h in model.household_agents)
+
+
+def timed(model, stage, totals):
+    '''Mean seconds of `stage()` over REPEATS runs, each on the same uncapped totals.'''
+    elapsed = 0.0
+    for _ in range(REPEATS):
+        for h, total in zip(model.household_agents, totals):
+            h.energy_consumption = total
+        start = time.perf_counter()
+        stage()
+        elapsed += time.perf_counter() - start
+    return elapsed / REPEATS
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+
+    with tempfile.TemporaryDirectory() as tmp:
+        gdf, climate = syntheticCity(n, tmp)
+        kwargs = dict(climate_parquet=climate, climate_start="2020-01-01", collect_agent_level=False,
+                      headless=True, seed=0)
+        model = EnergyModel(gdf=gdf, engine="agents", **kwargs)
+        model.max_total_kwh_per_hour = None
+        model.step()
+        totals = [h.energy_consumption for h in model.household_agents]
+        model.max_total_kwh_per_hour = float(np.percentile(totals, 95))
+
+        print(f"{n:,} households, {np.mean(np.array(totals) > model.max_total_kwh_per_hour):.0%} clipped")
+        stage = lambda: loopStage(model, model.max_total_kwh_per_hour)
+        print(f"per-household loops:       {timed(model, stage, totals) * 1e3:8.2f} ms")
+        for diagnostics in (False, True):
+            model.cap_diagnostics = diagnostics
+            label = f"masked, diagnostics {'on' if diagnostics else 'off'}:"
+            print(f"{label:26s} {timed(model, lambda: model._cap_and_aggregate(0), totals) * 1e3:8.2f} ms")
+
+        for diagnostics in (False, True):
+            model = EnergyModel(gdf=gdf, engine="array", cap_diagnostics=diagnostics, **kwargs)
+            model.max_total_kwh_per_hour = float(np.percentile(totals, 95))
+            start = time.perf_counter()
+            for _ in range(STEPS):
+                model.step()
+            label = f"array step, diagnostics {'on' if diagnostics else 'off'}:"
+            print(f"{label:32s} {(time.perf_counter() - start) / STEPS * 1e3:8.2f} ms")
@@ -0,0 +1,51 @@
+'''Time and memory to build an EnergyModel (households, residents, climate mapping) for a synthetic city.
+
+Households are built column-wise (modelling/households.py); the household table's own share of the
+build is printed separately. Each build runs interactive (a GeoSpace and a shapely point per agent)
+and headless (coordinates only), in a fresh process each so one does not pay for the other's garbage,
+on building footprints (small squares) as real populations have.
+
+Run from the repository root:  python -m benchmarks.modelBuild [n_households]'''
+
+import multiprocessing as mp
+import resource
+import sys
+import tempfile
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+
+from benchmarks.parallelStepping import syntheticCity
+from digitalTwin.modelling.households import household_table
+from digitalTwin.modelling.model import EnergyModel
+
+
+def timedBuild(n, headless):
+    '''Seconds to build the model and the peak memory (bytes) the build added, in this process.'''
+    with tempfile.TemporaryDirectory() as tmp:
+        gdf, climate = syntheticCity(n, tmp)
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')  # buffering in degrees is fine for a benchmark
+            gdf = gdf.set_geometry(gdf.geometry.buffer(0.0001, cap_style=3))
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        start = time.perf_counter()
+        model = EnergyModel(gdf=gdf, climate_parquet=climate, climate_start="2020-01-01", engine="array",
+                            collect_agent_level=False, seed=0, headless=headless)
+        built = time.perf_counter() - start
+        added = (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - peak) * 1024  # kB on Linux
+
+        start = time.perf_counter()
+        household_table(gdf, model)
+        return built, added, time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+
+    print(f"{n:,} households")
+    for headless in (False, True):
+        with ProcessPoolExecutor(max_workers=1, mp_context=mp.get_context("spawn")) as pool:
+            built, added, table = pool.submit(timedBuild, n, headless).result()
+        label = "headless" if headless else "interactive"
+        print(f"{label:12s} build: {built:8.2f} s  {added / n:8.0f} bytes per dwelling (peak)")
+    print(f"household table:    {table:8.2f} s")
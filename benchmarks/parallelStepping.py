@@ -0,0 +1,75 @@
+'''Array-engine steps per second against the number of household partitions (engine_workers).
+
+Builds one synthetic city, then re-creates its ArrayEngine for each worker count and times a day of
+steps. Scaling is bounded by the number of physical cores.
+
+Run from the repository root:  python -m benchmarks.parallelStepping [n_households] [max_workers]'''
+
+import os
+import sys
+import tempfile
+import time
+
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+
+from digitalTwin.modelling.arrayEngine import ArrayEngine
+from digitalTwin.modelling.model import EnergyModel
+
+STEPS = 24
+
+
+def syntheticCity(n, tmp, seed=0):
+    rng = np.random.default_rng(seed)
+    lat = 54.95 + rng.random(n) * 0.1
+    lon = -1.7 + rng.random(n) * 0.2
+    df = pd.DataFrame({
+        "UPRN": np.arange(n),
+        "ward_code": rng.choice([f"E0500{i:04d}" for i in range(40)], n),
+        "property_type": rng.choice(["mid-terraced house", "semi-detached house", "detached house", "block of flats"], n),
+        "sap_rating": rng.integers(30, 95, n),
+        "energy_cal_kwh": rng.uniform(5000, 20000, n),
+        "floor_area_m2": rng.uniform(30, 200, n),
+        "hh_n_people": rng.integers(1, 6, n),
+    })
+    gdf = gpd.GeoDataFrame(df, geometry=gpd.points_from_xy(lon, lat), crs="EPSG:4326")
+
+    times = pd.date_range("2020-01-01", periods=STEPS * 2, freq="h", tz="UTC")
+    glat, glon = np.meshgrid(np.linspace(54.9, 55.1, 20), np.linspace(-1.8, -1.4, 20))
+    points = np.c_[glat.ravel(), glon.ravel()]
+    temps = 5 + 8 * np.sin(np.arange(len(times)) / 24 * 2 * np.pi)[:, None] + rng.normal(0, 2, (len(times), len(points)))
+    climate = pd.DataFrame({"timestamp": np.repeat(times, len(points)),
+                            "latitude": np.tile(points[:, 0], len(times)),
+                            "longitude": np.tile(points[:, 1], len(times)),
+                            "temp_C": temps.ravel().astype("float32")})
+    path = os.path.join(tmp, "climate.parquet")
+    climate.to_parquet(path)
+    return gdf, path
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    max_workers = int(sys.argv[2]) if len(sys.argv) > 2 else os.cpu_count()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        gdf, climate = syntheticCity(n, tmp)
+        print(f"Building model with {n:,} households...")
+        model = EnergyModel(gdf=gdf, climate_parquet=climate, climate_start="2020-01-01",
+                            engine="array", collect_agent_level=False)
+
+        print(f'{"workers":>8}{"steps/s":>12}{"speed-up":>10}')
+        serial = None
+        workers = 1
+        while workers <= max_workers:
+            model.engine = ArrayEngine(model, workers=workers)
+            model.current_hour = 0 # same climate window for every run
+            model.step() # warm up the pool
+            start = time.perf_counter()
+            for _ in range(STEPS):
+                model.step()
+            rate = STEPS / (time.perf_counter() - start)
+            serial = serial or rate
+            print(f"{workers:>8}{rate:>12.1f}{rate / serial:>9.2f}x")
+            model.engine.close()
+            workers *= 2
@@ -0,0 +1,49 @@
+'''Parameter sweep on one built population against rebuilding the model for every point.
+
+Builds one synthetic city, then runs a grid of heating_setpoint_C x heatpump_adoption_rate points
+both ways: a fresh EnergyModel per point, and sweep.run_sweep (one build, reconfigure per point).
+
+Run from the repository root:  python -m benchmarks.parameterSweep [n_households] [workers]'''
+
+import os
+import sys
+import tempfile
+import time
+
+import yaml
+
+from benchmarks.parallelStepping import syntheticCity
+from digitalTwin.modelling.model import EnergyModel
+from digitalTwin.modelling.sweep import parameter_grid, run_sweep
+
+STEPS = 24
+POINTS = parameter_grid(heating_setpoint_C=[17.0, 18.5, 20.0], heatpump_adoption_rate=[0.0, 0.5])
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else 1
+
+    with tempfile.TemporaryDirectory() as tmp:
+        gdf, climate = syntheticCity(n, tmp)
+        kwargs = dict(climate_parquet=climate, climate_start="2020-01-01", engine="array", collect_agent_level=False)
+
+        start = time.perf_counter()
+        for i, point in enumerate(POINTS):
+            config_path = os.path.join(tmp, f"point{i}.yaml")
+            with open(config_path, "w") as fh:
+                yaml.safe_dump({"model": point}, fh)
+            model = EnergyModel(gdf=gdf, config_path=config_path, **kwargs)
+            for _ in range(STEPS):
+                model.step()
+        rebuild = time.perf_counter() - start
+
+        start = time.perf_counter()
+        model = EnergyModel(gdf=gdf, **kwargs)
+        built = time.perf_counter() - start
+        run_sweep(model, POINTS, n_steps=STEPS, workers=workers)
+        swept = time.perf_counter() - start
+
+        print(f"{len(POINTS)} points x {STEPS} steps, {n:,} households")
+        print(f"rebuild per point: {rebuild:8.2f} s")
+        print(f"sweep:             {swept:8.2f} s  (build {built:.2f} s, {workers} worker(s))")
@@ -0,0 +1,88 @@
+'''Timeline and energy-range queries against agent_time_series, before and after migrateDB.
+
+Builds a throwaway SQLite database with the old schema (scenario_id index only, INTEGER energy
+columns), times the queries behind the timeline and range endpoints, migrates it and times them again.
+
+Run from the repository root:  python -m benchmarks.resultQueries [n_agents] [n_days]'''
+
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+import migrateDB
+
+N_SCENARIOS = 4
+REPEATS = 5
+
+OLD_SCHEMA = '''
+CREATE TABLE scenario (id INTEGER PRIMARY KEY);
+CREATE TABLE agent_time_series (
+    id INTEGER PRIMARY KEY, scenario_id INTEGER REFERENCES scenario(id) ON DELETE CASCADE,
+    energy INTEGER, energy_consumption INTEGER, step INTEGER, "Agent_id" INTEGER);
+CREATE INDEX ix_agent_time_series_scenario_id ON agent_time_series (scenario_id);
+CREATE TABLE energy_time_series (
+    id INTEGER PRIMARY KEY, scenario_id INTEGER REFERENCES scenario(id) ON DELETE CASCADE,
+    step INTEGER, hour INTEGER, day INTEGER, total_energy INTEGER, average_energy INTEGER);
+CREATE INDEX ix_energy_time_series_scenario_id ON energy_time_series (scenario_id);
+'''
+
+# as issued by dataManager.getEnergyDaily / getEnergyRange before and after the change
+TIMELINE = 'SELECT energy_consumption, step, "Agent_id" FROM agent_time_series WHERE scenario_id = ? AND step IN ({})'
+RANGE_BEFORE = ['SELECT energy_consumption FROM agent_time_series WHERE scenario_id = ? ORDER BY energy_consumption ASC NULLS LAST LIMIT 1',
+                'SELECT energy_consumption FROM agent_time_series WHERE scenario_id = ? ORDER BY energy_consumption DESC NULLS LAST LIMIT 1']
+RANGE_AFTER = ['SELECT min(energy_consumption) FROM agent_time_series WHERE scenario_id = ?',
+               'SELECT max(energy_consumption) FROM agent_time_series WHERE scenario_id = ?']
+
+
+def populate(conn, n_agents, n_steps):
+    rng = np.random.default_rng(0)
+    conn.executescript(OLD_SCHEMA)
+    for scenario_id in range(1, N_SCENARIOS + 1):
+        conn.execute('INSERT INTO scenario (id) VALUES (?)', (scenario_id,))
+        steps = np.repeat(np.arange(n_steps), n_agents).tolist()
+        agents = np.tile(np.arange(n_agents), n_steps).tolist()
+        energy = rng.gamma(2.0, 0.5, n_agents * n_steps).tolist()
+        conn.executemany('INSERT INTO agent_time_series (scenario_id, energy, energy_consumption, step, "Agent_id") VALUES (?, 0, ?, ?, ?)',
+                         zip([scenario_id] * len(steps), energy, steps, agents))
+    conn.commit()
+
+
+def timeQuery(conn, queries, params):
+    best = float('inf')
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        for sql in queries:
+            conn.execute(sql, params).fetchall()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run(conn, range_queries):
+    scenario_id = N_SCENARIOS // 2 + 1
+    day_steps = list(range(24, 48))
+    timeline = [TIMELINE.format(', '.join('?' * len(day_steps)))]
+    return {'timeline (1 day)': timeQuery(conn, timeline, [scenario_id] + day_steps),
+            'range (min/max)': timeQuery(conn, range_queries, (scenario_id,))}
+
+
+if __name__ == "__main__":
+    n_agents = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    n_days = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    n_steps = n_days * 24
+
+    with tempfile.TemporaryDirectory() as tmp:
+        with sqlite3.connect(os.path.join(tmp, 'bench.db')) as conn:
+            print(f'Populating {N_SCENARIOS} scenarios x {n_agents} agents x {n_steps} steps...')
+            populate(conn, n_agents, n_steps)
+
+            before = run(conn, RANGE_BEFORE)
+            migrateDB.migrate(conn)
+            after = run(conn, RANGE_AFTER)
+
+    print(f'{"query":<20}{"before (ms)":>14}{"after (ms)":>14}{"speed-up":>10}')
+    for name in before:
+        print(f'{name:<20}{before[name] * 1e3:>14.2f}{after[name] * 1e3:>14.2f}{before[name] / after[name]:>9.0f}x')
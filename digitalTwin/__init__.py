@@ -34,6 +34,8 @@ def set_sqlite_pragma(dbapi_connection, connection_record):
 def create_app(test_config = None):
     app = Flask(__name__)
     app.config.from_object(Config)
+    if test_config is not None:
+        app.config.update(test_config)
     db.init_app(app)
     migrate.init_app(app, db)
 
@@ -41,6 +43,15 @@ def create_app(test_config = None):
     from . import digitaltwin
     app.register_blueprint(digitaltwin.bp)
 
+    if app.config['JOB_RUNNER_AUTOSTART']:
+        from .library import jobQueue
+
+        @app.before_request
+        def startJobRunner():
+            # serving processes only: not run-worker processes, CLI commands or tests
+            if not app.testing:
+                jobQueue.startRunner(app)
+
     return app
 
 
@@ -10,6 +10,15 @@ class Config:
 
     INITIAL_DATA_LOC = os.path.join(basedir, "data", "initial_data")
     CLIMATE_DATA = os.path.join(basedir, "data", "ncc_2t_timeseries_2010_2039.parquet")
+    CLIMATE_BBOX_MARGIN = 0.5 # degrees of climate grid kept around a scenario's households
+    CLIMATE_DATASETS = {"ncc_2t_timeseries": CLIMATE_DATA} # ClimateModel.base_data -> parquet
+    RESULTS_BACKEND = os.environ.get('RESULTS_BACKEND') or 'db' # 'db' (agent_time_series table) or 'parquet'
+    RESULTS_DIR = os.environ.get('RESULTS_DIR') or os.path.join(basedir, "data", "results")
+    JOB_WORKERS = int(os.environ.get('JOB_WORKERS') or 2) # scenario runs allowed at once, each in its own process
+    JOB_POLL_SECONDS = 2
+    JOB_LEASE_SECONDS = 60 # a running job whose runner hasn't renewed its lease in this long is re-queued
+    JOB_RUNNER_AUTOSTART = True # start the job runner with the first request a server process handles
+    AGENT_FLUSH_EVERY = 24 # agent-trace collection steps buffered per write while a scenario runs
     WARD_CODES = os.path.join(basedir, "data", "Wards_(May_2025)_Names_and_Codes_in_the_UK.geojson")
 
 """Configuration loader for household_energy.
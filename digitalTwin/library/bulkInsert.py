@@ -0,0 +1,79 @@
+'''Fast, column-oriented inserts for the result tables (agent, model and energy time series).
+
+Avoids building one ORM object per row. Columns (NumPy arrays, lists or scalars to broadcast) are
+zipped straight into parameter tuples and written with a single executemany per chunk: the raw
+DBAPI cursor with SQLite, a Core insert() everywhere else. All chunks share one transaction.'''
+
+import time
+import numpy as np
+import sqlalchemy as sa
+from digitalTwin import db
+
+DEFAULT_CHUNK_SIZE = 50_000
+
+class InsertStats:
+    '''Running row count and wall time, so callers can report rows/s.'''
+    def __init__(self, label):
+        self.label = label
+        self.rows = 0
+        self.seconds = 0.0
+
+    def add(self, rows, seconds):
+        self.rows += rows
+        self.seconds += seconds
+
+    @property
+    def rate(self):
+        return self.rows / self.seconds if self.seconds > 0 else float('inf')
+
+    def __str__(self):
+        return f'{self.label}: {self.rows:,} rows in {self.seconds:.2f}s ({self.rate:,.0f} rows/s)'
+
+
+def _as_lists(columns, n_rows):
+    '''Convert each column to a plain Python list (one C-level .tolist() per column).'''
+    out = {}
+    for name, values in columns.items():
+        if np.isscalar(values) or values is None:
+            out[name] = [values] * n_rows
+        else:
+            out[name] = np.asarray(values).tolist()
+    return out
+
+def _n_rows(columns):
+    for values in columns.values():
+        if not (np.isscalar(values) or values is None):
+            return len(values)
+    return 1
+
+def insertColumns(table, columns, chunk_size=DEFAULT_CHUNK_SIZE, stats=None, commit=True):
+    '''Insert column-wise data into an ORM model's table; returns the number of rows written.
+
+    table:   ORM model class, e.g. models.AgentTimeSeries
+    columns: dict of column name -> array-like (or scalar, broadcast to every row)
+    stats:   optional InsertStats to accumulate throughput across calls'''
+    n_rows = _n_rows(columns)
+    if n_rows == 0:
+        return 0
+
+    start = time.perf_counter()
+    names = list(columns)
+    values = _as_lists(columns, n_rows)
+    rows = list(zip(*(values[name] for name in names)))
+
+    conn = db.session.connection()
+    if conn.dialect.name == 'sqlite':
+        sql = (f'INSERT INTO {table.__tablename__} ({", ".join(names)}) '
+               f'VALUES ({", ".join("?" * len(names))})')
+        for i in range(0, n_rows, chunk_size):
+            conn.exec_driver_sql(sql, rows[i:i + chunk_size])
+    else:
+        stmt = sa.insert(table.__table__)
+        for i in range(0, n_rows, chunk_size):
+            conn.execute(stmt, [dict(zip(names, row)) for row in rows[i:i + chunk_size]])
+    if commit:
+        db.session.commit()
+
+    if stats is not None:
+        stats.add(n_rows, time.perf_counter() - start)
+    return n_rows
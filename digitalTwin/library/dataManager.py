@@ -8,7 +8,7 @@ import sqlalchemy.orm as so
 from digitalTwin.models import models
 import numpy as np
 from typing import List, Optional
-from. import populations, dataConv
+from. import populations, dataConv, resultStore
 
 def getID(table, column, value, amount = 'one'):
     # amount can be 'one' or 'all'
@@ -49,9 +49,13 @@ def findDBData(DBmodel, identifier=''):
             data = pd.read_sql(query, conn)
 
     elif DBmodel == 'AgentTimeSeries':
-        query = sa.Select(models.AgentTimeSeries).where(models.AgentTimeSeries.scenario_id == identifier)
-        with db.engine.connect() as conn:
-            data = pd.read_sql(query, conn)
+        path = agentResultsPath(identifier)
+        if path:
+            data = resultStore.readAgentSeries(path)
+        else:
+            query = sa.Select(models.AgentTimeSeries).where(models.AgentTimeSeries.scenario_id == identifier)
+            with db.engine.connect() as conn:
+                data = pd.read_sql(query, conn)
     
     elif DBmodel == 'ClimateModel':
         query  = sa.select(models.ClimateModel)
@@ -74,6 +78,10 @@ def findDBData(DBmodel, identifier=''):
 
     return data
 
+def agentResultsPath(scenario_id):
+    '''Parquet dataset holding the scenario's agent time series, or None if they are in the DB'''
+    return db.session.scalar(sa.select(models.Scenario.agent_results_path).where(models.Scenario.id == scenario_id))
+
 def loadAndMerge(city: str, popID, epc_columns: Optional[List[str]]=None, hidp_columns: Optional[List[str]]=None, includeGeometry=True):
 
     if includeGeometry ==True: 
@@ -288,8 +296,10 @@ def getTableData(model, page, url_str, active_tab=None, current_tab_id=None,
     # extra logic for scenarios
     if check_results and model == models.Scenario:
         # Check if related data exists (returns True/False)
-        has_agent_ts = db.session.query(models.AgentTimeSeries.id)\
-            .filter(models.AgentTimeSeries.scenario_id == models.Scenario.id).exists()
+        has_agent_ts = sa.or_(
+            models.Scenario.agent_results_path.isnot(None),
+            db.session.query(models.AgentTimeSeries.id)\
+                .filter(models.AgentTimeSeries.scenario_id == models.Scenario.id).exists())
         has_energy_ts = db.session.query(models.EnergyTimeSeries.id)\
             .filter(models.EnergyTimeSeries.scenario_id == models.Scenario.id).exists()
         has_model_ts = db.session.query(models.ModelTimeSeries.id)\
@@ -386,6 +396,8 @@ def findCorrespondingResults(item):
     for table in tables:
         result = bool(db.session.query(table.id).where(table.scenario_id == id).first()) # returns true if at least on, false if not
         results.append(result)
+    if item.agent_results_path:
+        results[0] = True # agent time series stored in Parquet
 
     # see if no results, three results or partial results
     if sum(results ) == 0:
@@ -407,11 +419,17 @@ def getClimateData(page, flag):
     return data, next_url, prev_url
 
 def clearResults(id):
-    tables = [models.AgentTimeSeries, models.EnergyTimeSeries, models.ModelTimeSeries]
+    tables = [models.AgentTimeSeries, models.EnergyTimeSeries, models.ModelTimeSeries, models.ScenarioSummary,
+              models.ScenarioEnsemble]
     for table in tables:
         print('clearing ' + str(table))
         stmt = sa.delete(table).where(table.scenario_id == id)
         db.session.execute(stmt)
+    scenario = db.session.get(models.Scenario, id)
+    if scenario is not None and scenario.agent_results_path:
+        print('clearing ' + scenario.agent_results_path)
+        resultStore.deleteAgentSeries(scenario.agent_results_path)
+        scenario.agent_results_path = None
     db.session.commit()
 
 
@@ -433,6 +451,8 @@ def deleteEntry(table_id, id):
         if entry:
             # Deletes the entry
             # Also deletes the children if entry is a scenario
+            if model == models.Scenario:
+                resultStore.deleteAgentSeries(entry.agent_results_path)
             db.session.delete(entry)
             db.session.commit()
 
@@ -451,31 +471,30 @@ def countMatches(query):
 
 '''return the minimum and maximum energy consumption for the scenario'''
 def getEnergyRange(scenario_id):
-    min = db.first_or_404(
-        sa.select(
-            models.AgentTimeSeries.energy_consumption).order_by(
-                models.AgentTimeSeries.energy_consumption.asc().nullslast()).where(
-                    models.AgentTimeSeries.scenario_id == scenario_id)
-                    )
-
-    max = db.first_or_404(
-        sa.select(
-            models.AgentTimeSeries.energy_consumption).order_by(
-                models.AgentTimeSeries.energy_consumption.desc().nullslast()).where(
-                    models.AgentTimeSeries.scenario_id == scenario_id)
-                    )
+    path = agentResultsPath(scenario_id)
+    if path:
+        return resultStore.energyRange(path)
+
+    # separate min() and max() so each is a single seek on (scenario_id, energy_consumption)
+    column = models.AgentTimeSeries.energy_consumption
+    where = models.AgentTimeSeries.scenario_id == scenario_id
+    min = db.session.scalar(sa.select(sa.func.min(column)).where(where))
+    max = db.session.scalar(sa.select(sa.func.max(column)).where(where))
+    if min is None:
+        abort(404)
 
     range = [min, max]
 
     return range
 
 def getEnergyDaily(scenario, stepsToPoll, target_columns):
-    query = sa.Select(models.AgentTimeSeries)
-    query = query.where(models.AgentTimeSeries.scenario_id == scenario.id)
-    query = query.where(models.AgentTimeSeries.step.in_(stepsToPoll))
+    if scenario.agent_results_path:
+        return resultStore.readAgentSeries(scenario.agent_results_path, target_columns, stepsToPoll)
 
     cols_to_select = [getattr(models.AgentTimeSeries, col) for col in target_columns]
     query = sa.select(*cols_to_select)
+    query = query.where(models.AgentTimeSeries.scenario_id == scenario.id)
+    query = query.where(models.AgentTimeSeries.step.in_(stepsToPoll))
 
     with db.engine.connect() as conn:
         data = pd.read_sql(query, conn)
@@ -483,6 +502,9 @@ def getEnergyDaily(scenario, stepsToPoll, target_columns):
     return data
 
 def getUPRNs(scenario):
+    if scenario.agent_results_path:
+        return resultStore.readAgentSeries(scenario.agent_results_path, ['Agent_id'])['Agent_id'].unique().tolist()
+
     query = (
         sa.select(models.AgentTimeSeries.Agent_id)
         .where(models.AgentTimeSeries.scenario_id == scenario.id)
@@ -0,0 +1,278 @@
+'''Monte Carlo ensembles of a scenario.
+
+A single run is one realisation of the model's random choices (wealth groups, legacy schedule
+profiles, the households policies.applyPolicy samples). runEnsemble runs N replicas of a scenario,
+each with its own seed, on a process pool and folds every replica's model-level series into running
+statistics as soon as it finishes: Welford mean/variance plus P-square quantile estimates, per step
+and per day, for total energy, each property type and each wealth group. Only the running statistics
+and the replicas in flight are held in memory, so the cost is about that of N parallel runs.
+The daily bands are stored as a ScenarioEnsemble row for the report pages.'''
+
+import multiprocessing as mp
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from fractions import Fraction
+
+import numpy as np
+import pandas as pd
+import sqlalchemy as sa
+
+from digitalTwin import db
+from digitalTwin.config import Config
+from digitalTwin.models import models
+from ..modelling import energyABM
+from .scenarios import MODEL_TS_COLUMNS
+
+HOURS_PER_DAY = 24
+QUANTILES = (0.05, 0.5, 0.95)
+# model_time_series column -> reporter, without the running total (not additive over days)
+ENSEMBLE_COLUMNS = {column: name for column, name in MODEL_TS_COLUMNS.items() if column != 'cumulative_energy'}
+
+
+class Welford:
+    '''Running mean and variance of every cell of equally shaped arrays, one array at a time.'''
+
+    def __init__(self, shape):
+        self.count = 0
+        self.mean = np.zeros(shape)
+        self.m2 = np.zeros(shape)
+        self.min = np.full(shape, np.inf)
+        self.max = np.full(shape, -np.inf)
+
+    def update(self, x):
+        x = np.asarray(x, dtype=float)
+        self.count += 1
+        delta = x - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (x - self.mean)
+        np.minimum(self.min, x, out=self.min)
+        np.maximum(self.max, x, out=self.max)
+
+    @property
+    def variance(self):
+        '''Sample variance (n - 1); NaN until there are two observations.'''
+        if self.count < 2:
+            return np.full(self.mean.shape, np.nan)
+        return self.m2 / (self.count - 1)
+
+    @property
+    def std(self):
+        return np.sqrt(self.variance)
+
+
+class QuantileSketch:
+    '''Streaming estimates of a few quantiles for every cell of equally shaped arrays.
+
+    The first `exact` observations are buffered and give exact quantiles. After that each quantile is
+    tracked with the five markers of Jain & Chlamtac's P-square algorithm, seeded from the buffer, so
+    memory stays at 5 x len(quantiles) values per cell however many observations follow.'''
+
+    def __init__(self, shape, quantiles=QUANTILES, exact=32):
+        if exact < 5:
+            raise ValueError("QuantileSketch needs at least 5 exact observations to seed its markers.")
+        self.shape = tuple(shape)
+        self.quantiles = np.asarray(quantiles, dtype=float)
+        self.exact = exact
+        self.count = 0
+        self.buffer = np.empty((exact, int(np.prod(self.shape))))
+        self.heights = None # [5, quantile, cell] once the buffer is full
+        q = self.quantiles
+        # how far each marker's desired rank moves per observation
+        self.increments = np.stack([np.zeros_like(q), q / 2, q, (1 + q) / 2, np.ones_like(q)])[:, :, None]
+
+    def update(self, x):
+        x = np.asarray(x, dtype=float).reshape(-1)
+        if self.count < self.exact:
+            self.buffer[self.count] = x
+            self.count += 1
+            if self.count == self.exact:
+                self._seedMarkers()
+            return
+        self.count += 1
+        h, n = self.heights, self.positions
+        np.minimum(h[0], x, out=h[0])
+        np.maximum(h[4], x, out=h[4])
+        n[1:4] += x < h[1:4] # markers above the cell x falls in move up one place
+        n[4] += 1
+        self.desired += self.increments
+        for i in (1, 2, 3):
+            d = self.desired[i] - n[i]
+            up = (d >= 1) & (n[i + 1] - n[i] > 1)
+            down = (d <= -1) & (n[i - 1] - n[i] < -1)
+            move = up | down
+            if not move.any():
+                continue
+            s = np.where(up, 1.0, -1.0)
+            parabolic = h[i] + s / (n[i + 1] - n[i - 1]) * (
+                (n[i] - n[i - 1] + s) * (h[i + 1] - h[i]) / (n[i + 1] - n[i])
+                + (n[i + 1] - n[i] - s) * (h[i] - h[i - 1]) / (n[i] - n[i - 1]))
+            linear = h[i] + s * (np.where(up, h[i + 1], h[i - 1]) - h[i]) / np.where(up, n[i + 1] - n[i], n[i - 1] - n[i])
+            new = np.where((h[i - 1] < parabolic) & (parabolic < h[i + 1]), parabolic, linear)
+            h[i] = np.where(move, new, h[i])
+            n[i] += np.where(move, s, 0.0)
+
+    def _seedMarkers(self):
+        '''Place the five markers of every quantile on the sorted buffer and release it.'''
+        ordered = np.sort(self.buffer, axis=0)
+        self.desired = 1 + (self.exact - 1) * self.increments
+        # nearest ranks, kept strictly increasing for the marker updates
+        slot = np.arange(5)[:, None]
+        ranks = np.clip(np.rint(self.desired[:, :, 0]).astype(int), 1 + slot, self.exact - 4 + slot)
+        for i in range(1, 5):
+            ranks[i] = np.maximum(ranks[i], ranks[i - 1] + 1)
+        self.heights = ordered[ranks - 1] # [5, quantile, cell]
+        self.positions = np.broadcast_to(ranks[:, :, None], self.heights.shape).astype(float)
+        self.buffer = None
+
+    def values(self):
+        '''[quantile, *shape] current estimates; exact while no more than `exact` observations were seen.'''
+        if self.count == 0:
+            return np.full((len(self.quantiles), *self.shape), np.nan)
+        if self.heights is None:
+            return np.quantile(self.buffer[:self.count], self.quantiles, axis=0).reshape(-1, *self.shape)
+        return self.heights[2].reshape(-1, *self.shape).copy()
+
+
+class EnsembleStats:
+    '''Running statistics over replicas of a [row, column] series (rows are steps or days).'''
+
+    def __init__(self, columns, quantiles=QUANTILES, exact=32):
+        self.columns = list(columns)
+        self.quantiles = tuple(quantiles)
+        self.exact = exact
+        self.moments = None
+        self.sketch = None
+
+    @property
+    def count(self):
+        return 0 if self.moments is None else self.moments.count
+
+    def update(self, series):
+        series = np.asarray(series, dtype=float)
+        if series.ndim != 2 or series.shape[1] != len(self.columns):
+            raise ValueError(f"Expected a [row, {len(self.columns)}] series, got shape {series.shape}.")
+        if self.moments is None:
+            self.moments = Welford(series.shape)
+            self.sketch = QuantileSketch(series.shape, self.quantiles, self.exact)
+        elif series.shape != self.moments.mean.shape:
+            raise ValueError(f"Replica series has shape {series.shape}, expected {self.moments.mean.shape}.")
+        self.moments.update(series)
+        self.sketch.update(series)
+
+    def quantileName(self, q):
+        return f"q{round(q * 100):02d}"
+
+    def bands(self):
+        '''column -> {statistic -> one value per row}, JSON-ready (NaN becomes None).'''
+        stats = {"mean": self.moments.mean, "std": self.moments.std, "min": self.moments.min, "max": self.moments.max}
+        stats.update(zip(map(self.quantileName, self.quantiles), self.sketch.values()))
+        return {column: {name: [None if not np.isfinite(v) else float(v) for v in values[:, c]]
+                         for name, values in stats.items()}
+                for c, column in enumerate(self.columns)}
+
+    def frame(self, index_name='step'):
+        '''Tidy table: one row per (row, column) with count, mean, std, min, max and the quantiles.'''
+        rows, cols = self.moments.mean.shape
+        table = pd.DataFrame({
+            index_name: np.repeat(np.arange(rows), cols),
+            'column': np.tile(self.columns, rows),
+            'count': self.count,
+            'mean': self.moments.mean.ravel(),
+            'std': self.moments.std.ravel(),
+            'min': self.moments.min.ravel(),
+            'max': self.moments.max.ravel(),
+        })
+        for q, values in zip(self.quantiles, self.sketch.values()):
+            table[self.quantileName(q)] = values.ravel()
+        return table
+
+
+def replicaSeeds(base_seed, replicas):
+    '''Independent 32-bit seeds for each replica, derived from one base seed.'''
+    return [int(s.generate_state(1)[0]) for s in np.random.SeedSequence(base_seed).spawn(replicas)]
+
+def dailyTotals(series, step_hours=1):
+    '''
+    Sum a [step, column] series over days, as summaries.buildSummary does.
+
+    Row 0 is the state before the first step and is dropped; tick k covers the hours from
+    (k-1)*step_hours, so a two-day run gives two days. Hours are counted as exact fractions
+    so steps such as 0.2 h don't slip across a day boundary.
+    '''
+    hours = Fraction(step_hours).limit_denominator(3600)
+    ticks = np.arange(len(series) - 1)
+    day = (ticks * hours.numerator) // (hours.denominator * HOURS_PER_DAY)
+    starts = np.flatnonzero(np.r_[True, day[1:] != day[:-1]])
+    return np.add.reduceat(series[1:], starts, axis=0)
+
+def replicaSeries(scenario, seed, log_callback=None):
+    '''Run one seeded replica of a scenario (headless) and return its [step, column] model-level series.'''
+    model, _ = energyABM.run(scenario, log_callback=log_callback or (lambda message: None),
+                             collect_agent_level=False, seed=seed, headless=True)
+    model_df = model.datacollector.get_model_vars_dataframe()
+    return model_df[list(ENSEMBLE_COLUMNS.values())].to_numpy(dtype=float)
+
+def runReplica(scenario_id, seed, app_config=None):
+    '''Process-pool entry point: one replica in a fresh app context.'''
+    from digitalTwin import create_app
+
+    app = create_app(app_config)
+    with app.app_context():
+        return replicaSeries(db.session.get(models.Scenario, scenario_id), seed)
+
+
+def runEnsemble(scenario_name, replicas, workers=None, base_seed=0, quantiles=QUANTILES, log_callback=print):
+    '''
+    Run `replicas` seeded copies of a scenario and reduce them as they finish.
+
+    workers:  replicas run at once, each in its own process (default Config.JOB_WORKERS);
+              1 runs them one after another in this process
+    Returns (per-step EnsembleStats, per-day EnsembleStats).
+    '''
+    scenario = db.first_or_404(sa.select(models.Scenario).where(models.Scenario.scenario_name == scenario_name))
+    workers = workers or Config.JOB_WORKERS
+    step_hours = scenario.simulation_step or 1
+    by_step = EnsembleStats(ENSEMBLE_COLUMNS, quantiles)
+    by_day = EnsembleStats(ENSEMBLE_COLUMNS, quantiles)
+
+    def reduce(series):
+        by_step.update(series)
+        by_day.update(dailyTotals(series, step_hours))
+        log_callback(f'Replica {by_step.count} of {replicas} done.')
+
+    seeds = replicaSeeds(base_seed, replicas)
+    if workers <= 1:
+        for seed in seeds:
+            reduce(replicaSeries(scenario, seed))
+        return by_step, by_day
+
+    app_config = {'SQLALCHEMY_DATABASE_URI': db.engine.url.render_as_string(hide_password=False)}
+    # spawn: workers must not inherit the server's threads or open DB connections
+    with ProcessPoolExecutor(max_workers=workers, mp_context=mp.get_context('spawn')) as pool:
+        pending = set()
+        for seed in seeds:
+            if len(pending) >= workers: # keep at most `workers` finished-but-unreduced series around
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    reduce(future.result())
+            pending.add(pool.submit(runReplica, scenario.id, seed, app_config))
+        for future in wait(pending).done:
+            reduce(future.result())
+    return by_step, by_day
+
+
+def saveEnsemble(scenario, by_day, base_seed=0):
+    '''Store (replacing any earlier one) the daily bands of an ensemble for a scenario.'''
+    db.session.execute(sa.delete(models.ScenarioEnsemble).where(models.ScenarioEnsemble.scenario_id == scenario.id))
+    ensemble = models.ScenarioEnsemble(scenario_id=scenario.id, replicas=by_day.count, base_seed=base_seed,
+                                       daily_bands=by_day.bands())
+    db.session.add(ensemble)
+    db.session.commit()
+    return ensemble
+
+def runAndSaveEnsemble(scenario_name, replicas, workers=None, base_seed=0, log_callback=print):
+    by_step, by_day = runEnsemble(scenario_name, replicas, workers=workers, base_seed=base_seed,
+                                  log_callback=log_callback)
+    scenario = db.session.scalar(sa.select(models.Scenario).where(models.Scenario.scenario_name == scenario_name))
+    saveEnsemble(scenario, by_day, base_seed)
+    log_callback('Ensemble bands saved.')
+    return by_step, by_day
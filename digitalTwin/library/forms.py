@@ -35,7 +35,7 @@ class CreateScenarioForm(FlaskForm):
                          validators=[DataRequired()],
                          render_kw={"type": "date"})
     SimStep = RadioField('Step size (hrs)',
-                         choices = [1, 2, 4, 12, 24],
+                         choices = [0.25, 1, 3, 6],
                          default = 1,
                          validators = [DataRequired()] )
     RecordEvery = RadioField('Record every (hrs)',
@@ -56,6 +56,12 @@ class CreateScenarioForm(FlaskForm):
             raise ValidationError('This scenario name is already in use. Please use a unique value.')
 
             # TODO: check EndDay after StartDay, check both within range
+
+    def validate_RecordEvery(self, RecordEvery):
+        # traces are recorded at the end of a step, so whole-hour steps need a whole number of steps
+        step = float(self.SimStep.data or 1)
+        if step >= 1 and float(RecordEvery.data) % step != 0:
+            raise ValidationError('Please record at a multiple of the step size.')
         
                 
     Submit = SubmitField('Continue')
@@ -0,0 +1,218 @@
+'''Persistent job queue for scenario runs.
+
+Runs are queued as rows in the job table and their progress messages go to job_log, so status and logs
+survive a server restart. A JobRunner thread in the web process claims queued jobs and hands each one
+to a process pool (one process per run, so model runs don't share the GIL with the web server or with
+each other). At most Config.JOB_WORKERS jobs are running at any time; anything else waits in the queue.
+
+A runner renews a lease (job.heartbeat) on every job it has claimed each time it polls. Any runner
+re-queues running jobs whose lease is older than Config.JOB_LEASE_SECONDS, so jobs of a stopped server
+run again while those of live server processes are left alone. Each server process starts its runner
+with the first request it handles (see create_app).'''
+
+import multiprocessing as mp
+import os
+import threading
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime, timedelta, timezone
+
+import sqlalchemy as sa
+
+from digitalTwin import db
+from digitalTwin.models import models
+from . import dataManager
+
+FINISHED = ['completed', 'failed']
+
+
+def enqueue(scenario_name):
+    scenario = db.first_or_404(sa.select(models.Scenario).where(models.Scenario.scenario_name == scenario_name))
+    job = models.Job(scenario_id=scenario.id, user_name=dataManager.getUserName(), status='queued')
+    db.session.add(job)
+    db.session.commit()
+    addLog(job.id, 'Queued. Waiting for a free worker...')
+    return job
+
+def addLog(job_id, message):
+    db.session.add(models.JobLog(job_id=job_id, message=str(message)))
+    db.session.commit()
+
+def getLogs(job_id):
+    query = sa.select(models.JobLog.message).where(models.JobLog.job_id == job_id).order_by(models.JobLog.id)
+    return db.session.scalars(query).all()
+
+def latestJob(scenario_name):
+    query = (sa.select(models.Job).join(models.Scenario)
+             .where(models.Scenario.scenario_name == scenario_name)
+             .order_by(models.Job.id.desc()).limit(1))
+    return db.session.scalar(query)
+
+def listJobs(statuses, limit=None, order='asc'):
+    query = sa.select(models.Job).where(models.Job.status.in_(statuses))
+    query = query.order_by(models.Job.id.desc() if order == 'desc' else models.Job.id.asc())
+    if limit:
+        query = query.limit(limit)
+    return db.session.scalars(query).all()
+
+def countRunning():
+    return db.session.scalar(sa.select(sa.func.count(models.Job.id)).where(models.Job.status == 'running'))
+
+def claimNext():
+    '''Mark the oldest queued job as running and return its id (None if the queue is empty).
+
+    The status check in the UPDATE means two runners can never claim the same job.'''
+    job_id = db.session.scalar(sa.select(models.Job.id).where(models.Job.status == 'queued').order_by(models.Job.id).limit(1))
+    if job_id is None:
+        return None
+    result = db.session.execute(sa.update(models.Job)
+                                .where(models.Job.id == job_id, models.Job.status == 'queued')
+                                .values(status='running', started=datetime.now(timezone.utc),
+                                        heartbeat=datetime.now(timezone.utc)))
+    db.session.commit()
+    return job_id if result.rowcount == 1 else None
+
+def finishJob(job_id, status, error=None):
+    db.session.execute(sa.update(models.Job).where(models.Job.id == job_id)
+                       .values(status=status, error=error, finished=datetime.now(timezone.utc)))
+    db.session.commit()
+
+def renewLeases(job_ids):
+    if job_ids:
+        db.session.execute(sa.update(models.Job).where(models.Job.id.in_(job_ids), models.Job.status == 'running')
+                           .values(heartbeat=datetime.now(timezone.utc)))
+        db.session.commit()
+
+def requeueInterrupted(lease_seconds):
+    '''Running jobs whose lease has expired (their server process stopped) go back on the queue.'''
+    expired = datetime.now(timezone.utc) - timedelta(seconds=lease_seconds)
+    stale = sa.and_(models.Job.status == 'running',
+                    sa.or_(models.Job.heartbeat.is_(None), models.Job.heartbeat < expired))
+    job_ids = db.session.scalars(sa.select(models.Job.id).where(stale)).all()
+    if not job_ids:
+        return 0
+    # the status and lease are checked again, so a job renewed in the meantime keeps running
+    db.session.execute(sa.update(models.Job).where(models.Job.id.in_(job_ids), stale)
+                       .values(status='queued', started=None, worker_pid=None, heartbeat=None))
+    db.session.commit()
+    for job_id in job_ids:
+        addLog(job_id, 'Run interrupted: its server process stopped. Re-queued.')
+    return len(job_ids)
+
+
+def runJob(job_id, app_config=None):
+    '''Process-pool entry point: run one claimed job in a fresh app context and record the outcome.'''
+    from digitalTwin import create_app
+    from . import scenarios
+
+    app = create_app(app_config)
+    with app.app_context():
+        db.session.execute(sa.update(models.Job).where(models.Job.id == job_id).values(worker_pid=os.getpid()))
+        db.session.commit()
+        scenario_name = db.session.get(models.Job, job_id).scenario.scenario_name
+
+        def job_logger(message):
+            print(message) # Still print to server console
+            addLog(job_id, message)
+
+        try:
+            job_logger("Starting process...")
+            scenarios.run_and_save_scenario(scenario_name, log_callback=job_logger)
+            finishJob(job_id, 'completed')
+            return 'completed'
+        except Exception as e:
+            db.session.rollback()
+            error_trace = traceback.format_exc()
+            print(error_trace)
+            job_logger(f"CRITICAL ERROR: {str(e)}")
+            finishJob(job_id, 'failed', error_trace)
+            return 'failed'
+
+
+class JobRunner:
+    '''Claims queued jobs and runs them on a process pool, keeping at most `workers` running.'''
+
+    def __init__(self, app, workers=None, poll_seconds=None):
+        self.app = app
+        self.workers = workers or app.config['JOB_WORKERS']
+        self.poll_seconds = poll_seconds or app.config['JOB_POLL_SECONDS']
+        self.lease_seconds = app.config['JOB_LEASE_SECONDS']
+        self.futures = {} # job id -> Future, for jobs started by this runner
+        self.pool = self._newPool()
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self.thread = threading.Thread(target=self._loop, name='job-runner', daemon=True)
+
+    def _newPool(self):
+        # spawn: workers must not inherit the server's threads or open DB connections
+        return ProcessPoolExecutor(max_workers=self.workers, mp_context=mp.get_context('spawn'),
+                                   max_tasks_per_child=1)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def wake(self):
+        self._wake.set()
+
+    def stop(self, wait=True):
+        self._stop.set()
+        self._wake.set()
+        self.thread.join()
+        self.pool.shutdown(wait=wait)
+
+    def _loop(self):
+        while not self._stop.is_set():
+            with self.app.app_context():
+                try:
+                    renewLeases(list(self.futures))
+                    requeueInterrupted(self.lease_seconds)
+                    self._reap()
+                    self._dispatch()
+                except Exception:
+                    print(traceback.format_exc())
+                finally:
+                    db.session.remove()
+            self._wake.wait(self.poll_seconds)
+            self._wake.clear()
+
+    def _dispatch(self):
+        # the running count comes from the table, so the limit holds across server processes
+        while countRunning() < self.workers:
+            job_id = claimNext()
+            if job_id is None:
+                return
+            app_config = {'SQLALCHEMY_DATABASE_URI': self.app.config['SQLALCHEMY_DATABASE_URI']}
+            self.futures[job_id] = self.pool.submit(runJob, job_id, app_config)
+
+    def _reap(self):
+        for job_id, future in list(self.futures.items()):
+            if not future.done():
+                continue
+            del self.futures[job_id]
+            error = future.exception()
+            if error is not None: # the worker process itself died (killed, out of memory, ...)
+                addLog(job_id, f"CRITICAL ERROR: worker process failed ({error!r})")
+                finishJob(job_id, 'failed', repr(error))
+                if isinstance(error, BrokenProcessPool):
+                    self.pool = self._newPool()
+
+
+_runner = None
+_runner_lock = threading.Lock()
+
+def startRunner(app):
+    '''Start this server process's JobRunner if it isn't running yet.'''
+    global _runner
+    if _runner is None:
+        with _runner_lock:
+            if _runner is None:
+                _runner = JobRunner(app).start()
+    return _runner
+
+def ensureRunner(app):
+    '''Start this server's JobRunner if needed and wake it to pick up a newly queued job.'''
+    runner = startRunner(app)
+    runner.wake()
+    return runner
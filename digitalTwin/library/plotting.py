@@ -5,7 +5,7 @@ Figures are returned aas json dumps of plotly fig objects. GIS information retur
 '''
 
 from ..modelling import analyze
-from . import dataManager
+from . import dataManager, summaries
 from pathlib import Path
 import pandas as pd
 import plotly.express as px
@@ -35,7 +35,10 @@ def dailyByPropTypePX(timeseries, prop_cols):
     prop_cols.remove('scenario_id')
     timeseries.drop(['id', 'scenario_id'], axis=1)
     daily_type = timeseries.groupby("day")[prop_cols].sum()
-    mean_daily_type = daily_type.mean().sort_values(ascending=False)
+    return propTypeBarPX(daily_type.mean())
+
+def propTypeBarPX(mean_daily_type):
+    mean_daily_type = pd.Series(mean_daily_type, dtype=float).sort_values(ascending=False)
 
     ## TODO: remove zero values
     fig = px.bar(mean_daily_type, 
@@ -52,7 +55,10 @@ def dailyByPropTypePX(timeseries, prop_cols):
 def dailyByWealth(timeseries, wealth_cols):
     daily_w = timeseries.groupby("day")[wealth_cols].sum()
     avg_w   = daily_w.mean().loc[wealth_cols]    # preserve ordering
-    print(avg_w.index)
+    return wealthBarPX(avg_w)
+
+def wealthBarPX(avg_w):
+    avg_w = pd.Series(avg_w, dtype=float)
     fig = px.bar(avg_w, 
                  labels = {"index":"Property Type",
                         "value":"avg kWh / day"},
@@ -72,6 +78,13 @@ def temporalHeatMap(timeseries):
     pivot = timeseries.pivot_table(
         index="day", columns="hour", values="total_energy", aggfunc="sum"
     )
+    return dayHourHeatMapPX(pivot)
+
+def dayHourHeatMapPX(pivot):
+    if not isinstance(pivot, pd.DataFrame): # [day][hour] list from a ScenarioSummary
+        pivot = pd.DataFrame(pivot, dtype=float)
+        pivot.index.name = "day"
+        pivot.columns.name = "hour"
 
     fig = px.imshow(pivot, width=800, height=400, 
                            labels={"day":"Day","hour":"Hour"},
@@ -83,6 +96,13 @@ def temporalHeatMap(timeseries):
     figJSON = json.dumps(fig, cls=plotly.utils.PlotlyJSONEncoder)
     return figJSON
 
+# Report figures from the stored ScenarioSummary
+def summaryFigures(summary):
+    fig2 = propTypeBarPX(summary.prop_type_daily_mean)
+    fig3 = wealthBarPX(summary.wealth_daily_mean)
+    fig4 = dayHourHeatMapPX(summary.day_hour_totals)
+    return fig2, fig3, fig4
+
 # Produces the data for the maplibre GIS. Returns steps (an array of each time step), timeseries_js (geo_json containing the data), and energy_range (dict of min and max energy usage)
 def timeline(scenario):
 
@@ -106,7 +126,11 @@ def timeline(scenario):
     gdf_static_js = gdf_static.to_json()
 
     # Get min and max data usage to help define colors in the maplibre GIS
-    eRange = dataManager.getEnergyRange(scenario.id) 
+    summary = summaries.getSummary(scenario)
+    if summary is not None and summary.min_energy is not None:
+        eRange = [summary.min_energy, summary.max_energy]
+    else:
+        eRange = dataManager.getEnergyRange(scenario.id) 
     energy_range = {"min":round(eRange[0],3), 
                     "max": round(eRange[1],3)
                     }
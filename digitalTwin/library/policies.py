@@ -66,7 +66,10 @@ def getPolicy(policy_id):
 
     return policy_data
 
-def applyPolicy(df, policyID, log_callback=print):
+def applyPolicy(df, policyID, log_callback=print, rng=None):
+    '''Switch a sample (the policy's adoption rate) of each rule's matching households to heat pumps.
+
+    rng: numpy Generator (or seed) the samples are drawn with; None uses numpy's global state'''
     policy = dataManager.findDBData('PolicyChoices', identifier=policyID)
     
     # adoption rate
@@ -81,7 +84,7 @@ def applyPolicy(df, policyID, log_callback=print):
         mask &= (df['heatpump_candidate_class'].isin(policy.candidate_classes))
 
         # sample
-        indices_to_change = df[mask].sample(frac=AR).index
+        indices_to_change = df[mask].sample(frac=AR, random_state=rng).index
 
         # change
         df.loc[indices_to_change, 'main_heating_system'] = 'heat pump'
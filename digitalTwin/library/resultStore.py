@@ -0,0 +1,96 @@
+'''Parquet result store for agent time series.
+
+Alternative to the agent_time_series table: traces are written as a hive-partitioned Parquet dataset,
+one directory per scenario and one partition per simulated day
+
+    <RESULTS_DIR>/scenario=<id>/day=<d>/part-<chunk>-<i>.parquet
+
+and the Scenario row only keeps the dataset path (Scenario.agent_results_path). Readers use column
+projection and partition / row-group pruning, so a one-day timeline only opens that day's files.
+
+Columns match the agent_time_series table: step, Agent_id, energy, energy_consumption.'''
+
+import shutil
+from pathlib import Path
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+
+from digitalTwin.config import Config
+
+HOURS_PER_DAY = 24
+SCHEMA = pa.schema([('step', pa.int64()),
+                    ('Agent_id', pa.string()),
+                    ('energy', pa.float32()),
+                    ('energy_consumption', pa.float32()),
+                    ('day', pa.int32())])
+PARTITIONING = ds.partitioning(pa.schema([('day', pa.int32())]), flavor='hive')
+
+
+def scenarioPath(scenario_id, results_dir=None):
+    return Path(results_dir or Config.RESULTS_DIR) / f'scenario={scenario_id}'
+
+def stepsToDays(steps):
+    '''Partition key for a model step (hour counter since the start of the run).'''
+    return np.asarray(steps) // HOURS_PER_DAY
+
+
+class AgentParquetSink:
+    '''AgentRecorder sink writing each flushed chunk into the scenario's partitioned dataset.'''
+
+    def __init__(self, scenario_id, results_dir=None, log_callback=print):
+        self.path = scenarioPath(scenario_id, results_dir)
+        self.log_callback = log_callback
+        self.rows_written = 0
+        self.n_chunks = 0
+        if self.path.exists():
+            shutil.rmtree(self.path) # re-running a scenario replaces its results
+        self.path.mkdir(parents=True)
+
+    def write(self, columns):
+        steps = np.asarray(columns["Step"], dtype=np.int64)
+        table = pa.table({
+            'step': steps,
+            'Agent_id': pa.array(np.asarray(columns["AgentID"]).astype(str), type=pa.string()),
+            'energy': np.asarray(columns["energy"], dtype=np.float32),
+            'energy_consumption': np.asarray(columns["energy_consumption"], dtype=np.float32),
+            'day': stepsToDays(steps).astype(np.int32),
+        }, schema=SCHEMA)
+        ds.write_dataset(table, self.path, format='parquet', partitioning=PARTITIONING,
+                         basename_template=f'part-{self.n_chunks}-{{i}}.parquet',
+                         existing_data_behavior='overwrite_or_ignore')
+        self.n_chunks += 1
+        self.rows_written += table.num_rows
+
+    def close(self):
+        self.log_callback(f'Agent time series saved to {self.path} ({self.rows_written:,} rows).')
+
+
+def _dataset(path):
+    return ds.dataset(path, format='parquet', partitioning=PARTITIONING)
+
+def readAgentSeries(path, columns=None, steps=None):
+    '''Load agent traces as a DataFrame, optionally only some columns and steps.
+
+    Restricting steps prunes whole day partitions first, then row groups by their step statistics.'''
+    dataset = _dataset(path)
+    flt = None
+    if steps is not None:
+        steps = [int(s) for s in steps]
+        days = sorted(set(stepsToDays(steps).tolist()))
+        flt = ds.field('day').isin(days) & ds.field('step').isin(steps)
+    if columns is None:
+        columns = [name for name in SCHEMA.names if name != 'day']
+    return dataset.to_table(columns=list(columns), filter=flt).to_pandas()
+
+def energyRange(path):
+    '''[min, max] household energy consumption, reading only that column.'''
+    values = _dataset(path).to_table(columns=['energy_consumption'])['energy_consumption']
+    bounds = pc.min_max(values)
+    return [bounds['min'].as_py(), bounds['max'].as_py()]
+
+def deleteAgentSeries(path):
+    if path and Path(path).exists():
+        shutil.rmtree(path)
@@ -4,7 +4,7 @@ This functionality to be replaced with databasing in the deployment version'''
 
 from ..modelling import energyABM, climate
 from ..models import models
-from . import dataManager, populations
+from . import dataManager, populations, bulkInsert, resultStore, summaries
 
 from digitalTwin import db
 from flask import session
@@ -15,83 +15,103 @@ from email.utils import parsedate_to_datetime
 
 import sqlalchemy as sa
 import sqlalchemy.orm as so
+import pandas as pd
+
+# model_time_series column -> model DataCollector reporter
+MODEL_TS_COLUMNS = {
+    'mid_terraced_house': "mid-terraced house",
+    'semi_detached_house': "semi-detached house",
+    'flats_small': "small block of flats/dwelling converted in to flats",
+    'flats_large': "large block of flats",
+    'flats_block': "block of flats",
+    'end_terrace_house': "end-terraced house",
+    'detached_house': "detached house",
+    'flat_mixed_use': "flat in mixed use building",
+    'high': "high",
+    'medium': "medium",
+    'low': "low",
+    'total_energy': "total_energy",
+    'cumulative_energy': "cumulative_energy",
+}
+
+class AgentTimeSeriesSink:
+    '''Streams agent-level traces into agent_time_series while the model runs.
+
+    The model's AgentRecorder hands over one chunk of collection steps at a
+    time, so the full trace never has to be held in memory.'''
+
+    def __init__(self, scenario_id, log_callback=print):
+        self.scenario_id = scenario_id
+        self.log_callback = log_callback
+        self.stats = bulkInsert.InsertStats('Agent time series')
+
+    @property
+    def rows_written(self):
+        return self.stats.rows
+
+    def write(self, columns):
+        bulkInsert.insertColumns(models.AgentTimeSeries, {
+            'scenario_id': self.scenario_id,
+            'step': columns["Step"],
+            'Agent_id': columns["AgentID"],
+            'energy': columns["energy"],
+            'energy_consumption': columns["energy_consumption"],
+        }, stats=self.stats)
+
+    def close(self):
+        self.log_callback(f'{self.stats} saved.')
+
 
 def run_and_save_scenario(scenario_name, log_callback=print):
     """
     Runs the Energy ABM model and bulk-saves all outputs to the database.
+    Agent time series are streamed in chunks during the run, either to the database or, with
+    Config.RESULTS_BACKEND = 'parquet', to a partitioned Parquet dataset (see resultStore).
     log_callback allows external functions to intercept print statements.
     """
     # Fetch scenario
     log_callback(f"Fetching scenario: {scenario_name} from database...")
     scenario = db.first_or_404(sa.select(models.Scenario).where(models.Scenario.scenario_name == scenario_name))
     
-    # Run model
+    # Run model, streaming agent time series as it goes
     log_callback("Initializing EnergyABM model...")
-    model, records = energyABM.run(scenario, log_callback=log_callback) 
+    if Config.RESULTS_BACKEND == 'parquet':
+        agent_sink = resultStore.AgentParquetSink(scenario.id, log_callback=log_callback)
+        scenario.agent_results_path = str(agent_sink.path)
+    else:
+        agent_sink = AgentTimeSeriesSink(scenario.id, log_callback=log_callback)
+        scenario.agent_results_path = None
+    db.session.commit()
+    model, records = energyABM.run(scenario, log_callback=log_callback, agent_sink=agent_sink) 
     log_callback("Model run complete. Preparing database records...")
 
 
     # Save energy time series
-    energy_objects = []
-    for entry in records:
-        energy_ts = models.EnergyTimeSeries(
-            scenario_id=scenario.id,
-            step=entry["step"],
-            hour=entry["hour"],
-            day=entry["day"],
-            total_energy=entry["total_energy"],
-            average_energy=entry["avg_energy"]
-        )
-        energy_objects.append(energy_ts)
-    db.session.bulk_save_objects(energy_objects)
-    db.session.commit()
-    log_callback('Energy time series saved.')
+    stats = bulkInsert.InsertStats('Energy time series')
+    bulkInsert.insertColumns(models.EnergyTimeSeries, {
+        'scenario_id': scenario.id,
+        'step': [entry["step"] for entry in records],
+        'hour': [entry["hour"] for entry in records],
+        'day': [entry["day"] for entry in records],
+        'total_energy': [entry["total_energy"] for entry in records],
+        'average_energy': [entry["avg_energy"] for entry in records],
+    }, stats=stats)
+    log_callback(f'{stats} saved.')
 
     #Save model time series
     model_df = model.datacollector.get_model_vars_dataframe() 
-    model_dict = model_df.to_dict('records') 
-    
-    model_objects = []
-    for row in model_dict:
-        model_ts = models.ModelTimeSeries(
-            scenario_id=scenario.id,
-            mid_terraced_house=row["mid-terraced house"],
-            semi_detached_house=row["semi-detached house"],
-            flats_small=row["small block of flats/dwelling converted in to flats"],
-            flats_large=row["large block of flats"],
-            flats_block=row["block of flats"],
-            end_terrace_house=row["end-terraced house"],
-            detached_house=row["detached house"],
-            flat_mixed_use=row["flat in mixed use building"],
-            high=row["high"],
-            medium=row["medium"],
-            low=row["low"],
-            total_energy=row["total_energy"],
-            cumulative_energy=row["cumulative_energy"]
-        )
-        model_objects.append(model_ts)
-    db.session.bulk_save_objects(model_objects)
-    db.session.commit()
-    log_callback('Model time series saved.')
+    model_ts = pd.DataFrame({column: model_df[name].to_numpy() for column, name in MODEL_TS_COLUMNS.items()})
+    stats = bulkInsert.InsertStats('Model time series')
+    bulkInsert.insertColumns(models.ModelTimeSeries, {
+        'scenario_id': scenario.id,
+        **{column: model_ts[column].to_numpy() for column in model_ts.columns},
+    }, stats=stats)
+    log_callback(f'{stats} saved.')
 
-    # Save agent time series
-    agent_df = model.agent_dc.get_agent_vars_dataframe() 
-    agent_dict = agent_df.reset_index().values.tolist()
-    
-    agent_objects = []
-    for row in agent_dict:
-        agent_ts = models.AgentTimeSeries(
-            scenario_id=scenario.id,
-            step=row[0],
-            Agent_id=row[1],
-            energy=row[2],
-            energy_consumption=row[3]
-        )
-        agent_objects.append(agent_ts)
-        
-    db.session.bulk_save_objects(agent_objects)
-    db.session.commit()
-    log_callback('Agent time series saved. Process entirely finished!')
+    # Save report summary
+    summaries.saveSummary(summaries.summaryFromRun(scenario.id, model, records, model_ts))
+    log_callback('Scenario summary saved.')
+    log_callback('Process entirely finished!')
 
 
 
@@ -131,8 +151,7 @@ def saveScenario(session):
                 init_lat = init_lat_lon[0],
                 init_lon = init_lat_lon[1],
                 start_day = datetime.combine(startDay, datetime.min.time()), # force to 00:00:00
-                # simulation_step=mainScenarioData.get('SimStep'),
-                simulation_step=1,
+                simulation_step=float(mainScenarioData.get('SimStep') or 1),
                 record_every=mainScenarioData.get('RecordEvery'),
                 policy_id = policyID,
                 population_id = popID              
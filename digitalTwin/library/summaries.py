@@ -0,0 +1,95 @@
+'''Per-scenario report summaries.
+
+The report and timeline pages only need a handful of aggregates (household kWh range, daily totals,
+day x hour totals, mean daily kWh by property type and wealth group, top-quartile households).
+These are computed once, when run_and_save_scenario finishes, and stored as a ScenarioSummary row,
+so page loads no longer depend on the length of the scenario. Scenarios run before the summary
+table existed are summarised from their stored series the first time a report asks for them.'''
+
+import numpy as np
+import pandas as pd
+import sqlalchemy as sa
+
+from digitalTwin import db
+from digitalTwin.models import models
+from . import dataManager
+
+HOURS_PER_DAY = 24
+WEALTH_COLUMNS = ['high', 'medium', 'low']
+PROP_TYPE_COLUMNS = [c for c in models.ModelTimeSeries.__table__.columns.keys()
+                     if c not in ['id', 'scenario_id', 'total_energy', 'cumulative_energy', *WEALTH_COLUMNS]]
+
+
+def _jsonFloat(value):
+    return None if value is None or not np.isfinite(value) else float(value)
+
+def topQuartile(totals):
+    '''Households at or above the 75th percentile of total kWh, as in analyze.highUsage.'''
+    totals = totals[totals > 0]
+    hi = totals[totals >= totals.quantile(0.75)]
+    if hi.empty:
+        hi = totals.nlargest(max(3, len(totals)//2))
+    hi = hi.sort_values(ascending=False)
+    return [[str(agent_id), float(total)] for agent_id, total in hi.items()]
+
+def buildSummary(scenario_id, model_ts, hourly, household_totals, energy_range, step_hours=1):
+    '''
+    model_ts:          model_time_series columns, one row per step (of step_hours) starting at t = 0
+    hourly:            energy_time_series columns (day, hour, total_energy)
+    household_totals:  Series of total kWh per household id over the recorded steps
+    energy_range:      [min, max] household kWh over the recorded steps
+    '''
+    day = (np.arange(len(model_ts)) * step_hours) // HOURS_PER_DAY # as analyze.prepTimeSeries
+    prop_types = model_ts[PROP_TYPE_COLUMNS].apply(pd.to_numeric, errors='coerce').groupby(day).sum().mean()
+    wealth = model_ts[WEALTH_COLUMNS].apply(pd.to_numeric, errors='coerce').groupby(day).sum().mean()
+
+    day_hour = hourly.pivot_table(index='day', columns='hour', values='total_energy', aggfunc='sum')
+    day_hour = day_hour.reindex(columns=range(HOURS_PER_DAY))
+
+    return models.ScenarioSummary(
+        scenario_id=scenario_id,
+        min_energy=_jsonFloat(energy_range[0]),
+        max_energy=_jsonFloat(energy_range[1]),
+        daily_totals=[float(v) for v in hourly.groupby('day')['total_energy'].sum()],
+        day_hour_totals=[[_jsonFloat(v) for v in row] for row in day_hour.to_numpy()],
+        prop_type_daily_mean={k: _jsonFloat(v) for k, v in prop_types.items()},
+        wealth_daily_mean={k: _jsonFloat(v) for k, v in wealth.items()},
+        top_quartile=topQuartile(household_totals),
+    )
+
+def summaryFromRun(scenario_id, model, records, model_ts):
+    '''Summary from a finished model run, using the agent recorder's running totals.'''
+    recorder = model.agent_dc
+    if recorder is None: # agent-level collection switched off
+        household_totals, energy_range = pd.Series(dtype=float), [None, None]
+    else:
+        household_totals = pd.Series(recorder.household_total, index=recorder.household_ids)
+        energy_range = [recorder.household_min, recorder.household_max]
+    return buildSummary(scenario_id, model_ts, pd.DataFrame(records), household_totals, energy_range, model.step_hours)
+
+def summaryFromResults(scenario):
+    '''Summary recomputed from a scenario's stored series (one full read); None if there are no results.'''
+    model_ts = dataManager.findDBData('ModelTimeSeries', scenario.id)
+    if model_ts.empty:
+        return None
+    model_ts = model_ts.sort_values('id')
+    hourly = dataManager.findDBData('EnergyTimeSeries', scenario.id)
+    agent_ts = dataManager.findDBData('AgentTimeSeries', scenario.id)
+    houses = agent_ts[agent_ts['energy'] == 0] # energy != 0 means PersonAgent
+    household_totals = houses.groupby('Agent_id')['energy_consumption'].sum()
+    energy_range = [houses['energy_consumption'].min(), houses['energy_consumption'].max()]
+    return buildSummary(scenario.id, model_ts, hourly, household_totals, energy_range, scenario.simulation_step or 1)
+
+def saveSummary(summary):
+    db.session.execute(sa.delete(models.ScenarioSummary).where(models.ScenarioSummary.scenario_id == summary.scenario_id))
+    db.session.add(summary)
+    db.session.commit()
+
+def getSummary(scenario):
+    '''Stored summary for the scenario, computing and storing it first if needed.'''
+    summary = db.session.scalar(sa.select(models.ScenarioSummary).where(models.ScenarioSummary.scenario_id == scenario.id))
+    if summary is None:
+        summary = summaryFromResults(scenario)
+        if summary is not None:
+            saveSummary(summary)
+    return summary
@@ -6,6 +6,8 @@ Domain agents for the Household-Energy ABM:
 
 * **HouseholdAgent** – one per building polygon / dwelling unit
 * **PersonAgent**    – individual resident linked to a HouseholdAgent
+* **CompactHouseholdAgent** / **CompactPersonAgent** – slotted variants the
+  model builds, whose static attributes live in a shared ``AttributeTable``
 
 Both inherit from Mesa / mesa-geo base classes 
 
@@ -16,6 +18,10 @@ The module also contains:
 * three schedule profiles (`Parent`, `Worker`, `Homebody`) that define when a
   resident leaves / returns home during a 24-h cycle.
 
+Resident schedules are fixed for a run, so each PersonAgent precomputes its
+presence and kWh for every local hour; the model sums these into per-household
+``[24]`` occupancy / spike tables instead of stepping every resident each tick.
+
 This version adds light-weight climate hooks to HouseholdAgent:
 - `clim_idx`: index of nearest climate point (set once by the model)
 - `ambient_tempC`: last sampled outdoor temperature (°C)
@@ -26,12 +32,13 @@ This version adds light-weight climate hooks to HouseholdAgent:
 from __future__ import annotations
 
 import math
-import random
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Optional, Sequence
 
 import geopandas as gpd               # only used for typing / IDE hints
 import mesa
 import mesa_geo as mg
+import numpy as np
+import pandas as pd
 from shapely.geometry.base import BaseGeometry
 
 
@@ -67,6 +74,8 @@ PROPERTY_TYPE_MULTIPLIER: Dict[str, float] = PROPERTY_TYPE_MULT_HEAT
 
 PROPERTY_TYPES: List[str] = list(PROPERTY_TYPE_MULT_BASE.keys())
 
+WEALTH_GROUPS: List[str] = ["high", "medium", "low"]
+
 # ────────────────────────────────────────────────────────────────────
 
 SCHEDULE_PROFILES = [
@@ -176,17 +185,7 @@ class HouseholdAgent(mg.GeoAgent):
         self.annual_energy_kwh: float = float(annual_energy_kwh)  # NEW
         self.energy_demand: float = self.annual_energy_kwh        # NEW (legacy alias)
 
-        # per-tick state – cleared by model.step()
-        self.energy_consumption: float = 0.0
-
-        # residents
-        self.residents: List["PersonAgent"] = []
-
-        # --- climate state (populated/used by the model) -----------
-        self.clim_idx: Optional[int] = None
-        self.ambient_tempC: float = float("nan")
-        self.climate_heating_kWh: float = 0.0
-        self.climate_cooling_kWh: float = 0.0
+        self._init_tick_state()
 
         # NEW: attach core drivers (kept raw; used in calc/reporters)
         self.floor_area_m2 = None if floor_area_m2 is None else float(floor_area_m2)    # NEW
@@ -202,34 +201,6 @@ class HouseholdAgent(mg.GeoAgent):
         self.retrofit_envelope_score = None if retrofit_envelope_score is None else float(retrofit_envelope_score)  # NEW
         self.imd_decile = None if imd_decile is None else float(imd_decile)  # NEW
         # -----------------------------------------------------------
-        # --- per-home climate sensitivity (heating slope) ---  # NEW
-        cfg = getattr(self.model, "config", None)
-        cfg_arche = cfg.archetypes if cfg else {}
-        heat_loss_default = {
-            "detached house": 1.30, "semi-detached house": 1.15,
-            "end-terraced house": 1.10, "mid-terraced house": 1.00,
-            "small block of flats/dwelling converted in to flats": 0.85,
-            "large block of flats": 0.75, "block of flats": 0.85,
-            "flat in mixed use building": 0.90,
-        }
-        ptype = (self.property_type or "").strip().lower()
-        sap   = float(self.sap_rating or 70.0)
-        retro = float(self.retrofit_envelope_score or 0.5)
-        fa    = float(self.floor_area_m2 or 90.0)
-
-        p_mult  = cfg_arche.get(ptype, {}).get("ua_mult") if ptype in cfg_arche else None
-        if p_mult is None:
-            p_mult = heat_loss_default.get(ptype, 1.0)
-        sap_mult   = 1.15 if sap < 55 else (0.90 if sap > 80 else 1.00)
-        retro_mult = 1.10 - 0.20 * max(0.0, min(1.0, retro))
-        area_mult  = max(0.7, min(1.6, fa / 90.0))
-        rng = __import__("random").Random(hash(str(self.unique_id)) & 0xFFFFFFFF)
-        noise_mult = max(0.75, min(1.25, rng.normalvariate(1.0, 0.10)))
-
-        self.heat_slope_kWh_per_deg = (
-            self.model.heating_slope_kWh_per_deg * p_mult * sap_mult * retro_mult * area_mult * noise_mult
-        )
-
         # heat-pump effectiveness vs boiler (simple, deterministic)
         self.hp_effect_mult = getattr(self.model, "boiler_efficiency", 0.90) / getattr(self.model, "heatpump_cop_ref", 2.8)
         # -----------------------------------------------------------
@@ -255,9 +226,6 @@ class HouseholdAgent(mg.GeoAgent):
         self.is_solid_fuel = _b(is_solid_fuel)      # NEW
         self.is_off_gas = _b(is_off_gas)            # NEW
 
-        # NEW: fast occupancy counter (maintained by PersonAgent.step)
-        self.occupancy_count: int = 0  # NEW
-
         # NEW: precompute hourly base once (big speed win)
         self._hourly_base_kwh: float = self._compute_hourly_base_kwh()  # NEW
         # NEW: per-household heat slope (kWh per degC-hour) for climate response
@@ -265,6 +233,22 @@ class HouseholdAgent(mg.GeoAgent):
         # NEW: per-household heating capacity (kWh/h) for duty-cycle model
         self.heat_capacity_kWh_per_hour: float = self._compute_heat_capacity()
 
+    def _init_tick_state(self) -> None:
+        # per-tick state – cleared by model.step()
+        self.energy_consumption: float = 0.0
+
+        # residents
+        self.residents: List["PersonAgent"] = []
+
+        # --- climate state (populated/used by the model) -----------
+        self.clim_idx: Optional[int] = None
+        self.ambient_tempC: float = float("nan")
+        self.climate_heating_kWh: float = 0.0
+        self.climate_cooling_kWh: float = 0.0
+
+        # NEW: fast occupancy counter (set each tick from the model's occupancy table)
+        self.occupancy_count: int = 0  # NEW
+
     # NEW: compute static hourly base from structure/levers (called once)
     def _compute_hourly_base_kwh(self) -> float:  # NEW
         """Non-climate baseline (small, meter-anchored, year-round).
@@ -274,37 +258,29 @@ class HouseholdAgent(mg.GeoAgent):
         - Keep a modest fixed load that remains in summer.
         - Property features shape heating only (handled elsewhere).
         """
-        cfg = getattr(self.model, "config", None)
+        p = self.model.config.params
         level_scale = getattr(self.model, "level_scale", 1.0)
         # Baseline anchored on meter data, not EPC annual
-        base = float(getattr(self.model, "baseline_anchor_kwh_per_hour", 0.4))
+        base = p.baseline_anchor_kwh_per_hour
 
-        # property-type multiplier (baseline map from config if present)
-        pt_mult = PROPERTY_TYPE_MULT_BASE.get(self.property_type, 1.0)
-        if cfg and isinstance(cfg.model, dict):
-            pt_mult = cfg.model.get("property_type_mult_base", {}).get(self.property_type, pt_mult)
-        base *= pt_mult
+        # property-type multiplier (baseline map, config over built-in)
+        base *= p.pt_base_mult.get(self.property_type, 1.0)
 
         # floor area weak sublinear scaling
         fa = self.floor_area_m2
         if fa is not None and fa > 0:
-            ref = float(getattr(self.model, "baseline_area_ref_m2", 70.0))
-            exp = float(getattr(self.model, "baseline_area_exp", 0.20))
-            lo, hi = getattr(self.model, "baseline_area_clip", (0.85, 1.25))
-            area_mult = max(lo, min(hi, (fa / ref) ** exp))
+            lo, hi = p.baseline_area_clip
+            area_mult = max(lo, min(hi, (fa / p.baseline_area_ref_m2) ** p.baseline_area_exp))
             base *= area_mult
 
         hourly = base * level_scale
         # cap baseline to avoid unrealistic power draw
-        max_base = getattr(self.model, "max_base_kwh_per_hour", None)
-        if max_base is not None:
-            hourly = min(hourly, float(max_base))
-        return hourly
+        return min(hourly, p.max_base_kwh_per_hour)
 
     def _compute_heat_slope(self, base_slope: float) -> float:
         """Per-household temperature sensitivity (heating slope). Structure affects slope, not annual anchor."""
         slope = float(base_slope)
-        cfg = getattr(self.model, "config", None)
+        p = self.model.config.params
 
         # SAP: gentle modulation
         if self.sap_rating < 50:
@@ -312,21 +288,15 @@ class HouseholdAgent(mg.GeoAgent):
         elif self.sap_rating > 80:
             slope *= 0.90
 
-        # Property type multiplier (bounded, from config if present)
-        pt_mult = PROPERTY_TYPE_MULT_HEAT.get(self.property_type, 1.0)
-        if cfg and isinstance(cfg.model, dict):
-            pt_mult = cfg.model.get("pt_heat_mult", {}).get(self.property_type, cfg.model.get("pt_heat_mult", {}).get("default", pt_mult))
-        slope *= pt_mult
+        # Property type multiplier (bounded, config over built-in)
+        slope *= p.pt_heat_mult.get(self.property_type, p.pt_heat_default)
 
         # Floor area sublinear scaling
-        area_exp = getattr(self.model, "heat_slope_area_exp", 0.6)
         if self.floor_area_m2 is not None and self.floor_area_m2 > 0:
-            slope *= max(0.7, min(1.6, (self.floor_area_m2 / 90.0) ** area_exp))
+            slope *= max(0.7, min(1.6, (self.floor_area_m2 / 90.0) ** p.heat_slope_area_exp))
         elif self.size_band is not None and (self.floor_area_m2 is None or self.floor_area_m2 <= 0):
             try:
-                sb = int(self.size_band)
-                if cfg:
-                    slope *= float(cfg.households.get("bedroom_multiplier", {}).get(sb, 1.0))
+                slope *= p.bedroom_mult.get(int(self.size_band), 1.0)
             except Exception:
                 pass
 
@@ -338,38 +308,28 @@ class HouseholdAgent(mg.GeoAgent):
         # Heating system nudges
         fuel = (self.main_fuel_type or "")
         heat = (self.main_heating_system or "")
-        systems_cfg = cfg.systems if cfg else {}
-        sys_mult = None
-        if "heat pump" in heat and "heat_pump" in systems_cfg:
-            sys_mult = systems_cfg.get("heat_pump", {}).get("heating_slope_mult", 0.70)
-        elif "electric" in fuel and "electric_heating" in systems_cfg:
-            sys_mult = systems_cfg.get("electric_heating", {}).get("heating_slope_mult", 1.00)
-        elif "gas" in fuel and "gas_boiler" in systems_cfg:
-            sys_mult = systems_cfg.get("gas_boiler", {}).get("heating_slope_mult", 1.00)
-        if sys_mult is not None:
-            slope *= sys_mult
+        sys_mult = p.system_slope_mult
+        if "heat pump" in heat and "heat_pump" in sys_mult:
+            slope *= sys_mult["heat_pump"]
+        elif "electric" in fuel and "electric_heating" in sys_mult:
+            slope *= sys_mult["electric_heating"]
+        elif "gas" in fuel and "gas_boiler" in sys_mult:
+            slope *= sys_mult["gas_boiler"]
 
         # Clamp
-        s_min = getattr(self.model, "heat_slope_min", 0.0)
-        s_max = getattr(self.model, "heat_slope_max", 0.10)
-        return max(s_min, min(s_max, slope))
+        return max(p.heat_slope_min, min(p.heat_slope_max, slope))
 
     def _compute_heat_capacity(self) -> float:
         """Compute per-dwelling heating capacity (kWh/h), sublinear in area, bounded."""
-        cfg = getattr(self.model, "config", None)
-        base_cap = float(getattr(self.model, "base_heat_capacity", 8.0))
-        cap = base_cap
+        p = self.model.config.params
+        cap = p.base_heat_capacity
 
-        # property type multiplier (reuse pt_heat_mult where available)
-        if cfg and isinstance(cfg.model, dict):
-            cap *= cfg.model.get("pt_heat_mult", {}).get(self.property_type, cfg.model.get("pt_heat_mult", {}).get("default", 1.0))
-        else:
-            cap *= PROPERTY_TYPE_MULT_HEAT.get(self.property_type, 1.0)
+        # property type multiplier (the configured pt_heat_mult only)
+        cap *= p.pt_capacity_mult.get(self.property_type, p.pt_heat_default)
 
         # floor area scaling (sublinear)
-        area_exp = getattr(self.model, "heat_capacity_area_exp", 0.5)
         if self.floor_area_m2 is not None and self.floor_area_m2 > 0:
-            cap *= max(0.7, min(1.6, (self.floor_area_m2 / 90.0) ** area_exp))
+            cap *= max(0.7, min(1.6, (self.floor_area_m2 / 90.0) ** p.heat_capacity_area_exp))
 
         # system type nudges
         heat = (self.main_heating_system or "").lower()
@@ -384,9 +344,7 @@ class HouseholdAgent(mg.GeoAgent):
             cap *= 1.1
 
         # bounds
-        min_cap = float(getattr(self.model, "min_heat_capacity", 4.0))
-        max_cap = float(getattr(self.model, "max_heat_kwh_per_hour", 20.0))
-        return max(min_cap, min(max_cap, cap))
+        return max(p.min_heat_capacity, min(p.max_heat_kwh_per_hour, cap))
 
     def refresh_hourly_base(self) -> None:  # NEW: call if levers change mid-run
         self._hourly_base_kwh = self._compute_hourly_base_kwh()  # NEW
@@ -403,6 +361,9 @@ class HouseholdAgent(mg.GeoAgent):
         self.base_kwh = 0.0
         self.heat_kwh = 0.0
         self.spike_kwh = 0.0
+
+    def clear_cap_clip(self) -> None:
+        # cap diagnostics: the model sets them only on dwellings it clips, and only when enabled
         self.cap_clip_total = 0.0
         self.cap_clip_base = 0.0
         self.cap_clip_heat = 0.0
@@ -427,7 +388,14 @@ class HouseholdAgent(mg.GeoAgent):
         cooling_threshold: float,
         heat_slope: Optional[float],
         cool_slope: float,
-        occupancy: Optional[int] = None,) -> None:
+        occupancy: Optional[int] = None,
+        occupied_share: Optional[float] = None,) -> None:
+        """Heating and cooling kWh for this tick at ``tempC``.
+
+        Both are halved while nobody is home: per hour from ``occupancy``, or
+        in proportion over a multi-hour step when ``occupied_share`` (the
+        share of its hours with anyone home) is given.
+        """
         self.ambient_tempC = float(tempC)
         if not math.isfinite(self.ambient_tempC):
             self.climate_heating_kWh = 0.0
@@ -445,7 +413,7 @@ class HouseholdAgent(mg.GeoAgent):
         loss_index = hd * eff_heat_slope
 
         # Duty cycle (0-1), soft saturation
-        K = float(getattr(self.model, "loss_to_duty_k", 3.0))
+        K = self.model.loss_to_duty_k
         duty = loss_index / (loss_index + K) if loss_index > 0 else 0.0
         duty = max(0.0, min(1.0, duty))
 
@@ -456,12 +424,17 @@ class HouseholdAgent(mg.GeoAgent):
         cool = cd * float(cool_slope)
 
         # Hard cap as safety net
-        max_heat = getattr(self.model, "max_heat_kwh_per_hour", None)
+        max_heat = self.model.max_heat_kwh_per_hour
         if max_heat is not None:
             heat = min(heat, float(max_heat))
 
         # Optional: dampen when nobody is home (simple heuristic)
-        if occupancy is not None and occupancy <= 0:
+        if occupied_share is not None:
+            if occupied_share < 1.0:
+                damp = 0.5 + 0.5 * occupied_share
+                heat *= damp
+                cool *= damp
+        elif occupancy is not None and occupancy <= 0:
             heat *= 0.5
             cool *= 0.5
 
@@ -505,22 +478,25 @@ class PersonAgent(mesa.Agent):
 
         self.energy: float = 0.0
 
-    def step(self) -> None:
-        """Update presence status and add corresponding kWh to household."""
-        hour = self.model.local_hour() if hasattr(self.model, "local_hour") else self.model.current_hour % 24
-
-        # presence logic with occupancy counter updates  # NEW
-        if self.leave_hour is None or self.return_hour is None:
-            self.at_home = True
-        else:
-            if self.at_home and hour == self.leave_hour:
-                self.at_home = False
-                self.home.occupancy_count -= 1   # NEW
-            elif (not self.at_home) and hour == self.return_hour:
-                self.at_home = True
-                self.home.occupancy_count += 1   # NEW
-
-        # energy spike
+        # NEW: schedules are fixed for the run, so presence and kWh are a pure
+        # function of local hour; precompute them once (indexed 0–23).
+        self.presence_by_hour: List[bool] = self._presence_by_hour()
+        base_spike = self._home_spike_kwh()
+        standby = self.model.energy_per_person_away
+        self.energy_by_hour: List[float] = [base_spike if home else standby for home in self.presence_by_hour]
+
+    def _presence_by_hour(self) -> List[bool]:
+        """At-home flag for each local hour: away from ``leave_hour`` until ``return_hour``."""
+        leave, ret = self.leave_hour, self.return_hour
+        if leave is None or ret is None or leave == ret:
+            return [True] * 24
+        if leave < ret:
+            return [not (leave <= hr < ret) for hr in range(24)]
+        # overnight absence (leave late, return next morning)
+        return [ret <= hr < leave for hr in range(24)]
+
+    def _home_spike_kwh(self) -> float:
+        """kWh added per hour while at home, scaled by wealth and SAP."""
         base_spike = self.model.energy_per_person_home
         if self.wealth == "high":
             base_spike *= 1.3
@@ -530,13 +506,206 @@ class PersonAgent(mesa.Agent):
             base_spike *= 1.2
         elif self.sap > 80:
             base_spike *= 0.8
+        return base_spike
 
-        if self.at_home:
-            self.home.spike_kwh += base_spike
-            self.home.energy_consumption += base_spike
-            self.energy = base_spike
-        else:
-            standby = self.model.energy_per_person_away
-            self.home.spike_kwh += standby
-            self.home.energy_consumption += standby
-            self.energy = standby
+    def step(self) -> None:
+        """Refresh presence and kWh for the current local hour.
+
+        The household's occupancy and spike load come from the model's
+        precomputed per-household tables, so this only updates the person's
+        own reporters (called by the model on agent-collection steps).
+        """
+        hour = self.model.step_hour() if hasattr(self.model, "step_hour") else self.model.current_hour % 24
+        self.at_home = self.presence_by_hour[hour]
+        self.energy = self.energy_by_hour[hour]
+
+
+# ────────────────────────────────────────────────────────────────────
+#  Compact (table-backed) agents
+# ────────────────────────────────────────────────────────────────────
+
+# HouseholdAgent attributes fixed for a run (or only changed by reconfigure / heat-pump policy)
+HOUSEHOLD_STATIC_ATTRS = (
+    "property_type", "sap_rating", "has_calibrated_energy", "hidp", "hh_n_people", "hh_children",
+    "hh_income", "hh_income_band", "hh_edu_detail", "dwelling_bucket", "tenure", "schedule_type",
+    "size_band", "annual_energy_kwh", "energy_demand", "floor_area_m2", "property_age", "main_fuel_type",
+    "main_heating_system", "heatpump_candidate_class", "heating_controls", "meter_type",
+    "is_heatpump_candidate", "has_heatpump", "was_heatpump_initial", "retrofit_envelope_score",
+    "imd_decile", "hp_effect_mult", "cwi_flag", "swi_flag", "loft_ins_flag", "floor_ins_flag",
+    "glazing_flag", "is_electric_heating", "is_gas", "is_oil", "is_solid_fuel", "is_off_gas",
+    "_hourly_base_kwh", "heat_slope_kWh_per_deg", "heat_capacity_kWh_per_hour",
+)
+# HouseholdAgent attributes rewritten every tick
+HOUSEHOLD_TICK_ATTRS = (
+    "energy_consumption", "residents", "clim_idx", "ambient_tempC", "climate_heating_kWh",
+    "climate_cooling_kWh", "occupancy_count", "base_kwh", "heat_kwh", "spike_kwh",
+    "cap_clip_total", "cap_clip_base", "cap_clip_heat", "cap_clip_spike",
+)
+# PersonAgent attributes fixed for a run
+PERSON_STATIC_ATTRS = ("schedule_profile", "leave_hour", "return_hour", "wealth", "sap")
+
+
+def _column_array(values: Sequence[Any]) -> np.ndarray:
+    """One table column: typed when the values allow it, else objects with equal values shared."""
+    if isinstance(values, np.ndarray) and values.dtype != object:
+        return values
+    column = np.fromiter(values, dtype=object, count=len(values))
+    # a column holding None stays object; pandas would turn None into NaN in a numeric one
+    if not any(v is None for v in column):
+        column = pd.Series(column).infer_objects().to_numpy()
+        if column.dtype != object:
+            return column
+    shared: Dict[Any, Any] = {}
+    try:
+        # keyed on the type too, so 1, 1.0 and True stay distinct
+        return np.fromiter((shared.setdefault((type(v), v), v) for v in column), dtype=object, count=len(column))
+    except TypeError:  # unhashable values are kept as they are
+        return column
+
+
+class AttributeTable:
+    """Column store for the static attributes of a population of agents.
+
+    One NumPy array per attribute, indexed by row: typed arrays for numeric
+    and boolean columns, object arrays (equal values sharing one object)
+    otherwise. A table-backed agent keeps only its row number and reads its
+    static attributes from here, one machine word per attribute instead of a
+    ``__dict__`` entry and a boxed value.
+    """
+
+    def __init__(self, columns: Dict[str, Sequence[Any]], index: Optional[pd.Index] = None) -> None:
+        self._arrays: Dict[str, np.ndarray] = {}
+        self._items: Dict[str, Any] = {}  # name -> the column's ``item`` (row -> Python value)
+        self.index = index
+        for name, values in columns.items():
+            self[name] = values
+
+    def __len__(self) -> int:
+        return len(next(iter(self._arrays.values()))) if self._arrays else 0
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._arrays
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self._arrays[name]
+
+    def __setitem__(self, name: str, values: Sequence[Any]) -> None:
+        column = _column_array(values)
+        if self._arrays and name not in self._arrays and len(column) != len(self):
+            raise ValueError(f"Column '{name}' has {len(column)} rows; the table has {len(self)}.")
+        self._arrays[name] = column
+        self._items[name] = column.item
+
+    @property
+    def columns(self) -> List[str]:
+        return list(self._arrays)
+
+    def get(self, name: str, row: int) -> Any:
+        """The value of ``name`` at ``row``, as a plain Python object."""
+        return self._items[name](row)
+
+    def set(self, name: str, row: int, value: Any) -> None:
+        """Write one value; a typed column that cannot hold it exactly becomes an object column."""
+        column = self._arrays[name]
+        if column.dtype != object and np.asarray(value).dtype.kind != column.dtype.kind:
+            column = self._arrays[name] = column.astype(object)
+            self._items[name] = column.item
+        column[row] = value
+
+    def frame(self) -> pd.DataFrame:
+        """The table as a DataFrame (a copy), for analysis."""
+        return pd.DataFrame(self._arrays, index=self.index)
+
+    def __getstate__(self) -> dict:
+        return {"arrays": self._arrays, "index": self.index}
+
+    def __setstate__(self, state: dict) -> None:
+        self.__init__(state["arrays"], state["index"])
+
+
+class TableAttribute:
+    """Data descriptor for one static attribute of a table-backed agent."""
+
+    __slots__ = ("name",)
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+
+    def __get__(self, obj: Any, owner: Optional[type] = None) -> Any:
+        if obj is None:
+            return self
+        return obj._table._items[self.name](obj._row)
+
+    def __set__(self, obj: Any, value: Any) -> None:
+        obj._table.set(self.name, obj._row, value)
+
+
+class CompactHouseholdAgent(HouseholdAgent):
+    """HouseholdAgent whose static attributes live in a shared AttributeTable.
+
+    Everything descriptive or derived (``HOUSEHOLD_STATIC_ATTRS``: property
+    type, flags, socio-demographics, heat slope, ...) is read from and written
+    to row ``_row`` of ``_table``; only the per-tick state is stored on the
+    agent, in slots. The EnergyModel builds these in bulk from
+    ``households.household_table``; the methods are HouseholdAgent's.
+    """
+
+    __slots__ = ("_table", "_row") + HOUSEHOLD_TICK_ATTRS
+
+    def __init__(
+        self,
+        model: "mesa.Model",
+        table: AttributeTable,
+        row: int,
+        geometry: BaseGeometry,
+        crs: Optional[str] = None,
+    ) -> None:
+        mg.GeoAgent.__init__(self, model=model, geometry=geometry, crs=crs)
+        self._table = table
+        self._row = row
+        self.unique_id = table.get("unique_id", row)
+        self._init_tick_state()
+
+
+class CompactPersonAgent(PersonAgent):
+    """PersonAgent whose schedule, wealth and SAP live in the model's person table.
+
+    Static fields (``PERSON_STATIC_ATTRS`` and the at-home kWh,
+    ``home_spike_kwh``) are row ``_row`` of ``_table``; presence by hour is
+    the same row of ``model.person_presence_by_hour``. Only the home link
+    and the per-tick state are stored on the agent, in slots.
+    """
+
+    __slots__ = ("_table", "_row", "home", "at_home", "energy")
+
+    def __init__(self, model: "mesa.Model", table: AttributeTable, row: int, home: HouseholdAgent) -> None:
+        mesa.Agent.__init__(self, model=model)
+        self._table = table
+        self._row = row
+        self.unique_id = table.get("unique_id", row)
+        self.home = home
+        self.at_home = True   # updated each tick
+        self.energy = 0.0
+
+    @property
+    def presence_by_hour(self) -> np.ndarray:
+        return self.model.person_presence_by_hour[self._row]
+
+    @property
+    def energy_by_hour(self) -> np.ndarray:
+        return np.where(self.presence_by_hour, self._home_spike_kwh(), self.model.energy_per_person_away)
+
+    def _home_spike_kwh(self) -> float:
+        return self._table.get("home_spike_kwh", self._row)
+
+    def step(self) -> None:
+        hour = self.model.step_hour() if hasattr(self.model, "step_hour") else self.model.current_hour % 24
+        self.at_home = bool(self.presence_by_hour[hour])
+        self.energy = self._home_spike_kwh() if self.at_home else self.model.energy_per_person_away
+
+
+for _name in HOUSEHOLD_STATIC_ATTRS:
+    setattr(CompactHouseholdAgent, _name, TableAttribute(_name))
+for _name in PERSON_STATIC_ATTRS:
+    setattr(CompactPersonAgent, _name, TableAttribute(_name))
+del _name
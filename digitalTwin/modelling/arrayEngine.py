@@ -0,0 +1,305 @@
+"""
+arrayEngine.py
+==============
+
+Opt-in struct-of-arrays stepping engine for EnergyModel.
+
+The agent loop in ``EnergyModel.step`` walks every HouseholdAgent several
+times per tick.  This engine copies the per-dwelling state into flat NumPy
+arrays once, after the model is built, and then computes a whole tick (base
+load, resident spikes, climate response, per-dwelling cap and the model-level
+aggregates) with vectorised expressions.  Resident occupancy and spikes come
+from the model's precomputed ``[N, 24]`` hour tables.
+
+The agents themselves are left in place but are not updated per tick; the
+agent recorder reads the arrays directly, and ``sync_agents()`` writes the
+current tick back onto the agent objects when they need inspecting.
+
+Households don't interact within a tick, so with ``workers > 1`` the
+dwellings are split into that many partitions (grouped by climate grid cell,
+or by a key such as ward code) and each tick's partitions are computed on a
+thread pool.  NumPy releases the GIL inside the array kernels, so the threads
+run in parallel on the shared arrays; each partition writes its own slots of
+the per-dwelling outputs and returns partial totals, which are then summed.
+
+Enable with ``EnergyModel(..., engine="array")`` or ``model.engine: array`` in
+the config YAML (``engine_workers`` / ``partition_by`` for the parallel mode).
+"""
+
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Optional
+
+import numpy as np
+import pandas as pd
+
+from .agent import PROPERTY_TYPES, WEALTH_GROUPS
+
+if TYPE_CHECKING:  # pragma: no cover - typing only
+    from .model import EnergyModel
+
+CAP_CLIP_ATTRS = ("cap_clip_total", "cap_clip_base", "cap_clip_heat", "cap_clip_spike")
+# per-dwelling outputs written every tick
+TICK_ARRAYS = ("spike_kwh", "heat_kwh", "cool_kwh", "energy_consumption")
+
+
+def clip_attribution(clip: np.ndarray, base: np.ndarray, heat: np.ndarray,
+                     spike: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Split each dwelling's clipped kWh over base, heat and spike in proportion to them.
+
+    Dwellings whose three components sum to zero get no attribution.
+    """
+    denom = base + heat + spike
+    safe = np.where(denom > 0, denom, 1.0)
+    return (np.where(denom > 0, clip * base / safe, 0.0),
+            np.where(denom > 0, clip * heat / safe, 0.0),
+            np.where(denom > 0, clip * spike / safe, 0.0))
+
+
+class HouseholdBlock:
+    """Static inputs for one partition of households (all of them when ``idx`` is None)."""
+
+    def __init__(self, engine: "ArrayEngine", idx: Optional[np.ndarray] = None) -> None:
+        take = (lambda a: a) if idx is None else (lambda a: a[idx])
+        self.idx = idx
+        self.base_kwh = take(engine.base_kwh)
+        self.heat_slope = take(engine.heat_slope)
+        self.heat_capacity = take(engine.heat_capacity)
+        self.hp_mult = take(engine.hp_mult)
+        self.clim_idx = take(engine.clim_idx)
+        self.clim_weights = None if engine.clim_weights is None else take(engine.clim_weights)  # sparse rows
+        self.ptype_idx = take(engine.ptype_idx)
+        self.occupancy_by_hour = take(engine.model.occupancy_by_hour)
+        self.occupied_share_by_hour = take(engine.model.occupied_share_by_hour)
+        self.spike_kwh_by_hour = take(engine.model.spike_kwh_by_hour)
+        self.mapped = self.clim_idx >= 0
+        self.known_type = self.ptype_idx >= 0
+        self.clipped = np.empty(0, dtype=np.int64)  # rows (of the engine's arrays) clipped last tick
+
+
+class ArrayEngine:
+    """Vectorised per-tick update over all households."""
+
+    def __init__(self, model: "EnergyModel", workers: int = 1, partition_keys=None) -> None:
+        self.model = model
+        houses = model.household_agents
+        n = len(houses)
+        self.n_households = n
+
+        # ---- static household state ---------------------------------
+        self.base_kwh = np.fromiter((h.calc_base_energy() for h in houses), dtype=float, count=n)
+        self.heat_slope = np.fromiter(
+            (getattr(h, "heat_slope_kWh_per_deg", model.heating_slope_kWh_per_deg) for h in houses),
+            dtype=float, count=n,
+        )
+        self.heat_capacity = np.fromiter((h.heat_capacity_kWh_per_hour for h in houses), dtype=float, count=n)
+        self.hp_mult = np.fromiter(
+            (h.hp_effect_mult if h.has_heatpump else 1.0 for h in houses), dtype=float, count=n,
+        )
+        self.clim_idx = np.fromiter(
+            (-1 if h.clim_idx is None else h.clim_idx for h in houses), dtype=np.int64, count=n,
+        )
+        self.clim_weights = model._clim_weights  # sparse [N, P] when climate_interpolation="idw"
+        ptype_pos = {t: i for i, t in enumerate(PROPERTY_TYPES)}
+        self.ptype_idx = np.fromiter(
+            (ptype_pos.get(getattr(h, "property_type", ""), -1) for h in houses), dtype=np.int64, count=n,
+        )
+
+        # ---- dynamic state ------------------------------------------
+        self.occupancy = np.fromiter((h.occupancy_count for h in houses), dtype=np.int64, count=n)
+        self.energy_consumption = np.zeros(n)
+        self.heat_kwh = np.zeros(n)
+        self.cool_kwh = np.zeros(n)
+        self.spike_kwh = np.zeros(n)
+        self.ambient_tempC = np.full(n, np.nan)
+        # cap diagnostics (clipped kWh and its base / heat / spike shares), kept only when enabled;
+        # each tick rewrites just the rows clipped then and the tick before
+        self.cap_diagnostics = bool(getattr(model, "cap_diagnostics", False))
+        for name in CAP_CLIP_ATTRS:
+            setattr(self, name, np.zeros(n) if self.cap_diagnostics else None)
+
+        # ---- partitions ---------------------------------------------
+        self.workers = max(1, int(workers))
+        if self.workers == 1 or n < 2:
+            self.blocks = [HouseholdBlock(self)]
+            self.pool = None
+        else:
+            self.blocks = [HouseholdBlock(self, idx) for idx in self.partition(partition_keys)]
+            self.pool = ThreadPoolExecutor(max_workers=len(self.blocks), thread_name_prefix="array-engine")
+
+    def partition(self, keys=None) -> list[np.ndarray]:
+        """Split households into ``workers`` equal-sized index sets, keeping equal keys together.
+
+        ``keys`` is one value per household (e.g. ward code); by default the
+        climate grid cell, so each partition gathers from a compact set of cells.
+        """
+        codes = self.clim_idx if keys is None else pd.factorize(np.asarray(keys, dtype=object))[0]
+        order = np.argsort(codes, kind="stable")
+        parts = np.array_split(order, min(self.workers, self.n_households))
+        return [np.sort(p) for p in parts]
+
+    def close(self) -> None:
+        if self.pool is not None:
+            self.pool.shutdown(wait=True)
+            self.pool = None
+
+    def __getstate__(self) -> dict:
+        state = dict(self.__dict__)
+        state["pool"] = None  # threads don't pickle; started again on load
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        if len(self.blocks) > 1:
+            self.pool = ThreadPoolExecutor(max_workers=len(self.blocks), thread_name_prefix="array-engine")
+
+    # ------------------------------------------------------------------
+    #  Per-tick update
+    # ------------------------------------------------------------------
+    def step(self) -> float:
+        """Advance all households by one tick; returns the tick total (kWh)."""
+        m = self.model
+        n = self.n_households
+        hour = m.step_hour()
+
+        climate_on = m.climate is not None and m._clim_idx_per_house is not None
+        vecP = None
+        if climate_on:
+            vecP = m.climate_temps()
+
+        if self.pool is None:
+            partials = [self._step_block(self.blocks[0], hour, climate_on, vecP)]
+        else:
+            # fresh outputs each tick; partitions fill disjoint slots
+            self.occupancy = np.empty(n, dtype=np.int64)
+            for name in TICK_ARRAYS:
+                setattr(self, name, np.empty(n))
+            if climate_on:
+                self.ambient_tempC = np.empty(n)
+            partials = list(self.pool.map(lambda b: self._step_block(b, hour, climate_on, vecP), self.blocks))
+
+        # reduce the partition totals
+        total = sum(p[0] for p in partials)
+        by_type = partials[0][1] if len(partials) == 1 else np.sum([p[1] for p in partials], axis=0)
+        m.energy_by_type = {t: float(v) for t, v in zip(PROPERTY_TYPES, by_type)}
+        m.energy_by_wealth = dict(zip(WEALTH_GROUPS, m.energy_by_wealth_by_hour[hour].tolist()))
+        return float(total)
+
+    def scale_tick(self, factor: float) -> None:
+        """Scale this tick's per-dwelling kWh (computed as hourly rates) to the model's step length."""
+        for name in TICK_ARRAYS:
+            setattr(self, name, getattr(self, name) * factor)
+        if self.cap_diagnostics:
+            rows = np.concatenate([b.clipped for b in self.blocks])
+            for name in CAP_CLIP_ATTRS:
+                getattr(self, name)[rows] *= factor
+
+    def _store(self, block: HouseholdBlock, **arrays) -> None:
+        for name, values in arrays.items():
+            if block.idx is None:
+                setattr(self, name, values)
+            else:
+                getattr(self, name)[block.idx] = values
+
+    def _step_block(self, block: HouseholdBlock, hour: int, climate_on: bool, vecP) -> tuple[float, np.ndarray]:
+        """One tick for one partition; writes its per-dwelling outputs, returns (total, kWh by type)."""
+        m = self.model
+        n = len(block.base_kwh)
+
+        # 1) residents: occupancy + spikes for this local hour
+        occupancy = block.occupancy_by_hour[:, hour]
+        spike = block.spike_kwh_by_hour[:, hour]
+
+        # 2) climate
+        heat = np.zeros(n)
+        cool = np.zeros(n)
+        if climate_on:
+            temps = np.full(n, np.nan)
+            if vecP is not None:
+                if block.clim_weights is None:
+                    temps[block.mapped] = vecP[block.clim_idx[block.mapped]]
+                else:  # IDW: one sparse matvec over the partition's weight rows
+                    temps[block.mapped] = (block.clim_weights @ vecP)[block.mapped]
+            self._store(block, ambient_tempC=temps)
+            occupied = block.occupied_share_by_hour[:, hour] if vecP is not None else None
+            heat, cool = self._climate_kwh(block, temps, occupied)
+
+        # 3) total + per-dwelling cap
+        total = block.base_kwh + spike + heat + cool
+        max_total = getattr(m, "max_total_kwh_per_hour", None)
+        if max_total is not None:
+            over = np.flatnonzero(total > max_total)
+            if self.cap_diagnostics:
+                self._record_clips(block, over, total[over] - max_total, heat[over], spike[over])
+            total[over] = max_total
+        self._store(block, occupancy=occupancy, spike_kwh=spike, heat_kwh=heat, cool_kwh=cool,
+                    energy_consumption=total)
+
+        # 4) partial aggregates
+        known = block.known_type
+        by_type = np.bincount(block.ptype_idx[known], weights=total[known], minlength=len(PROPERTY_TYPES))
+        return total.sum(), by_type
+
+    def _record_clips(self, block: HouseholdBlock, over: np.ndarray, clip: np.ndarray,
+                      heat: np.ndarray, spike: np.ndarray) -> None:
+        """Cap diagnostics for the block's clipped dwellings; zeroes the ones clipped last tick."""
+        rows = over if block.idx is None else block.idx[over]
+        for name in CAP_CLIP_ATTRS:
+            getattr(self, name)[block.clipped] = 0.0
+        if len(over):
+            shares = clip_attribution(clip, block.base_kwh[over], heat, spike)
+            for name, values in zip(CAP_CLIP_ATTRS, (clip, *shares)):
+                getattr(self, name)[rows] = values
+        block.clipped = rows
+
+    def _climate_kwh(self, block: HouseholdBlock, temps: np.ndarray,
+                     occupied: np.ndarray | None) -> tuple[np.ndarray, np.ndarray]:
+        """Vectorised ``HouseholdAgent.apply_climate`` (heating, cooling kWh)."""
+        m = self.model
+        finite = np.isfinite(temps)
+        db = 0.5  # thermostat deadband (°C), as in apply_climate
+        with np.errstate(invalid="ignore", divide="ignore"):
+            hd = np.maximum(0.0, (m.heating_setpoint_C - temps) - db)
+            cd = np.maximum(0.0, (temps - m.cooling_threshold_C) - db)
+            loss_index = hd * block.heat_slope * block.hp_mult
+            K = float(getattr(m, "loss_to_duty_k", 3.0))
+            duty = np.where(loss_index > 0, loss_index / (loss_index + K), 0.0)
+        duty = np.clip(duty, 0.0, 1.0)
+        heat = duty * block.heat_capacity
+        cool = cd * float(m.cooling_slope_kWh_per_deg)
+        max_heat = getattr(m, "max_heat_kwh_per_hour", None)
+        if max_heat is not None:
+            heat = np.minimum(heat, float(max_heat))
+        if occupied is not None:
+            # halved while nobody is home, pro rata over a multi-hour step
+            damp = 0.5 + 0.5 * occupied.astype(np.float64)
+            heat = heat * damp
+            cool = cool * damp
+        return np.where(finite, heat, 0.0), np.where(finite, cool, 0.0)
+
+    def mean_ambient_tempC(self) -> float:
+        finite = self.ambient_tempC[np.isfinite(self.ambient_tempC)]
+        if finite.size == 0:
+            return float("nan")
+        return float(finite.mean())
+
+    # ------------------------------------------------------------------
+    #  Write-back for agent-level reporters / inspection
+    # ------------------------------------------------------------------
+    def sync_agents(self) -> None:
+        """Copy the current tick's arrays back onto the agent objects."""
+        for i, h in enumerate(self.model.household_agents):
+            h.energy_consumption = float(self.energy_consumption[i])
+            h.base_kwh = float(self.base_kwh[i]) * self.model.step_hours
+            h.heat_kwh = float(self.heat_kwh[i])
+            h.spike_kwh = float(self.spike_kwh[i])
+            h.climate_heating_kWh = float(self.heat_kwh[i])
+            h.climate_cooling_kWh = float(self.cool_kwh[i])
+            h.ambient_tempC = float(self.ambient_tempC[i])
+            h.occupancy_count = int(self.occupancy[i])
+            if self.cap_diagnostics:
+                h.cap_clip_total = float(self.cap_clip_total[i])
+                h.cap_clip_base = float(self.cap_clip_base[i])
+                h.cap_clip_heat = float(self.cap_clip_heat[i])
+                h.cap_clip_spike = float(self.cap_clip_spike[i])
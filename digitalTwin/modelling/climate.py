@@ -1,13 +1,35 @@
 # climate.py
+import copy
+import json
+import os
+import shutil
+import tempfile
+import threading
+from collections import OrderedDict
+
 import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import scipy.sparse as sp
 from scipy.spatial import cKDTree
-from typing import Optional, Literal
+from typing import Dict, Optional, Literal
+
+CLIMATE_TRANSFORMS = ("base", "add", "subtract", "extreme")  # ClimateModel.temp_var_Type values
+
 
 class ClimateField:
     """
     Holds hourly 2m temps as a 2D array [T, P], timestamps [T],
-    and maps households to nearest climate point.
+    and maps households to nearest climate point (or to inverse-distance
+    weights over their k nearest points, see idw_weights).
+
+    By default the temps are a read-only memory map of a binary cache built
+    once from the parquet (see build_cache), so construction costs milliseconds
+    and only the hours a run steps through are paged in. A bounding box keeps
+    the full-width map and picks its points out of each row read, so every
+    process working on the same file shares the OS page cache.
     """
 
     # ─────────────────────────────────────────────────────────────
@@ -20,6 +42,9 @@ class ClimateField:
         verbose: bool = True,
         allow_duplicates: bool = True,
         return_summary: bool = False,
+        streaming: bool = False,
+        threads: bool = True,
+        batch_size: int = 1 << 20,
     ):
         """
         Inspect a climate parquet and report whether it is a full T×P grid.
@@ -35,6 +60,12 @@ class ClimateField:
             If True, drop exact duplicate (timestamp, lat, lon) rows before checking.
         return_summary : bool
             If True, return a dict with detailed stats.
+        streaming : bool
+            If True, scan record batches instead of loading the file into pandas
+            (see _scan_grid_counts). Same result, in memory bounded by the grid
+            size rather than the file size.
+        threads, batch_size
+            Streaming only: decode batches on pyarrow's thread pool, and rows per batch.
 
         Returns
         -------
@@ -43,32 +74,38 @@ class ClimateField:
         summary : dict         (if return_summary=True) with keys:
             rows, T, P, TP, dupes, missing_timestamps, min_per_ts, med_per_ts, max_per_ts
         """
-        cols = ["timestamp", "latitude", "longitude", "temp_C"]
-        df = pd.read_parquet(parquet_path, engine="pyarrow")[cols].copy()
-
-        # basic hygiene
-        if allow_duplicates:
-            dupes = int(df.duplicated(["timestamp", "latitude", "longitude"]).sum())
-            if dupes:
-                df = df.drop_duplicates(["timestamp", "latitude", "longitude"], keep="first")
+        if streaming:
+            rows, dupes, per_ts, P = ClimateField._scan_grid_counts(
+                parquet_path, allow_duplicates=allow_duplicates, threads=threads, batch_size=batch_size)
+            T = len(per_ts)
         else:
-            dupes = int(df.duplicated(["timestamp", "latitude", "longitude"]).sum())
+            cols = ["timestamp", "latitude", "longitude", "temp_C"]
+            df = pd.read_parquet(parquet_path, engine="pyarrow")[cols].copy()
+
+            # basic hygiene
+            if allow_duplicates:
+                dupes = int(df.duplicated(["timestamp", "latitude", "longitude"]).sum())
+                if dupes:
+                    df = df.drop_duplicates(["timestamp", "latitude", "longitude"], keep="first")
+            else:
+                dupes = int(df.duplicated(["timestamp", "latitude", "longitude"]).sum())
 
-        # compute T, P and per-timestamp counts
-        df = df.sort_values(["timestamp", "latitude", "longitude"], kind="mergesort").reset_index(drop=True)
-        T  = df["timestamp"].nunique()
-        P  = df[["latitude","longitude"]].drop_duplicates().shape[0]
-        per_ts = df.groupby("timestamp").size()
+            # compute T, P and per-timestamp counts
+            df = df.sort_values(["timestamp", "latitude", "longitude"], kind="mergesort").reset_index(drop=True)
+            rows = len(df)
+            T  = df["timestamp"].nunique()
+            P  = df[["latitude","longitude"]].drop_duplicates().shape[0]
+            per_ts = df.groupby("timestamp").size()
         min_per_ts = int(per_ts.min())
         med_per_ts = int(per_ts.median())
         max_per_ts = int(per_ts.max())
         gaps = int((per_ts != P).sum())
-        is_rect = (len(df) == T * P) and (gaps == 0)
+        is_rect = (rows == T * P) and (gaps == 0)
 
         if verbose:
             print(f"[Climate parquet check]")
             print(f"  File: {parquet_path}")
-            print(f"  Rows: {len(df):,} | T: {T:,} | P: {P:,} | T×P: {T*P:,}")
+            print(f"  Rows: {rows:,} | T: {T:,} | P: {P:,} | T×P: {T*P:,}")
             print(f"  Duplicates dropped: {dupes}")
             print(f"  Rows per timestamp → min/median/max: {min_per_ts}/{med_per_ts}/{max_per_ts}")
             if is_rect:
@@ -85,17 +122,129 @@ class ClimateField:
 
         if return_summary:
             return dict(
-                rows=len(df), T=int(T), P=int(P), TP=int(T*P),
+                rows=int(rows), T=int(T), P=int(P), TP=int(T*P),
                 dupes=dupes, missing_timestamps=gaps,
                 min_per_ts=min_per_ts, med_per_ts=med_per_ts, max_per_ts=max_per_ts,
                 rectangular=is_rect,
             )
         return is_rect
-    
-    def __init__(self, parquet_path: str):
-        df = pd.read_parquet(parquet_path, engine="pyarrow")[
-            ["timestamp", "latitude", "longitude", "temp_C"]
-        ]
+
+    @staticmethod
+    def _scan_grid_counts(parquet_path: str, *, allow_duplicates: bool = True,
+                          threads: bool = True, batch_size: int = 1 << 20):
+        """
+        Streaming counterpart of the pandas checks in validate_parquet.
+
+        Two passes over record batches of (timestamp, latitude, longitude):
+        the first collects the distinct timestamps and the distinct
+        (lat, lon) points that occur, the second marks each row's
+        (timestamp, point) cell in a bitmap, so duplicates are cells seen
+        before. Memory is the bitmap (T × P bits, whether or not the points
+        form a regular grid) plus a few arrays of length T and P, rather than
+        several copies of the file.
+
+        Returns (rows, dupes, per_ts, P), where ``per_ts`` is rows per timestamp
+        (a Series indexed by timestamp) and rows/per_ts exclude duplicates when
+        ``allow_duplicates`` is True, as validate_parquet does after dropping them.
+        """
+        dataset = ds.dataset(parquet_path, format="parquet")
+        ts_type = dataset.schema.field("timestamp").type
+        cols = ["timestamp", "latitude", "longitude"]
+
+        def batches():
+            # little readahead: memory stays at about one row group
+            return dataset.to_batches(columns=cols, batch_size=batch_size, use_threads=threads,
+                                      batch_readahead=2, fragment_readahead=1)
+
+        # pass 1: distinct timestamps and (lat, lon) points
+        seen_ts, seen_points = [], []
+        for batch in batches():
+            seen_ts.append(pc.unique(batch.column("timestamp")).to_numpy())
+            latlon = np.c_[batch.column("latitude").to_numpy(), batch.column("longitude").to_numpy()]
+            seen_points.append(np.unique(latlon, axis=0))
+        ts_all = np.unique(np.concatenate(seen_ts)) if seen_ts else np.empty(0)
+        points = np.unique(np.concatenate(seen_points), axis=0) if seen_points else np.empty((0, 2))
+        del seen_ts, seen_points
+        lat_all, lon_all = np.unique(points[:, 0]), np.unique(points[:, 1])
+        T, P, n_lon = len(ts_all), len(points), len(lon_all)
+        # points sort by (lat, lon), so their lat/lon codes are sorted too: a row's point is a searchsorted away
+        point_code = np.searchsorted(lat_all, points[:, 0]) * n_lon + np.searchsorted(lon_all, points[:, 1])
+
+        # pass 2: per-timestamp counts, duplicates via the (timestamp, point) bitmap
+        bitmap = np.zeros((T * P + 7) // 8, dtype=np.uint8)
+        count_all = np.zeros(T, dtype=np.int64)
+        count_unique = np.zeros(T, dtype=np.int64)
+        dupes = 0
+        for batch in batches():
+            if batch.num_rows == 0:
+                continue
+            ti = np.searchsorted(ts_all, batch.column("timestamp").to_numpy())
+            code = (np.searchsorted(lat_all, batch.column("latitude").to_numpy()) * n_lon
+                    + np.searchsorted(lon_all, batch.column("longitude").to_numpy()))
+            pi = np.searchsorted(point_code, code)
+            count_all += np.bincount(ti, minlength=T)
+            cell = np.sort(ti * P + pi)
+            cell = cell[np.r_[True, cell[1:] != cell[:-1]]]  # drops repeats within the batch
+            byte, bit = cell >> 3, (1 << (cell & 7)).astype(np.uint8)
+            new = (bitmap[byte] & bit) == 0
+            np.bitwise_or.at(bitmap, byte[new], bit[new])
+            count_unique += np.bincount(cell[new] // P, minlength=T)
+            dupes += batch.num_rows - int(new.sum())
+
+        counts = count_unique if allow_duplicates else count_all
+        index = pd.to_datetime(ts_all, utc=getattr(ts_type, "tz", None) is not None)
+        per_ts = pd.Series(counts, index=index)
+        return int(counts.sum()), dupes, per_ts, P
+
+    # ─────────────────────────────────────────────────────────────
+    # Binary cache: times.npy [T], points.npy [P,2], temps.npy [T,P],
+    # point_mean.npy [P] (each point's mean over the whole file)
+    # ─────────────────────────────────────────────────────────────
+    CACHE_VERSION = 2
+
+    @staticmethod
+    def _utc64(ts) -> np.datetime64:
+        """Any timestamp-like -> tz-naive datetime64[ns] UTC instant (the dtype of self.times)."""
+        return pd.to_datetime(ts, utc=True).to_datetime64()
+
+    @classmethod
+    def _window_filter(cls, dataset, start=None, end=None, bbox=None):
+        """pyarrow filter expression for timestamps in [start, end) and points inside bbox."""
+        ts_type = dataset.schema.field("timestamp").type
+        filt = None
+
+        def _and(expr):
+            return expr if filt is None else filt & expr
+
+        for bound, op in ((start, "ge"), (end, "lt")):
+            if bound is None:
+                continue
+            value = pd.Timestamp(cls._utc64(bound))  # naive UTC
+            if pa.types.is_timestamp(ts_type) and ts_type.tz is not None:
+                value = value.tz_localize("UTC")
+            scalar = pa.scalar(value, type=ts_type)
+            filt = _and(ds.field("timestamp") >= scalar if op == "ge" else ds.field("timestamp") < scalar)
+        if bbox is not None:
+            min_lat, min_lon, max_lat, max_lon = bbox
+            filt = _and((ds.field("latitude") >= min_lat) & (ds.field("latitude") <= max_lat)
+                        & (ds.field("longitude") >= min_lon) & (ds.field("longitude") <= max_lon))
+        return filt
+
+    @classmethod
+    def _read_grid(cls, parquet_path: str, start=None, end=None, bbox=None):
+        """
+        Decode a climate parquet into (times [T], points [P,2], temps [T,P]).
+
+        ``start``/``end`` ([start, end)) and ``bbox`` (min_lat, min_lon, max_lat, max_lon)
+        are pushed down to the parquet reader, so row groups outside them are skipped.
+        """
+        dataset = ds.dataset(parquet_path, format="parquet")
+        df = dataset.to_table(
+            columns=["timestamp", "latitude", "longitude", "temp_C"],
+            filter=cls._window_filter(dataset, start, end, bbox),
+        ).to_pandas()
+        if df.empty:
+            raise ValueError(f"No climate data in {parquet_path} for window [{start}, {end}) and bbox {bbox}.")
         # ✅ normalise timestamps to UTC first
         df["timestamp"] = pd.to_datetime(df["timestamp"], utc=True)
         df = df.sort_values(["timestamp", "latitude", "longitude"], kind="mergesort")
@@ -116,35 +265,373 @@ class ClimateField:
         )
 
         temps = df["temp_C"].to_numpy(dtype=np.float32).reshape(T, P)
+        return times, points, temps
+
+    @staticmethod
+    def _grid_mean(temps: np.ndarray) -> np.ndarray:
+        """Per-point mean of a [T, P] grid over its hours, as float32 [P]."""
+        return temps.mean(axis=0, dtype=np.float64).astype(np.float32)
+
+    @staticmethod
+    def cache_dir_for(parquet_path: str) -> str:
+        """Default cache location: a ``<file>.npcache`` directory next to the parquet."""
+        return os.fspath(parquet_path) + ".npcache"
+
+    @classmethod
+    def _source_stamp(cls, parquet_path: str) -> dict:
+        st = os.stat(parquet_path)
+        return {"version": cls.CACHE_VERSION, "size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+    @classmethod
+    def cache_is_current(cls, parquet_path: str, cache_dir: Optional[str] = None) -> bool:
+        """True if the cache exists and was built from the parquet as it is now (size + mtime)."""
+        cache_dir = cache_dir or cls.cache_dir_for(parquet_path)
+        try:
+            with open(os.path.join(cache_dir, "meta.json")) as f:
+                return json.load(f) == cls._source_stamp(parquet_path)
+        except (OSError, ValueError):
+            return False
+
+    @classmethod
+    def build_cache(cls, parquet_path: str, cache_dir: Optional[str] = None) -> str:
+        """
+        One-time conversion of a climate parquet into the binary cache that
+        ClimateField memory-maps. Rebuilds only if the parquet changed.
+
+        Returns the cache directory.
+        """
+        cache_dir = cache_dir or cls.cache_dir_for(parquet_path)
+        if cls.cache_is_current(parquet_path, cache_dir):
+            return cache_dir
+
+        stamp = cls._source_stamp(parquet_path)
+        times, points, temps = cls._read_grid(parquet_path)
+
+        # write into a sibling temp dir, then swap it in, so readers never see a partial cache
+        parent = os.path.dirname(os.path.abspath(cache_dir))
+        tmp = tempfile.mkdtemp(prefix=".climate-cache-", dir=parent)
+        try:
+            np.save(os.path.join(tmp, "times.npy"), times)
+            np.save(os.path.join(tmp, "points.npy"), points)
+            np.save(os.path.join(tmp, "temps.npy"), np.ascontiguousarray(temps))
+            np.save(os.path.join(tmp, "point_mean.npy"), cls._grid_mean(temps))
+            with open(os.path.join(tmp, "meta.json"), "w") as f:
+                json.dump(stamp, f)
+            if os.path.isdir(cache_dir):
+                shutil.rmtree(cache_dir)
+            os.replace(tmp, cache_dir)
+        except OSError:
+            shutil.rmtree(tmp, ignore_errors=True)
+            if not cls.cache_is_current(parquet_path, cache_dir):  # lost a race to another builder?
+                raise
+        return cache_dir
+
+    def __init__(
+        self,
+        parquet_path: str,
+        *,
+        start=None,
+        end=None,
+        bbox: Optional[tuple] = None,
+        cache: bool = True,
+        cache_dir: Optional[str] = None,
+    ):
+        """
+        Parameters
+        ----------
+        parquet_path : str
+            Climate parquet with columns ['timestamp','latitude','longitude','temp_C'].
+        start, end : timestamp-like, optional
+            Keep only hours in [start, end). Naive values are read as UTC.
+        bbox : (min_lat, min_lon, max_lat, max_lon), optional
+            Keep only grid points inside this box. Pad it by at least one grid
+            spacing around the households so nearest-point mapping is unchanged.
+        cache : bool
+            If True (default), open the binary cache (building it on first use) and
+            memory-map the temps, so only the hours a run touches are read from disk.
+            A bbox keeps the full-width map and gathers its points from each row
+            read, so every process windowing the same file shares its page cache.
+            If False, decode the parquet directly, pushing the window and bbox
+            down to the reader.
+        cache_dir : str, optional
+            Cache location (default: ``<parquet_path>.npcache``).
+        """
+        cols = None  # grid columns of the kept points, when gathered from a full-width memmap
+        point_mean = None
+        if cache:
+            cache_dir = self.build_cache(parquet_path, cache_dir)
+            times  = np.load(os.path.join(cache_dir, "times.npy"))
+            points = np.load(os.path.join(cache_dir, "points.npy"))
+            temps  = np.load(os.path.join(cache_dir, "temps.npy"), mmap_mode="r")  # [T, P], row per hour
+            point_mean = np.load(os.path.join(cache_dir, "point_mean.npy"))
+
+            t0 = 0 if start is None else int(np.searchsorted(times, self._utc64(start), side="left"))
+            t1 = len(times) if end is None else int(np.searchsorted(times, self._utc64(end), side="left"))
+            times, temps = times[t0:t1], temps[t0:t1]  # still a memmap: no data read yet
+            if bbox is not None:
+                min_lat, min_lon, max_lat, max_lon = bbox
+                keep = ((points[:, 0] >= min_lat) & (points[:, 0] <= max_lat)
+                        & (points[:, 1] >= min_lon) & (points[:, 1] <= max_lon))
+                points, cols = points[keep], np.flatnonzero(keep)
+                point_mean = point_mean[keep]
+                if len(cols) == len(keep):
+                    cols = None
+            if len(times) == 0 or len(points) == 0:
+                raise ValueError(f"No climate data in {parquet_path} for window [{start}, {end}) and bbox {bbox}.")
+        else:
+            times, points, temps = self._read_grid(parquet_path, start, end, bbox)
+
+        for arr in (times, points, temps) + tuple(a for a in (cols, point_mean) if a is not None):
+            arr.setflags(write=False)    # read-only: one field may be shared by many models (see ClimateCache)
         self.points = points
         self.times  = times              # dtype datetime64[ns], UTC-normalised
-        self.temps  = temps
+        self._grid  = temps              # [T, P] rows, or [T, full width] memmap with _cols
+        self._cols  = cols
         self._tree  = cKDTree(points[:, [0,1]])
+        self.transform: tuple[str, float] = ("base", 0.0)  # applied on read, see variant()
+        self._base_field: Optional["ClimateField"] = None  # set on variants
+        self._point_mean: Optional[np.ndarray] = point_mean  # read on first use when not cached
+        self._source = (parquet_path, bbox)
+
+    @property
+    def temps(self) -> np.ndarray:
+        """Temps [T, P] of the kept points. Gathered into a new array when a bbox windows
+        a memory-mapped field, so per-step reads go through temps_at_index / temps_for_step."""
+        if self._cols is None:
+            return self._grid
+        temps = self._grid[:, self._cols]
+        temps.setflags(write=False)
+        return temps
+
+    @property
+    def is_mapped(self) -> bool:
+        """True if the temps are read from the binary cache file rather than held in memory."""
+        return isinstance(self._grid, np.memmap)
+
+    def _rows(self, rows) -> np.ndarray:
+        block = self._grid[rows]
+        return block if self._cols is None else block[..., self._cols]
+
+    @property
+    def nbytes(self) -> int:
+        """Process memory held by the field. Memory-mapped temps live in the OS page cache instead."""
+        held = self.times.nbytes + self.points.nbytes + (0 if self._cols is None else self._cols.nbytes)
+        held += 0 if self._point_mean is None else self._point_mean.nbytes
+        return held if self.is_mapped else held + self._grid.nbytes
+
+    @staticmethod
+    def household_bbox(lats, lons, margin: float = 0.5) -> tuple:
+        """(min_lat, min_lon, max_lat, max_lon) around the households, padded by ``margin`` degrees."""
+        return (float(np.min(lats)) - margin, float(np.min(lons)) - margin,
+                float(np.max(lats)) + margin, float(np.max(lons)) + margin)
 
     def map_households(self, lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
         """Return nearest climate point index for each (lat, lon)."""
         _, idx = self._tree.query(np.c_[lats.astype(np.float32), lons.astype(np.float32)], k=1)
         return idx.astype(np.int32)
 
+    def idw_weights(self, lats: np.ndarray, lons: np.ndarray, k: int = 4, power: float = 2.0) -> sp.csr_matrix:
+        """
+        Inverse-distance weights over each (lat, lon)'s k nearest climate points,
+        as a sparse [N, P] matrix with rows summing to 1, so that
+        ``weights @ temps_at_index(t)`` is every household's temperature at t.
+        Distances are in degrees, as for map_households; a household sitting
+        on a grid point takes that point's value.
+        """
+        n, P = len(lats), len(self.points)
+        k = max(1, min(int(k), P))
+        dist, idx = self._tree.query(np.c_[lats.astype(np.float32), lons.astype(np.float32)], k=k)
+        dist, idx = dist.reshape(n, k), idx.reshape(n, k)
+        with np.errstate(divide="ignore"):
+            w = 1.0 / dist ** power
+        exact = dist[:, 0] == 0
+        w[exact] = 0.0
+        w[exact, 0] = 1.0
+        w /= w.sum(axis=1, keepdims=True)
+        return sp.csr_matrix((w.ravel(), idx.ravel(), np.arange(0, n * k + 1, k)), shape=(n, P))
+
     def time_index_for(self, start_ts) -> int:
         """Index in self.times for a given timestamp (>=), robust to tz-aware inputs."""
         ts = pd.to_datetime(start_ts, utc=True).to_datetime64()  # -> datetime64[ns] UTC
         return int(np.searchsorted(self.times, ts, side="left"))
 
+    # ─────────────────────────────────────────────────────────────
+    # Climate-model variants: perturbations applied as temps are read
+    # ─────────────────────────────────────────────────────────────
+    def variant(self, kind: str = "base", amount: float = 0.0) -> "ClimateField":
+        """
+        This field with a ClimateModel perturbation (temp_var_Type, temp_scale):
+
+        * ``base``     – unchanged
+        * ``add``      – every hour ``amount`` °C warmer
+        * ``subtract`` – every hour ``amount`` °C colder
+        * ``extreme``  – every hour ``amount`` °C further from its grid point's
+          mean over the whole climate file (cold hours colder, warm hours
+          warmer). The reference ignores ``start``/``end``, so a given hour is
+          perturbed the same way whatever window a scenario loads.
+
+        The variant is a shallow view: it shares ``times``, ``points``, ``temps``
+        and the cKDTree with this field, and the perturbation is applied to the
+        [P] vector each step reads, so variants of one base field cost no extra
+        memory and nothing is written to disk. ``temps`` itself stays the base
+        array; read perturbed values through temps_at_index / temps_for_step.
+        """
+        if kind not in CLIMATE_TRANSFORMS:
+            raise ValueError(f"Unknown climate variation '{kind}'; expected one of {CLIMATE_TRANSFORMS}.")
+        amount = float(amount or 0.0)
+        base = self._base_field or self
+        if kind == "base" or amount == 0.0:
+            return base
+        view = copy.copy(base)
+        view._base_field = base
+        view.transform = (kind, amount)
+        return view
+
+    def point_mean(self) -> np.ndarray:
+        """
+        Mean temperature of each grid point over every hour in the file (shape [P]).
+        Stored with the binary cache; without it the file is decoded once, for the
+        field's bbox, on first use.
+        """
+        if self._point_mean is None:
+            parquet_path, bbox = self._source
+            _, points, temps = self._read_grid(parquet_path, bbox=bbox)
+            assert np.array_equal(points, self.points)
+            mean = self._grid_mean(temps)
+            mean.setflags(write=False)
+            self._point_mean = mean
+        return self._point_mean
+
+    def _perturb(self, vec: np.ndarray) -> np.ndarray:
+        kind, amount = self.transform
+        if kind == "add":
+            return vec + np.float32(amount)
+        if kind == "subtract":
+            return vec - np.float32(amount)
+        if kind == "extreme":
+            return vec + np.float32(amount) * np.sign(vec - self._base_field.point_mean())
+        return vec
+
     def temps_at_index(self, t: int) -> np.ndarray:
         """Return temps for all P points at time index t  (shape [P])."""
-        return self.temps[t, :]
+        return self._perturb(self._rows(t))
+
+    def temps_for_step(self, t: float, step_hours: float = 1) -> Optional[np.ndarray]:
+        """
+        Temps for all P points over a step of ``step_hours`` starting at
+        (fractional) time index t, or None if t is outside the data.
+
+        Hourly steps return row t; shorter steps interpolate linearly between
+        the two hourly rows around t; longer steps average the hourly rows
+        the step covers.
+        """
+        T = len(self.times)
+        i = int(np.floor(t))
+        if not 0 <= i < T:
+            return None
+        if step_hours >= 1:
+            if step_hours == 1 and i == t:
+                return self.temps_at_index(i)
+            j = min(T, int(np.ceil(t + step_hours)))
+            return self._perturb(self._rows(slice(i, j)).mean(axis=0, dtype=np.float64).astype(np.float32))
+        frac = t - i
+        if frac == 0 or i + 1 >= T:
+            return self.temps_at_index(i)
+        return self._perturb(((1.0 - frac) * self._rows(i) + frac * self._rows(i + 1)).astype(np.float32))
+
+
+# ─────────────────────────────────────────────────────────────────────
+# Process-wide cache: repeat runs reuse one read-only ClimateField
+# ─────────────────────────────────────────────────────────────────────
+class ClimateCache:
+    """
+    LRU cache of ClimateFields keyed on (file, size, mtime, window, bbox).
+
+    Fields (temps, points and the cKDTree) are read-only, so every model in the
+    process - back-to-back scenario runs, ensemble members, sweep points - can
+    share one. Least recently used fields are dropped once the fields' own
+    memory (ClimateField.nbytes) exceeds ``max_bytes``. Memory-mapped temps
+    don't count towards it: they are pages of the binary cache file, which the
+    OS already shares between processes.
+    """
+
+    def __init__(self, max_bytes: int = 1 << 30):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._fields: "OrderedDict[tuple, ClimateField]" = OrderedDict()
+        self._loading: Dict[tuple, threading.Event] = {}  # keys being loaded, set when done
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(parquet_path: str, start=None, end=None, bbox: Optional[tuple] = None, **kwargs) -> tuple:
+        st = os.stat(parquet_path)
+        bound = lambda ts: None if ts is None else ClimateField._utc64(ts)
+        return (os.path.abspath(parquet_path), st.st_size, st.st_mtime_ns, bound(start), bound(end),
+                None if bbox is None else tuple(float(v) for v in bbox), tuple(sorted(kwargs.items())))
+
+    @property
+    def nbytes(self) -> int:
+        return sum(field.nbytes for field in self._fields.values())
+
+    def get(self, parquet_path: str, **kwargs) -> ClimateField:
+        """The cached field for these arguments (see ClimateField), loading it on a miss."""
+        key = self.key(parquet_path, **kwargs)
+        while True:
+            with self._lock:
+                field = self._fields.get(key)
+                if field is not None:
+                    self.hits += 1
+                    self._fields.move_to_end(key)
+                    return field
+                loading = self._loading.get(key)
+                if loading is None:
+                    loading = self._loading[key] = threading.Event()
+                    self.misses += 1
+                    break
+            # concurrent runs asking for the same field wait for a single load (and retry if it fails)
+            loading.wait()
+        try:
+            # outside the lock: loads of other fields go ahead in parallel
+            field = ClimateField(parquet_path, **kwargs)
+            with self._lock:
+                self._fields[key] = field
+                while len(self._fields) > 1 and self.nbytes > self.max_bytes:
+                    self._fields.popitem(last=False)
+            return field
+        finally:
+            with self._lock:
+                del self._loading[key]
+            loading.set()
+
+    def clear(self):
+        with self._lock:
+            self._fields.clear()
+
+
+CLIMATE_CACHE = ClimateCache(int(os.environ.get("CLIMATE_CACHE_BYTES", 1 << 30)))
+
+
+def load_climate(parquet_path: str, **kwargs) -> ClimateField:
+    """ClimateField(parquet_path, **kwargs), shared through the process-wide CLIMATE_CACHE."""
+    return CLIMATE_CACHE.get(parquet_path, **kwargs)
 
 
 # ─────────────────────────────────────────────────────────────────────
-# Optional CLI: python -m climate /path/to/file.parquet
+# Optional CLI: python -m climate /path/to/file.parquet [--build-cache]
 # ─────────────────────────────────────────────────────────────────────
 if __name__ == "__main__":
     import argparse
     p = argparse.ArgumentParser(description="Validate climate parquet T×P rectangularity.")
     p.add_argument("parquet", help="Path to climate parquet")
     p.add_argument("--quiet", action="store_true", help="Do not print report; exit code only")
+    p.add_argument("--build-cache", action="store_true", help="Also write the binary cache ClimateField memory-maps")
+    p.add_argument("--streaming", action="store_true", help="Scan in record batches (bounded memory, for large files)")
     args = p.parse_args()
 
-    ok = ClimateField.validate_parquet(args.parquet, verbose=not args.quiet)
+    ok = ClimateField.validate_parquet(args.parquet, verbose=not args.quiet, streaming=args.streaming)
+    if ok and args.build_cache:
+        cache_dir = ClimateField.build_cache(args.parquet)
+        if not args.quiet:
+            print(f"  Cache: {cache_dir}")
     raise SystemExit(0 if ok else 1)
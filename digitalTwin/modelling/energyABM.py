@@ -20,21 +20,33 @@ This script:
 
 from __future__ import annotations
 
+import random
 from pathlib import Path
 
 # import cloudpickle as pickle #Not currently used
 import geopandas as gpd
 import pandas as pd
 
-from .model import EnergyModel
+from .model import EnergyModel, seed_rngs
 from .modelConfig import load_config
+from .sweep import run_sweep
 from ..library import dataManager, policies
 from digitalTwin.config import Config
 
 import tempfile, yaml
 
 # ──────────────────────────── main ────────────────────────────────
-def run(scenario, log_callback=print) -> None:
+def buildModel(scenario, log_callback=print, agent_sink=None, collect_agent_level=True, seed=None,
+               **model_kwargs) -> EnergyModel:
+    """Load a scenario's population and climate and build its model (not yet stepped).
+
+    ``seed`` drives the policy's household sample and every random assignment in
+    the model, so the same seed rebuilds the same model; None draws one.
+    ``model_kwargs`` override the EnergyModel arguments set here (e.g. ``engine``).
+    """
+    if seed is None:
+        seed = random.getrandbits(63)
+    policy_rng = seed_rngs(seed)["policy"]
 
     # load gdf for only the selected agents
     epc_columns = [
@@ -60,28 +72,54 @@ def run(scenario, log_callback=print) -> None:
     print(gdf.columns.tolist())
 
 
-    climate_path = Config.CLIMATE_DATA
+    climate_path, climate_transform = climateSource(scenario)
 
     # update to match policy
     log_callback('Updating to match policy')
-    gdf = policies.applyPolicy(gdf, scenario.policy_id)
+    gdf = policies.applyPolicy(gdf, scenario.policy_id, rng=policy_rng)
 
     # update gdf based on policies
-    gdf_updated = policies.applyPolicy(gdf, scenario.policy_id, log_callback=log_callback)
-
-    model = EnergyModel(gdf=gdf_updated ,
-                        climate_parquet= climate_path,
-                        climate_start=scenario.start_day, # to do make changeable
-                        local_tz="Europe/London",
-                        collect_agent_level=True,   # keep per-household traces
-                        agent_collect_every=scenario.record_every#, # once per day
-                        #config_path=cfg      # either created from policy choice
+    gdf_updated = policies.applyPolicy(gdf, scenario.policy_id, log_callback=log_callback, rng=policy_rng)
+
+    step_hours = scenario.simulation_step or 1  # hours per model step
+    model_args = dict(climate_parquet= climate_path,
+                      climate_start=scenario.start_day, # to do make changeable
+                      climate_end=pd.Timestamp(scenario.start_day) + pd.Timedelta(hours=scenario.days * 24),
+                      climate_bbox_margin=Config.CLIMATE_BBOX_MARGIN,
+                      climate_transform=climate_transform,
+                      local_tz="Europe/London",
+                      collect_agent_level=collect_agent_level,   # keep per-household traces
+                      agent_collect_every=scenario.record_every, # once per day
+                      n_steps=round(scenario.days * 24 / step_hours),  # preallocates the agent recorder
+                      step_hours=step_hours,
+                      agent_sink=agent_sink,
+                      agent_flush_every=Config.AGENT_FLUSH_EVERY,
+                      seed=seed,
+                      #config_path=cfg      # either created from policy choice
                     )
+    model_args.update(model_kwargs)
+    model = EnergyModel(gdf=gdf_updated, **model_args)
     log_callback('model created')
+    return model
+
+
+def run(scenario, log_callback=print, agent_sink=None, collect_agent_level=True, seed=None, **model_kwargs) -> None:
+    """Build and run the model for a scenario.
+
+    If ``agent_sink`` is given, agent-level traces are streamed to it in chunks
+    of ``Config.AGENT_FLUSH_EVERY`` collection steps while the model runs
+    (see modelling/recorder.py) rather than held in memory until the end.
+    ``collect_agent_level=False`` skips agent traces altogether (ensemble
+    replicas only keep the model-level series). ``seed`` makes the run
+    reproducible (see buildModel); ``model_kwargs`` go to the EnergyModel
+    (e.g. ``headless=True``).
+    """
+    model = buildModel(scenario, log_callback=log_callback, agent_sink=agent_sink,
+                       collect_agent_level=collect_agent_level, seed=seed, **model_kwargs)
 
     # 2 ─ run simulation ----------------------------------------------
-    steps   = scenario.days * 24 #TODO: make this user input
-    records = []                                    # per-hour summary rows
+    steps   = round(scenario.days * 24 / model.step_hours)
+    records = []                                    # per-step summary rows
     log_callback(f'Running model. {steps} steps to go...')
     for step in range(steps):
 
@@ -89,21 +127,48 @@ def run(scenario, log_callback=print) -> None:
         if step % 10 ==0:
             log_callback(f'Running model. {step} out of {steps}.')
 
+        elapsed = model.current_hour  # hours since the start of this step
         model.step()
-        tot = sum(h.energy_consumption for h in model.household_agents)
+        tot = model.total_energy
         records.append(
             dict(
                 step=step,
-                hour=step % 24,
-                day=step // 24,
+                hour=int(elapsed % 24),
+                day=int(elapsed // 24),
                 total_energy=tot,
                 avg_energy=tot / len(model.household_agents),
             )
         )
+
+    if model.agent_dc is not None:
+        model.agent_dc.close()  # flush the last partial chunk to the sink
     
     return model, records
 
 
+def runSweep(scenario, points, workers=1, log_callback=print):
+    """Run a scenario once per parameter point, building its population once (see modelling/sweep.py)."""
+    model = buildModel(scenario, log_callback=log_callback, collect_agent_level=False, engine="array", headless=True)
+    log_callback(f'Sweeping {len(points)} parameter points on {workers} worker(s)...')
+    return run_sweep(model, points, n_steps=round(scenario.days * 24 / model.step_hours), workers=workers)
+
+
+def climateSource(scenario):
+    """Climate parquet and (temp_var_Type, temp_scale) for the scenario's ClimateModel.
+
+    Scenarios without a climate model use ``Config.CLIMATE_DATA`` unchanged.
+    """
+    if scenario.climate_model_id is None:
+        return Config.CLIMATE_DATA, None
+    climate_model = dataManager.findDBData('ClimateModel', scenario.climate_model_id)
+    if climate_model is None:
+        raise ValueError(f"Climate model {scenario.climate_model_id} not found.")
+    if climate_model.base_data not in Config.CLIMATE_DATASETS:
+        raise ValueError(f"Unknown climate base data '{climate_model.base_data}'.")
+    return (Config.CLIMATE_DATASETS[climate_model.base_data],
+            (climate_model.temp_var_Type, climate_model.temp_scale or 0.0))
+
+
 def createPolicyConfig(gdf, policy_id, log_callback=print):
     with tempfile.NamedTemporaryFile("w", suffix=".yaml", delete=False) as tmp:
         policy_cfg = tmp.name
@@ -0,0 +1,338 @@
+"""
+households.py
+=============
+
+Column-wise construction of the household population.
+
+``household_table`` turns the model's GeoDataFrame into one normalised column
+per HouseholdAgent attribute, with the same defaults and coercions as
+``HouseholdAgent.__init__``.  It then computes the derived per-dwelling
+parameters (hourly base load, heating slope and heating capacity) over whole
+columns with NumPy (``household_params``).  The result is an
+``AttributeTable``: the EnergyModel's CompactHouseholdAgents hold a row
+number into it instead of a copy of every attribute, and skip the per-row
+parsing and per-agent config lookups entirely.  ``resident_presence`` and
+``resident_spikes`` do the same for the residents' hour tables, and
+``household_coordinates`` gives a headless model its dwelling points without
+an agent geometry each.
+
+The per-agent methods (``_compute_hourly_base_kwh``, ``_compute_heat_slope``,
+``_compute_heat_capacity``) remain the reference for a single dwelling; the
+functions here give the same values for every dwelling at once.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Mapping, Sequence
+
+import numpy as np
+import pandas as pd
+import shapely
+
+from .agent import AttributeTable
+
+if TYPE_CHECKING:
+    import geopandas as gpd
+
+    from .model import EnergyModel
+
+# gdf columns that carry a calibrated annual demand, in order of preference
+ENERGY_COLUMNS = ("energy_cal_kwh", "energy_demand_kwh", "energy_demand")
+
+# HouseholdAgent attributes that are normalised text (stripped, lower case, None when missing)
+TEXT_ATTRS = (
+    "property_age", "main_fuel_type", "main_heating_system", "heatpump_candidate_class",
+    "heating_controls", "meter_type",
+)
+# 0/1 policy-lever and fuel flags
+FLAG_ATTRS = (
+    "cwi_flag", "swi_flag", "loft_ins_flag", "floor_ins_flag", "glazing_flag",
+    "is_electric_heating", "is_gas", "is_oil", "is_solid_fuel", "is_off_gas",
+)
+# free-text categories kept as given ("" becomes None)
+CATEGORY_ATTRS = ("hh_income_band", "hh_edu_detail", "dwelling_bucket", "tenure")
+
+
+def _column(gdf: "gpd.GeoDataFrame", names: Sequence[str]) -> pd.Series | None:
+    """The first of ``names`` that is a column of ``gdf``, as the old ``row.get`` chains read them."""
+    for name in names:
+        if name in gdf.columns:
+            return gdf[name]
+    return None
+
+
+def _attr(gdf: "gpd.GeoDataFrame", names: Sequence[str], convert: Callable[[pd.Series], List[Any]],
+          default: Any = None) -> List[Any]:
+    """``convert`` applied to a gdf column; a missing column is the converted ``default`` on every row."""
+    col = _column(gdf, names)
+    if col is None:
+        return convert(pd.Series([default], dtype=object)) * len(gdf)
+    return convert(col)
+
+
+def _mapped(fn: Callable[[Any], Any]) -> Callable[[pd.Series], List[Any]]:
+    return lambda col: [fn(v) for v in col.tolist()]
+
+
+def _text(v: Any) -> Any:
+    return v.strip().lower() if isinstance(v, str) and v else None
+
+
+def _stripped(v: Any) -> Any:
+    return v.strip() if isinstance(v, str) and v.strip() else None
+
+
+def _int_or_none(v: Any) -> Any:
+    if v is None or (isinstance(v, str) and v == ""):
+        return None
+    try:
+        return int(v)
+    except Exception:
+        return None
+
+
+def _float_or_none(v: Any) -> Any:
+    if v is None or (isinstance(v, str) and v == ""):
+        return None
+    try:
+        return float(v)
+    except Exception:
+        return None
+
+
+def _flag(v: Any) -> int:
+    try:
+        return int(v) if v is not None else 0
+    except Exception:
+        return 0
+
+
+def _children(v: Any) -> Any:
+    if v is None or (isinstance(v, str) and v == ""):
+        return None
+    return str(v).strip().lower() in ("true", "1", "yes", "y", "t")
+
+
+def _optional_ints(col: pd.Series) -> List[Any]:
+    if pd.api.types.is_integer_dtype(col.dtype) and not col.hasnans:
+        return col.tolist()
+    if pd.api.types.is_float_dtype(col.dtype) and not pd.api.types.is_extension_array_dtype(col.dtype):
+        values = col.to_numpy()
+        ok = np.isfinite(values)
+        out = np.full(len(col), None, dtype=object)
+        out[ok] = np.trunc(values[ok]).astype(np.int64).tolist()
+        return out.tolist()
+    return _mapped(_int_or_none)(col)
+
+
+def _optional_floats(col: pd.Series) -> List[Any]:
+    """``float(v)``, keeping None as None (NaN stays NaN, as in HouseholdAgent.__init__)."""
+    if (pd.api.types.is_numeric_dtype(col.dtype) and not pd.api.types.is_bool_dtype(col.dtype)
+            and not pd.api.types.is_extension_array_dtype(col.dtype)):
+        return col.to_numpy(dtype=float).tolist()
+    return _mapped(_float_or_none)(col)
+
+
+def _flags(col: pd.Series) -> List[int]:
+    if pd.api.types.is_extension_array_dtype(col.dtype):
+        return _mapped(_flag)(col)
+    if pd.api.types.is_bool_dtype(col.dtype) or pd.api.types.is_integer_dtype(col.dtype):
+        return col.to_numpy(dtype=np.int64).tolist()
+    if pd.api.types.is_float_dtype(col.dtype):
+        values = col.to_numpy()
+        return np.where(np.isfinite(values), np.trunc(np.nan_to_num(values)), 0).astype(np.int64).tolist()
+    return _mapped(_flag)(col)
+
+
+def _floats(values: Sequence[Any]) -> tuple[np.ndarray, np.ndarray]:
+    """Float array of optional values, plus where they were None (NaN and None are treated apart)."""
+    none = np.fromiter((v is None for v in values), dtype=bool, count=len(values))
+    return np.array([np.nan if v is None else v for v in values], dtype=float), none
+
+
+def _by_category(values: Sequence[Any], fn: Callable[[Any], float]) -> np.ndarray:
+    """``fn`` of each value, computed once per distinct value."""
+    codes, uniques = pd.factorize(pd.Series(values, dtype=object), use_na_sentinel=False)
+    return np.array([fn(u) for u in uniques], dtype=float)[codes] if len(uniques) else np.ones(len(values))
+
+
+def _contains(values: Sequence[Any], word: str) -> np.ndarray:
+    return np.fromiter((word in v if v else False for v in values), dtype=bool, count=len(values))
+
+
+def _area_mult(fa: np.ndarray, ref: float, exp: float, lo: float, hi: float) -> np.ndarray:
+    """``max(lo, min(hi, (fa / ref) ** exp))`` where the area is known and positive, else 1."""
+    known = fa > 0  # False for NaN
+    mult = np.ones(len(fa))
+    mult[known] = np.maximum(lo, np.minimum(hi, (fa[known] / ref) ** exp))
+    return mult
+
+
+def household_table(gdf: "gpd.GeoDataFrame", model: "EnergyModel") -> AttributeTable:
+    """One row per gdf row, one column per HouseholdAgent attribute, derived parameters included.
+
+    Columns a gdf lacks take HouseholdAgent's defaults. Rows read back as
+    plain Python objects (None for missing), the values ``HouseholdAgent.__init__``
+    would set; the columns are ``unique_id`` plus ``agent.HOUSEHOLD_STATIC_ATTRS``.
+    """
+    n = len(gdf)
+    cols: Dict[str, Any] = {"unique_id": _attr(gdf, ("UPRN", "uprn", "fid"), lambda col: col.astype(str).tolist())}
+    cols["property_type"] = _attr(
+        gdf, ("property_type",), lambda col: col.fillna("").astype(str).str.strip().str.lower().tolist(), "")
+    cols["sap_rating"] = _attr(gdf, ("sap_rating",), pd.Series.tolist, 70)
+    energy = [c for c in ENERGY_COLUMNS if c in gdf.columns]
+    cols["has_calibrated_energy"] = gdf[energy].notna().any(axis=1).to_numpy() if energy else np.zeros(n, dtype=bool)
+
+    hidp = _attr(gdf, ("hidp",), pd.Series.tolist)
+    cols["hidp"] = [_stripped(h) or _hidp_fallback(h, u) for h, u in zip(hidp, cols["unique_id"])]
+    cols["hh_n_people"] = _attr(gdf, ("hh_n_people",), _optional_ints)
+    cols["hh_children"] = _attr(gdf, ("hh_children",), _mapped(_children))
+    cols["hh_income"] = _attr(gdf, ("hh_income",), _mapped(_float_or_none))
+    for attr in CATEGORY_ATTRS:
+        cols[attr] = _attr(gdf, (attr,), _mapped(lambda v: v or None))
+    cols["schedule_type"] = _attr(gdf, ("schedule_type",), _mapped(_stripped))
+    cols["size_band"] = _attr(gdf, ("size_band",), _optional_ints)
+
+    annual = _attr(gdf, ENERGY_COLUMNS, lambda col: col.to_numpy(dtype=float).tolist(), 10_000)
+    cols["annual_energy_kwh"] = annual
+    cols["energy_demand"] = annual
+
+    cols["floor_area_m2"] = _attr(gdf, ("floor_area_m2",), _optional_floats)
+    for attr in TEXT_ATTRS:
+        cols[attr] = _attr(gdf, (attr,), _mapped(_text))
+    cols["is_heatpump_candidate"] = _attr(gdf, ("is_heatpump_candidate",), _mapped(lambda v: 1 if v else 0))
+    cols["has_heatpump"] = _contains(cols["main_heating_system"], "heat pump")
+    cols["was_heatpump_initial"] = cols["has_heatpump"].copy()
+    cols["retrofit_envelope_score"] = _attr(gdf, ("retrofit_envelope_score",), _optional_floats)
+    cols["imd_decile"] = _attr(gdf, ("imd_decile",), _optional_floats)
+    cols["hp_effect_mult"] = np.full(
+        n, getattr(model, "boiler_efficiency", 0.90) / getattr(model, "heatpump_cop_ref", 2.8))
+    for attr in FLAG_ATTRS:
+        cols[attr] = _attr(gdf, (attr,), _flags)
+
+    table = AttributeTable(cols, index=gdf.index)
+    params = household_params(table, model)
+    for name, values in params.items():
+        table[name] = values
+    return table
+
+
+def _hidp_fallback(hidp: Any, unique_id: str) -> str:
+    try:
+        return str(int(hidp)).strip()
+    except Exception:
+        return str(unique_id)
+
+
+def household_params(table: AttributeTable, model: "EnergyModel") -> Dict[str, np.ndarray]:
+    """Derived per-dwelling parameters for every row of a ``household_table``.
+
+    Returns ``_hourly_base_kwh``, ``heat_slope_kWh_per_deg`` and
+    ``heat_capacity_kWh_per_hour``: the values HouseholdAgent's
+    ``_compute_hourly_base_kwh``, ``_compute_heat_slope(model.heating_slope_kWh_per_deg)``
+    and ``_compute_heat_capacity`` give for each dwelling under the model's
+    current config.
+    """
+    p = model.config.params
+    ptype = table["property_type"].tolist()
+    fa, fa_none = _floats(table["floor_area_m2"].tolist())
+    fuel = table["main_fuel_type"].tolist()
+    heat = table["main_heating_system"].tolist()
+    is_hp = _contains(heat, "heat pump")
+    is_electric = _contains(fuel, "electric")
+
+    # hourly base load (non-climate, meter-anchored)
+    base = p.baseline_anchor_kwh_per_hour * _by_category(ptype, lambda t: p.pt_base_mult.get(t, 1.0))
+    lo, hi = p.baseline_area_clip
+    base = base * _area_mult(fa, p.baseline_area_ref_m2, p.baseline_area_exp, lo, hi)
+    hourly = np.minimum(base * getattr(model, "level_scale", 1.0), p.max_base_kwh_per_hour)
+
+    # heating slope
+    sap = np.array(table["sap_rating"].tolist(), dtype=float)
+    slope = np.full(len(table), float(model.heating_slope_kWh_per_deg))
+    slope = slope * np.where(sap < 50, 1.10, np.where(sap > 80, 0.90, 1.0))
+    slope = slope * _by_category(ptype, lambda t: p.pt_heat_mult.get(t, p.pt_heat_default))
+    slope = slope * _area_mult(fa, 90.0, p.heat_slope_area_exp, 0.7, 1.6)
+    bands = table["size_band"].tolist()
+    by_band = np.fromiter((b is not None for b in bands), dtype=bool, count=len(bands)) & ~(fa > 0) & (fa_none | (fa <= 0))
+    if by_band.any():
+        slope = slope * np.where(by_band, _by_category(bands, lambda b: _bedroom_mult(p.bedroom_mult, b)), 1.0)
+    score, score_none = _floats(table["retrofit_envelope_score"].tolist())
+    # min(1, NaN) is 1 in Python, so an unknown (NaN) score counts as fully retrofitted, as per agent
+    clipped = np.where(np.isnan(score), 1.0, np.clip(score, 0.0, 1.0))
+    slope = slope * np.where(score_none, 1.0, 1.0 - 0.20 * clipped)
+    systems = p.system_slope_mult
+    slope = slope * np.select(
+        [is_hp & ("heat_pump" in systems),
+         is_electric & ("electric_heating" in systems),
+         _contains(fuel, "gas") & ("gas_boiler" in systems)],
+        [systems.get("heat_pump", 1.0), systems.get("electric_heating", 1.0), systems.get("gas_boiler", 1.0)],
+        1.0,
+    )
+    slope = np.maximum(p.heat_slope_min, np.minimum(p.heat_slope_max, slope))
+
+    # heating capacity (duty-cycle model)
+    cap = p.base_heat_capacity * _by_category(ptype, lambda t: p.pt_capacity_mult.get(t, p.pt_heat_default))
+    cap = cap * _area_mult(fa, 90.0, p.heat_capacity_area_exp, 0.7, 1.6)
+    cap = cap * np.select(
+        [is_hp, is_electric, _contains(fuel, "oil"), _contains(fuel, "solid")], [0.9, 0.9, 1.0, 1.1], 1.0)
+    cap = np.maximum(p.min_heat_capacity, np.minimum(p.max_heat_kwh_per_hour, cap))
+
+    return {
+        "_hourly_base_kwh": hourly,
+        "heat_slope_kWh_per_deg": slope,
+        "heat_capacity_kWh_per_hour": cap,
+    }
+
+
+def _bedroom_mult(bedroom: Mapping[Any, float], band: Any) -> float:
+    try:
+        return bedroom.get(int(band), 1.0)
+    except Exception:
+        return 1.0
+
+
+def household_coordinates(geometry: "gpd.GeoSeries") -> tuple[np.ndarray, np.ndarray]:
+    """x and y of each dwelling, where the interactive model places its agent's point.
+
+    Points are kept; other shapes are cleaned with ``buffer(0)`` and reduced to
+    their centroid, or to a representative point when cleaning leaves nothing.
+    Missing and empty geometries are NaN.
+    """
+    geoms = np.asarray(geometry, dtype=object)
+    x = np.full(len(geoms), np.nan)
+    y = np.full(len(geoms), np.nan)
+    present = ~shapely.is_missing(geoms) & ~shapely.is_empty(geoms)
+    points = present & (shapely.get_type_id(geoms) == 0)
+    x[points], y[points] = shapely.get_x(geoms[points]), shapely.get_y(geoms[points])
+
+    shapes = np.flatnonzero(present & ~points)
+    centres = shapely.buffer(geoms[shapes], 0)
+    empty = shapely.is_empty(centres)
+    centres[~empty] = shapely.centroid(centres[~empty])
+    centres[empty] = shapely.point_on_surface(geoms[shapes[empty]])
+    x[shapes], y[shapes] = shapely.get_x(centres), shapely.get_y(centres)
+    return x, y
+
+
+def resident_presence(leave: Sequence[Any], ret: Sequence[Any]) -> np.ndarray:
+    """``[people, 24]`` at-home flags, as ``PersonAgent._presence_by_hour`` gives for each resident."""
+    leave = np.array([-1 if v is None else v for v in leave], dtype=np.int64)[:, None]
+    ret = np.array([-1 if v is None else v for v in ret], dtype=np.int64)[:, None]
+    hours = np.arange(24)[None, :]
+    always = (leave < 0) | (ret < 0) | (leave == ret)
+    # away from leave until return; an overnight absence wraps past midnight
+    daytime = ~((leave <= hours) & (hours < ret))
+    overnight = (ret <= hours) & (hours < leave)
+    return always | np.where(leave < ret, daytime, overnight)
+
+
+def resident_spikes(wealth: Sequence[Any], sap: Sequence[Any], model: "EnergyModel") -> np.ndarray:
+    """kWh per at-home hour for each resident, as ``PersonAgent._home_spike_kwh`` gives."""
+    spike = np.full(len(wealth), model.energy_per_person_home)
+    spike = spike * _by_category(wealth, lambda w: 1.3 if w == "high" else 0.8 if w == "low" else 1.0)
+    sap = np.array(sap, dtype=float)
+    return spike * np.where(sap < 50, 1.2, np.where(sap > 80, 0.8, 1.0))
+
+
+__all__ = ["household_table", "household_params", "household_coordinates", "resident_presence", "resident_spikes"]
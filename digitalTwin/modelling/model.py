@@ -6,19 +6,34 @@ Core Mesa/mesa-geo EnergyModel coordinating:
 - one HouseholdAgent per building polygon
 - multiple PersonAgents per household
 
-Each tick = 1 hour. The model:
+Each tick = ``step_hours`` (1 hour unless configured). The model:
 * resets base load for each dwelling,
-* steps every PersonAgent,
+* looks up resident occupancy and spikes from precomputed [24]-hour tables,
 * samples ambient temperature and applies climate-driven kWh at each dwelling,
 * aggregates by property type and wealth group,
-* records per-step metrics via Mesa’s DataCollector.
+* records per-step metrics via Mesa’s DataCollector (agent-level traces go
+  to the columnar AgentRecorder, see recorder.py).
+
+With ``engine="array"`` the same tick is computed by the vectorised
+``ArrayEngine`` (see arrayEngine.py) instead of the per-agent loops, and
+``engine_workers > 1`` steps partitions of the households in parallel.
+
+Other step lengths (any divisor of 24 h, e.g. 0.25, 3 or 6) keep the hourly
+physics: the tick is computed as an hourly rate and scaled to the step.
+Multi-hour steps average climate and resident tables over the hours they
+cover; sub-hourly steps interpolate climate between hourly rows.
+``current_hour`` counts hours since the start either way, derived from the
+integer step count ``ticks`` so inexact steps such as 0.2 h do not drift.
 """
 
 
 
 from __future__ import annotations
 
+import itertools
+import math
 import random
+from fractions import Fraction
 from typing import Callable, Dict, List, Optional
 
 import geopandas as gpd
@@ -26,11 +41,24 @@ import mesa
 import mesa_geo as mg
 import numpy as np
 import pandas as pd  # for timezone handling
+import scipy.sparse as sp
 import math
 
-from .climate import ClimateField
-from .agent import HouseholdAgent, PersonAgent, PROPERTY_TYPES, SCHEDULE_PROFILES
-from .modelConfig import load_config, ModelConfig
+from .arrayEngine import CAP_CLIP_ATTRS, ArrayEngine, clip_attribution
+from .climate import ClimateField, load_climate
+from .recorder import AgentRecorder
+from .agent import (
+    AttributeTable,
+    CompactHouseholdAgent,
+    CompactPersonAgent,
+    HouseholdAgent,
+    PersonAgent,
+    PROPERTY_TYPES,
+    SCHEDULE_PROFILES,
+    WEALTH_GROUPS,
+)
+from .households import household_coordinates, household_params, household_table, resident_presence, resident_spikes
+from .modelConfig import MODEL_SCALARS, load_config, ModelConfig
 
 # ------------------------------------------------------------------
 # Schedule archetypes (hour-level, simple) used when schedule_type
@@ -66,6 +94,44 @@ SCHEDULE_DEFS: Dict[str, tuple[Optional[int], Optional[int]]] = {
     "OUT_LONG":     (7, 20),
 }
 
+# per-dwelling kWh attributes set each tick, scaled from hourly rates to the step length
+# (as are the CAP_CLIP_ATTRS of clipped dwellings, when cap diagnostics are on)
+STEP_KWH_ATTRS = (
+    "energy_consumption", "base_kwh", "heat_kwh", "spike_kwh",
+    "climate_heating_kWh", "climate_cooling_kWh",
+)
+
+HEATPUMP_CLASS_WEIGHT = {
+    "priority": 1.4, "possible": 1.0, "difficult": 0.6,
+    "non-possible": 0.0, None: 1.0,
+}
+
+# config ``model:`` keys that shape how a model is built; reconfigure() refuses them
+BUILD_ONLY_PARAMS = frozenset({
+    "local_tz", "engine", "engine_workers", "partition_by", "step_hours",
+    "climate_interpolation", "climate_idw_k", "climate_idw_power", "seed", "headless",
+    "cap_diagnostics",
+})
+# keys only read while stepping: reconfiguring them needs no per-dwelling recompute
+TICK_PARAMS = frozenset({
+    "heating_setpoint_C", "cooling_threshold_C", "cooling_slope_kWh_per_deg",
+    "loss_to_duty_k", "max_total_kwh_per_hour",
+})
+PERSON_PARAMS = frozenset({"energy_per_person_home", "energy_per_person_away"})
+
+# independent random streams, one per kind of stochastic assignment (see seed_rngs)
+RNG_STREAMS = ("schedules", "profiles", "wealth", "policy")
+
+
+def seed_rngs(seed: int) -> Dict[str, np.random.Generator]:
+    """One NumPy ``Generator`` per entry of ``RNG_STREAMS``, all spawned from ``seed``.
+
+    The streams are independent of each other, so drawing more from one (say a
+    longer policy sample) leaves the others' realisations unchanged.
+    """
+    children = np.random.SeedSequence(seed).spawn(len(RNG_STREAMS))
+    return {name: np.random.default_rng(child) for name, child in zip(RNG_STREAMS, children)}
+
 
 class EnergyModel(mesa.Model):
     """Agent-based model of hourly residential energy demand."""
@@ -79,69 +145,77 @@ class EnergyModel(mesa.Model):
         n_residents_func: Callable[[HouseholdAgent], int] | None = None,
         climate_parquet: Optional[str] = None,
         climate_start: str | np.datetime64 | pd.Timestamp | None = None,
+        climate_end: str | np.datetime64 | pd.Timestamp | None = None,  # load climate hours in [start, end) only
+        climate_bbox_margin: float | None = None,  # degrees; load only grid points near the households
+        climate_interpolation: str | None = None,  # "nearest" (default) or "idw"; config model.climate_interpolation
+        climate_transform: tuple[str, float] | None = None,  # ClimateModel variation, e.g. ("add", 1.5); see ClimateField.variant
         local_tz: str = "Europe/London",
         level_scale: float = 1.0,
         collect_agent_level: bool = True,
         agent_collect_every: int = 24,  # NEW: downsample agent collection (hours)
+        collect_person_level: bool = True,  # include resident rows in the agent traces
+        n_steps: int | None = None,  # expected run length; preallocates the agent recorder
+        agent_sink=None,  # stream agent traces to this sink (see recorder.py) instead of holding them
+        agent_flush_every: int = 24,  # collection steps buffered per sink flush
         config_path: str | None = None,
+        engine: str | None = None,  # "agents" (default) or "array"; falls back to config model.engine
+        engine_workers: int | None = None,  # array engine: partitions stepped in parallel; config model.engine_workers
+        partition_by: str | None = None,  # "clim_idx" (grid cell) or a gdf column, e.g. "ward_code"
+        step_hours: float | None = None,  # tick length in hours, a divisor of 24; config model.step_hours
+        seed: int | None = None,  # drives every random assignment; config model.seed, else drawn from `random`
+        headless: bool | None = None,  # batch runs: no GeoSpace or agent geometries; config model.headless
+        cap_diagnostics: bool | None = None,  # keep cap_clip_* per dwelling; config model.cap_diagnostics
     ):
         super().__init__()
 
-        self.current_hour: int = 0
+        self.ticks: int = 0  # steps taken; current_hour is derived from it
+        self._current_hour: float | int = 0
         self.household_agents: List[HouseholdAgent] = []
         self.person_agents: List[PersonAgent] = []
 
         if gdf is None:
             raise ValueError("EnergyModel requires a GeoDataFrame `gdf`.")
-        self.space = mg.GeoSpace(crs=gdf.crs)
 
         # Scenario/config (externalizable)
         self.config: ModelConfig = load_config(config_path)
 
-        self.energy_per_person_home: float = float(self.config.model.get("energy_per_person_home", 0.06))
-        self.energy_per_person_away: float = float(self.config.model.get("energy_per_person_away", 0.01))
-
-        self.heating_setpoint_C: float = float(self.config.model.get("heating_setpoint_C", 18.5))
-        self.cooling_threshold_C: float = float(self.config.model.get("cooling_threshold_C", 24.0))
-        self.heating_slope_kWh_per_deg: float = float(self.config.model.get("heating_slope_kWh_per_deg", 0.05))
-        self.cooling_slope_kWh_per_deg: float = float(self.config.model.get("cooling_slope_kWh_per_deg", 0.03))
-        self.apply_structural_multipliers: bool = bool(self.config.model.get("apply_structural_multipliers", True))
-        # heat-slope shaping / caps
-        self.heat_slope_area_exp: float = float(self.config.model.get("heat_slope_area_exp", 0.6))
-        self.heat_slope_min: float = float(self.config.model.get("heat_slope_min", 0.0))
-        self.heat_slope_max: float = float(self.config.model.get("heat_slope_max", 0.10))
-        self.max_heat_kwh_per_hour: float = float(self.config.model.get("max_heat_kwh_per_hour", 20.0))
-        self.max_total_kwh_per_hour: float = float(self.config.model.get("max_total_kwh_per_hour", 20.0))
-        self.max_base_kwh_per_hour: float = float(self.config.model.get("max_base_kwh_per_hour", 1.5))
-        self.loss_to_duty_k: float = float(self.config.model.get("loss_to_duty_k", 3.0))
-        self.base_heat_capacity: float = float(self.config.model.get("base_heat_capacity", 8.0))
-        self.heat_capacity_area_exp: float = float(self.config.model.get("heat_capacity_area_exp", 0.5))
-        self.min_heat_capacity: float = float(self.config.model.get("min_heat_capacity", 4.0))
-        # Baseline anchor params
-        # Baseline is now a small meter-derived constant; structural multipliers are
-        # applied to heating only (see _compute_hourly_base_kwh in agent.py).
-        self.use_epc_for_baseline: bool = bool(self.config.model.get("use_epc_for_baseline", False))
-        self.baseline_anchor_kwh_per_hour: float = float(self.config.model.get("baseline_anchor_kwh_per_hour", 0.4))
-        self.baseline_area_ref_m2: float = float(self.config.model.get("baseline_area_ref_m2", 70.0))
-        self.baseline_area_exp: float = float(self.config.model.get("baseline_area_exp", 0.20))
-        self.baseline_area_clip = tuple(self.config.model.get("baseline_area_clip", (0.85, 1.25)))
-        self.property_type_mult_base: Dict[str, float] = self.config.model.get("property_type_mult_base", {})
+        # headless: nothing while stepping uses the spatial index or the shapes, only the
+        # climate mapping needs coordinates, so batch runs keep just those
+        self.headless: bool = bool(headless if headless is not None else self.config.model.get("headless", False))
+        self.space: Optional[mg.GeoSpace] = None if self.headless else mg.GeoSpace(crs=gdf.crs)
+        self.cap_diagnostics: bool = bool(
+            cap_diagnostics if cap_diagnostics is not None else self.config.model.get("cap_diagnostics", False)
+        )
+        self._cap_clipped: List[int] = []  # dwellings whose cap_clip_* are set (agent loop)
+
+        self.step_hours = self._check_step_hours(
+            step_hours if step_hours is not None else self.config.model.get("step_hours", 1)
+        )
+        # exact step length (e.g. 0.2 h is 1/5), so hours don't drift over many steps
+        self._step_frac = Fraction(self.step_hours).limit_denominator(3600)
+
+        self._load_model_params()
+
+        if seed is None:
+            seed = self.config.model.get("seed")
+        # an unseeded model still follows random.seed(), as it did before seeds existed
+        self.seed: int = int(seed) if seed is not None else random.getrandbits(63)
+        rngs = seed_rngs(self.seed)
 
         # --------------- NEW: heat pump params --------------------
         self.boiler_efficiency = 0.90       # for hp effectiveness (boiler η)
         self.heatpump_cop_ref  = 2.8        # simple, flat COP for now
         self.heatpump_adoption_rate = 0.0   # 0..1 of eligible homes (or dict per class)
-        self.heatpump_class_weight = {
-            "priority": 1.4, "possible": 1.0, "difficult": 0.6,
-            "non-possible": 0.0, None: 1.0,
-        }
+        self.heatpump_class_weight = dict(HEATPUMP_CLASS_WEIGHT)
 
         self.energy_by_type: Dict[str, float] = {t: 0.0 for t in PROPERTY_TYPES}
         self.energy_by_wealth: Dict[str, float] = dict.fromkeys(["high", "medium", "low"], 0.0)
         self.cumulative_energy: float = 0.0
+        self.total_energy: float = 0.0  # last tick's total across dwellings
 
         self.climate: Optional[ClimateField] = None
         self._clim_idx_per_house: Optional[np.ndarray] = None
+        self._clim_weights = None  # sparse [N_households, P] IDW weights (climate_interpolation="idw")
         self._t0: int = 0
 
         # Config metadata (propagated to outputs for traceability)
@@ -149,7 +223,14 @@ class EnergyModel(mesa.Model):
         self.config_date: str = self.config.date
 
         if climate_parquet:
-            self.climate = ClimateField(climate_parquet)
+            bbox = None
+            if climate_bbox_margin is not None:
+                min_lon, min_lat, max_lon, max_lat = gdf.total_bounds
+                bbox = ClimateField.household_bbox([min_lat, max_lat], [min_lon, max_lon], climate_bbox_margin)
+            # hours before climate_start are never stepped, so they are not loaded
+            self.climate = load_climate(climate_parquet, start=climate_start, end=climate_end, bbox=bbox)
+            if climate_transform is not None:
+                self.climate = self.climate.variant(*climate_transform)  # shares the cached base temps
 
         # ------------- 1. instantiate households --------------------
         resident_cap = int(self.config.households.get("resident_cap", 10))
@@ -169,92 +250,67 @@ class EnergyModel(mesa.Model):
         if n_residents_func is None:
             n_residents_func = _default_residents
 
-        for _, row in gdf.iterrows():
-            has_calibrated_energy = any(
-                pd.notna(row.get(k))
-                for k in ("energy_cal_kwh", "energy_demand_kwh", "energy_demand")
-            )
-            house = HouseholdAgent(
-                unique_id=str(row.get("UPRN", row.get("uprn", row.get("fid")))),  # NEW: UPRN-friendly
-                model=self,
-                geometry=row["geometry"],
-                # core
-                property_type=row.get("property_type", ""),
-                sap_rating=row.get("sap_rating", 70),
-                # prefer calibrated demand; fallback to legacy if missing
-                annual_energy_kwh=row.get(
-                    "energy_cal_kwh",
-                    row.get("energy_demand_kwh", row.get("energy_demand", 10_000)),
-                ),
-                # drivers
-                floor_area_m2=row.get("floor_area_m2"),
-                property_age=row.get("property_age"),
-                main_fuel_type=row.get("main_fuel_type"),
-                main_heating_system=row.get("main_heating_system"),
-                retrofit_envelope_score=row.get("retrofit_envelope_score"),
-                imd_decile=row.get("imd_decile"),
-                # levers / context
-                heating_controls=row.get("heating_controls"),
-                meter_type=row.get("meter_type"),
-                cwi_flag=row.get("cwi_flag"),
-                swi_flag=row.get("swi_flag"),
-                loft_ins_flag=row.get("loft_ins_flag"),
-                floor_ins_flag=row.get("floor_ins_flag"),
-                glazing_flag=row.get("glazing_flag"),
-                is_electric_heating=row.get("is_electric_heating"),
-                is_gas=row.get("is_gas"),
-                is_oil=row.get("is_oil"),
-                is_solid_fuel=row.get("is_solid_fuel"),
-                is_off_gas=row.get("is_off_gas"),
-                # NEW: heat pump candidate inputs (from your DataFrame)
-                is_heatpump_candidate=row.get("is_heatpump_candidate"),
-                heatpump_candidate_class=row.get("heatpump_candidate_class"),
-                # NEW: socio‑demo / dwelling inputs (optional)
-                hidp=row.get("hidp"),
-                hh_n_people=row.get("hh_n_people"),
-                hh_children=row.get("hh_children"),
-                hh_income=row.get("hh_income"),
-                hh_income_band=row.get("hh_income_band"),
-                hh_edu_detail=row.get("hh_edu_detail"),
-                dwelling_bucket=row.get("dwelling_bucket"),
-                tenure=row.get("tenure"),
-                size_band=row.get("size_band"),
-                schedule_type=row.get("schedule_type"),
-                crs=gdf.crs,
-            )
-            house.has_calibrated_energy = has_calibrated_energy
-            # recompute heat slope in case config differs from default
-            house.heat_slope_kWh_per_deg = house._compute_heat_slope(self.heating_slope_kWh_per_deg)
-            self.household_agents.append(house)
-            self.space.add_agents([house])
-
-        # Ensure geometry is centroided for clarity (and consistent mapping)
-        for h in self.household_agents:
-            g = getattr(h, "geometry", None)
-            if g is None or g.is_empty:
-                continue
-            if g.geom_type == "Point":
-                continue
-            try:
-                gg = g.buffer(0)
-            except Exception:
-                gg = g
-            if gg.is_empty:
-                gg = g.representative_point()
-                h.geometry = gg
-            else:
-                h.geometry = gg.centroid
+        # static attributes and derived parameters of every dwelling, computed column-wise;
+        # each agent keeps its row of the table and only its per-tick state
+        self.household_table: AttributeTable = household_table(gdf, self)
+        if self.headless:
+            # dwelling points straight from the gdf, as two float arrays
+            self.household_x, self.household_y = household_coordinates(gdf.geometry)
+            for row in range(len(gdf)):
+                self.household_agents.append(CompactHouseholdAgent(self, self.household_table, row, None))
+        else:
+            crs = gdf.crs
+            for row, geometry in enumerate(gdf["geometry"]):
+                house = CompactHouseholdAgent(self, self.household_table, row, geometry, crs=crs)
+                self.household_agents.append(house)
+            self.space.add_agents(self.household_agents)
+
+            # Ensure geometry is centroided for clarity (and consistent mapping)
+            for h in self.household_agents:
+                g = getattr(h, "geometry", None)
+                if g is None or g.is_empty:
+                    continue
+                if g.geom_type == "Point":
+                    continue
+                try:
+                    gg = g.buffer(0)
+                except Exception:
+                    gg = g
+                if gg.is_empty:
+                    gg = g.representative_point()
+                    h.geometry = gg
+                else:
+                    h.geometry = gg.centroid
+
+            located = [getattr(h, "geometry", None) is not None and not h.geometry.is_empty
+                       for h in self.household_agents]
+            self.household_x = np.array([h.geometry.x if ok else np.nan
+                                         for h, ok in zip(self.household_agents, located)], dtype=float)
+            self.household_y = np.array([h.geometry.y if ok else np.nan
+                                         for h, ok in zip(self.household_agents, located)], dtype=float)
 
         # ✅ Map climate ONCE (after houses exist) and assign per-house index
         if self.climate is not None:
-            valid_houses = [h for h in self.household_agents
-                            if getattr(h, "geometry", None) is not None and not h.geometry.is_empty]
-            lats = np.fromiter((h.geometry.y for h in valid_houses), dtype=np.float32, count=len(valid_houses))
-            lons = np.fromiter((h.geometry.x for h in valid_houses), dtype=np.float32, count=len(valid_houses))
-            if len(valid_houses) > 0:
+            rows = np.flatnonzero(~np.isnan(self.household_x))  # households with a location
+            lats = self.household_y[rows].astype(np.float32)
+            lons = self.household_x[rows].astype(np.float32)
+            if len(rows) > 0:
                 self._clim_idx_per_house = self.climate.map_households(lats, lons)
-                for h, idx in zip(valid_houses, self._clim_idx_per_house):
-                    h.set_climate_index(idx)
+                for r, idx in zip(rows.tolist(), self._clim_idx_per_house):
+                    self.household_agents[r].set_climate_index(idx)
+
+            climate_interpolation = climate_interpolation or self.config.model.get("climate_interpolation", "nearest")
+            if climate_interpolation not in ("nearest", "idw"):
+                raise ValueError(f"Unknown climate_interpolation '{climate_interpolation}'; expected 'nearest' or 'idw'.")
+            if climate_interpolation == "idw" and len(rows) > 0:
+                w = self.climate.idw_weights(
+                    lats, lons,
+                    k=int(self.config.model.get("climate_idw_k", 4)),
+                    power=float(self.config.model.get("climate_idw_power", 2.0)),
+                ).tocoo()
+                # one row per household (rows of houses without geometry stay empty)
+                self._clim_weights = sp.csr_matrix((w.data, (rows[w.row], w.col)),
+                                                   shape=(len(self.household_agents), w.shape[1]))
 
             if climate_start is None:
                 climate_start = self.climate.times[0]
@@ -263,11 +319,15 @@ class EnergyModel(mesa.Model):
             for h in self.household_agents:
                 h.ambient_tempC = float("nan")
 
+        if self.cap_diagnostics:
+            for h in self.household_agents:
+                h.clear_cap_clip()
+        ptype_pos = {t: i for i, t in enumerate(PROPERTY_TYPES)}
+        self._ptype_idx = np.fromiter((ptype_pos.get(t, -1) for t in self.household_table["property_type"]),
+                                      dtype=np.int64, count=len(self.household_table))
+
         # --- assign heat pumps according to policy (runs once) ---  NEW
-        self.boiler_efficiency = float(self.config.model.get("boiler_efficiency", self.boiler_efficiency))
-        self.heatpump_cop_ref = float(self.config.model.get("heatpump_cop_ref", self.heatpump_cop_ref))
-        self.heatpump_adoption_rate = self.config.model.get("heatpump_adoption_rate", self.heatpump_adoption_rate)
-        self.heatpump_class_weight.update(self.config.model.get("heatpump_class_weight", {}))
+        self._load_heatpump_params()
         self._assign_heatpumps()
 
         self._local_tz = local_tz
@@ -280,21 +340,30 @@ class EnergyModel(mesa.Model):
         uid_counter = 0
         legacy_profiles = self.config.schedules.get("default_profiles") or SCHEDULE_PROFILES
 
-        rng_sched = random.Random(12345)  # deterministic schedule jitter per run
-
-        def _jitter(hr: Optional[int]) -> Optional[int]:
+        # Every random choice is drawn up front, one slot per resident, so a
+        # resident's draws depend only on the seed and its position (household
+        # order, then place in the household) -- never on what came before it.
+        n_people_per_house = np.array([n_residents_func(h) for h in self.household_agents], dtype=np.int64)
+        n_slots = np.maximum(n_people_per_house, 1)  # a household always gets at least one adult
+        first_slot = np.concatenate(([0], np.cumsum(n_slots)[:-1])).astype(np.int64)
+        m = int(n_slots.sum())
+        tag_u = rngs["schedules"].random(m)                  # schedule archetype choices
+        jitter = rngs["schedules"].integers(-1, 2, (m, 2))   # ±1 h on leave / return
+        profile_idx = rngs["profiles"].integers(len(legacy_profiles), size=m)
+        wealth_idx = rngs["wealth"].integers(len(WEALTH_GROUPS), size=m)
+
+        def _jitter(hr: Optional[int], j: int) -> Optional[int]:
             if hr is None:
                 return None
-            j = rng_sched.randint(-1, 1)
             return int(max(0, min(23, hr + j)))
 
-        def _schedule_tuple(tag: str) -> tuple[Optional[int], Optional[int]]:
+        def _schedule_tuple(tag: str, k: int) -> tuple[Optional[int], Optional[int]]:
             leave, ret = SCHEDULE_DEFS.get(tag, (None, None))
-            return _jitter(leave), _jitter(ret)
+            return _jitter(leave, jitter[k, 0]), _jitter(ret, jitter[k, 1])
 
         # Map household-level schedule_type (if present) to per-person leave/return.
         # Falls back to legacy Parent/Worker/Homebody when schedule_type is missing/unknown.
-        def _assign_household_schedules(h: HouseholdAgent, n_people: int) -> list[dict]:
+        def _assign_household_schedules(h: HouseholdAgent, n_people: int, k0: int) -> list[dict]:
             stype_raw = getattr(h, "schedule_type", None)
             stype = stype_raw.strip().lower() if isinstance(stype_raw, str) else ""
             children_flag = getattr(h, "hh_children", None)
@@ -310,46 +379,47 @@ class EnergyModel(mesa.Model):
             n_adults = max(1, n_people - n_children)
 
             people: list[dict] = []
+            slots = iter(range(k0, k0 + max(n_people, 1)))  # this household's draw slots
 
             if stype == "retired_household":
-                for _ in range(n_adults):
-                    leave, ret = _schedule_tuple("HOME_ALLDAY")
+                for k in itertools.islice(slots, n_adults):
+                    leave, ret = _schedule_tuple("HOME_ALLDAY", k)
                     people.append({"role": "adult", "schedule_profile": "HOME_ALLDAY", "leave": leave, "return": ret})
             elif stype == "unemployed_or_inactive":
-                for _ in range(n_adults):
-                    tag = "PART_TIME_PM" if rng_sched.random() < 0.3 else "HOME_ALLDAY"
-                    leave, ret = _schedule_tuple(tag)
+                for k in itertools.islice(slots, n_adults):
+                    tag = "PART_TIME_PM" if tag_u[k] < 0.3 else "HOME_ALLDAY"
+                    leave, ret = _schedule_tuple(tag, k)
                     people.append({"role": "adult", "schedule_profile": tag, "leave": leave, "return": ret})
             elif stype == "working_adult_household":
-                for _ in range(n_adults):
+                for k in itertools.islice(slots, n_adults):
                     tag = "WORK_STD"
-                    leave, ret = _schedule_tuple(tag)
+                    leave, ret = _schedule_tuple(tag, k)
                     people.append({"role": "adult", "schedule_profile": tag, "leave": leave, "return": ret})
             elif stype == "dual_earner_household":
-                for i in range(n_adults):
-                    tag = "WORK_STD" if i == 0 else ("WORK_EARLY" if rng_sched.random() < 0.5 else "WORK_LATE")
-                    leave, ret = _schedule_tuple(tag)
+                for i, k in enumerate(itertools.islice(slots, n_adults)):
+                    tag = "WORK_STD" if i == 0 else ("WORK_EARLY" if tag_u[k] < 0.5 else "WORK_LATE")
+                    leave, ret = _schedule_tuple(tag, k)
                     people.append({"role": "adult", "schedule_profile": tag, "leave": leave, "return": ret})
             elif stype == "student_household":
-                for _ in range(n_adults):
+                for k in itertools.islice(slots, n_adults):
                     tag = "STUDENT"
-                    leave, ret = _schedule_tuple(tag)
+                    leave, ret = _schedule_tuple(tag, k)
                     people.append({"role": "adult", "schedule_profile": tag, "leave": leave, "return": ret})
             elif stype == "family_with_children":
                 # adults
-                for i in range(n_adults):
+                for i, k in enumerate(itertools.islice(slots, n_adults)):
                     tag = "SCHOOL_RUN" if i == 0 else "WORK_STD"
-                    leave, ret = _schedule_tuple(tag)
+                    leave, ret = _schedule_tuple(tag, k)
                     people.append({"role": "adult", "schedule_profile": tag, "leave": leave, "return": ret})
             elif stype == "single_parent_with_children":
-                for _ in range(n_adults):
-                    tag = "PART_TIME_AM" if rng_sched.random() < 0.6 else "SCHOOL_RUN"
-                    leave, ret = _schedule_tuple(tag)
+                for k in itertools.islice(slots, n_adults):
+                    tag = "PART_TIME_AM" if tag_u[k] < 0.6 else "SCHOOL_RUN"
+                    leave, ret = _schedule_tuple(tag, k)
                     people.append({"role": "adult", "schedule_profile": tag, "leave": leave, "return": ret})
             else:
                 # Fallback to legacy profiles
-                for _ in range(n_people):
-                    prof = random.choice(legacy_profiles)
+                for k in itertools.islice(slots, n_people):
+                    prof = legacy_profiles[profile_idx[k]]
                     people.append(
                         {
                             "role": "adult",
@@ -361,60 +431,68 @@ class EnergyModel(mesa.Model):
                 return people
 
             # add children schedules
-            for _ in range(n_children):
+            for k in itertools.islice(slots, n_children):
                 tag = "SCHOOL_RUN"
-                leave, ret = _schedule_tuple(tag)
+                leave, ret = _schedule_tuple(tag, k)
                 people.append({"role": "child", "schedule_profile": tag, "leave": leave, "return": ret})
 
             return people
 
-        for house in self.household_agents:
-            n_people = n_residents_func(house)
-            scheds = _assign_household_schedules(house, n_people)
-            for sched in scheds:
-                wealth = random.choice(["high", "medium", "low"])
-                person = PersonAgent(
-                    unique_id=f"{house.unique_id}_{uid_counter}",
-                    model=self,
-                    home=house,
-                    schedule_profile=sched["schedule_profile"],
-                    leave_hour=sched.get("leave"),
-                    return_hour=sched.get("return"),
-                    wealth=wealth,
-                    sap=house.sap_rating,
-                )
-                self.person_agents.append(person)
-                house.residents.append(person)
-                if getattr(person, "at_home", True):
-                    house.occupancy_count += 1
+        people: Dict[str, list] = {k: [] for k in ("unique_id", "home_row", "schedule_profile", "leave_hour",
+                                                  "return_hour", "wealth")}
+        for row, (house, n_people, k0) in enumerate(
+                zip(self.household_agents, n_people_per_house.tolist(), first_slot.tolist())):
+            scheds = _assign_household_schedules(house, n_people, k0)
+            for k, sched in enumerate(scheds, start=k0):
+                people["unique_id"].append(f"{house.unique_id}_{uid_counter}")
+                people["home_row"].append(row)
+                people["schedule_profile"].append(sched["schedule_profile"])
+                people["leave_hour"].append(sched.get("leave"))
+                people["return_hour"].append(sched.get("return"))
+                people["wealth"].append(WEALTH_GROUPS[wealth_idx[k]])
                 uid_counter += 1
 
-        # ------------- 3. DataCollector set-up ----------------------
-        make_type_getter = lambda p: (lambda m: m.energy_by_type.get(p, 0))
-        make_wealth_getter = lambda grp: (lambda m: m.energy_by_wealth.get(grp, 0))
-
-        def _mean_ambient_temp(m) -> float:
-            vals = [getattr(h, "ambient_tempC", np.nan) for h in m.household_agents]
-            if not vals:
-                return float("nan")
-            arr = np.array(vals, dtype=float)
-            finite = arr[np.isfinite(arr)]
-            if finite.size == 0:
-                return float("nan")
-            return float(np.nanmean(arr))
-
-        model_reporters = {
-            **{t: make_type_getter(t) for t in PROPERTY_TYPES},
-            **{w: make_wealth_getter(w) for w in ["high", "medium", "low"]},
-            "total_energy": lambda m: sum(h.energy_consumption for h in m.household_agents),
-            "cumulative_energy": lambda m: m.cumulative_energy,
-            "ambient_mean_tempC": _mean_ambient_temp,
-            "climate_hour_index": lambda m: m.current_hour,
-            "config_name": lambda m: getattr(m, "config_name", ""),
-            "config_date": lambda m: getattr(m, "config_date", ""),
-            "config_notes": lambda m: getattr(m.config, "notes", ""),
-        }
-
+        # residents' static fields, one row each; the agents keep a row number and their home
+        home_row = np.array(people.pop("home_row"), dtype=np.int64)
+        self.person_table = AttributeTable({
+            **people,
+            "home_row": home_row,
+            "sap": self.household_table["sap_rating"][home_row],
+        })
+        self.person_table["home_spike_kwh"] = resident_spikes(people["wealth"], self.person_table["sap"], self)
+        self.person_presence_by_hour = resident_presence(people["leave_hour"], people["return_hour"])
+        for row, h in enumerate(home_row.tolist()):
+            house = self.household_agents[h]
+            person = CompactPersonAgent(self, self.person_table, row, house)
+            self.person_agents.append(person)
+            house.residents.append(person)
+            house.occupancy_count += 1
+
+        # NEW: per-household [24] occupancy / spike tables (schedules are fixed for
+        # the run), plus the model-level per-wealth kWh for each local hour.
+        self._build_occupancy_tables()
+        if self.step_hours != 1:
+            self._apply_step_length()
+
+        # ------------- 3. stepping engine ---------------------------
+        engine = engine or self.config.model.get("engine", "agents")
+        if engine not in ("agents", "array"):
+            raise ValueError(f"Unknown engine '{engine}'; expected 'agents' or 'array'.")
+        engine_workers = int(engine_workers or self.config.model.get("engine_workers", 1))
+        if engine_workers > 1 and engine != "array":
+            raise ValueError("engine_workers > 1 needs engine='array'.")
+        partition_by = partition_by or self.config.model.get("partition_by", "clim_idx")
+        partition_keys = None
+        if engine_workers > 1 and partition_by != "clim_idx":
+            if partition_by not in gdf.columns:
+                raise ValueError(f"Cannot partition by '{partition_by}': not a column of gdf.")
+            partition_keys = gdf[partition_by].to_numpy()  # one household per gdf row, same order
+        self.engine: Optional[ArrayEngine] = (
+            ArrayEngine(self, workers=engine_workers, partition_keys=partition_keys) if engine == "array" else None
+        )
+        self._engine_args = dict(workers=engine_workers, partition_keys=partition_keys)  # for reconfigure()
+
+        # ------------- 4. DataCollector set-up ----------------------
         # agent_reporters = {} if not collect_agent_level else {
         #     "agent_type": lambda a: "household" if isinstance(a, HouseholdAgent) else "person",
         #     "energy": lambda a: getattr(a, "energy", 0.0),
@@ -459,54 +537,298 @@ class EnergyModel(mesa.Model):
         # }
         ### MATT EDIT
         # temporary lite version only collects dynamic data
-        agent_reporters = {} if not collect_agent_level else {
-            "energy": lambda a: getattr(a, "energy", 0.0),
-            "energy_consumption": lambda a: getattr(a, "energy_consumption", 0.0),
-        }
+        # (energy / energy_consumption), now via the columnar AgentRecorder
 
         # NEW: split collectors → model every step; agent downsampled
-        self.model_dc = mesa.DataCollector(model_reporters=model_reporters)  # NEW
-        self.agent_dc = None  # NEW
-        if collect_agent_level:  # NEW
-            self.agent_dc = mesa.DataCollector(agent_reporters=agent_reporters)  # NEW
+        self.model_dc = self._model_collector()  # NEW
+        self.agent_dc: Optional[AgentRecorder] = None  # NEW
         self.agent_collect_every = max(1, int(agent_collect_every))  # NEW
+        if collect_agent_level:  # NEW
+            n_collect = None if n_steps is None else int(n_steps * self._step_frac) // self.agent_collect_every + 1
+            self.agent_dc = AgentRecorder(
+                self,
+                n_collect=n_collect,
+                include_persons=collect_person_level,
+                sink=agent_sink,
+                flush_every=agent_flush_every,
+            )
 
         # NEW: backward-compat alias (so existing code referencing .datacollector still works for model-level)
         self.datacollector = self.model_dc  # NEW
 
         # initial snapshot (t = 0)
         self.model_dc.collect(self)
-        if self.agent_dc is not None and (self.current_hour % self.agent_collect_every == 0):  # NEW
+        if self.agent_dc is not None and self._agent_collect_due():  # NEW
             self.agent_dc.collect(self)  # NEW
 
+    def _model_collector(self) -> mesa.DataCollector:
+        """Model-level DataCollector: kWh by property type and wealth group, totals, climate, config."""
+        make_type_getter = lambda p: (lambda m: m.energy_by_type.get(p, 0))
+        make_wealth_getter = lambda grp: (lambda m: m.energy_by_wealth.get(grp, 0))
+
+        def _mean_ambient_temp(m) -> float:
+            if m.engine is not None:
+                return m.engine.mean_ambient_tempC()
+            vals = [getattr(h, "ambient_tempC", np.nan) for h in m.household_agents]
+            if not vals:
+                return float("nan")
+            arr = np.array(vals, dtype=float)
+            finite = arr[np.isfinite(arr)]
+            if finite.size == 0:
+                return float("nan")
+            return float(np.nanmean(arr))
+
+        model_reporters = {
+            **{t: make_type_getter(t) for t in PROPERTY_TYPES},
+            **{w: make_wealth_getter(w) for w in ["high", "medium", "low"]},
+            "total_energy": lambda m: m.total_energy,
+            "cumulative_energy": lambda m: m.cumulative_energy,
+            "ambient_mean_tempC": _mean_ambient_temp,
+            "climate_hour_index": lambda m: m.current_hour,
+            "config_name": lambda m: getattr(m, "config_name", ""),
+            "config_date": lambda m: getattr(m, "config_date", ""),
+            "config_notes": lambda m: getattr(m.config, "notes", ""),
+        }
+        return mesa.DataCollector(model_reporters=model_reporters)
+
+    def __getstate__(self) -> dict:
+        # the reporters are closures; an unpickled model starts a fresh DataCollector (see __setstate__)
+        state = dict(self.__dict__)
+        state["model_dc"] = state["datacollector"] = None
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self.model_dc = self.datacollector = self._model_collector()
+
+    def reconfigure(self, **params) -> None:
+        """Apply new ``model:`` config values to the built population and rewind to t = 0.
+
+        Households, residents, schedules and the climate mapping are kept; only
+        what the given keys feed is recomputed (nothing for the per-tick keys in
+        ``TICK_PARAMS``; per-dwelling base load, heat slope, capacity and heat
+        pumps otherwise; resident tables for ``PERSON_PARAMS``). The result
+        steps exactly as a model built from scratch with those values. Used by
+        the parameter sweep (sweep.py) in place of a rebuild per point.
+        """
+        fixed = sorted(set(params) & BUILD_ONLY_PARAMS)
+        if fixed:
+            raise ValueError(f"{fixed} are fixed when the model is built; build a new model to change them.")
+        unknown = sorted(set(params) - set(self.config.model))
+        if unknown:
+            raise ValueError(f"Unknown model parameters {unknown}.")
+        if self.agent_dc is not None:
+            raise ValueError("reconfigure() needs a model built with collect_agent_level=False.")
+
+        self.config = ModelConfig(raw={**self.config.raw, "model": {**self.config.model, **params}})
+        self._load_model_params()
+        self._load_heatpump_params()
+        if not set(params) <= TICK_PARAMS:
+            # the agents read these straight from the table
+            for name, values in household_params(self.household_table, self).items():
+                self.household_table[name] = values
+            self.household_table["has_heatpump"] = self.household_table["was_heatpump_initial"].copy()
+            self._assign_heatpumps()
+        if set(params) & PERSON_PARAMS:
+            people = self.person_table
+            people["home_spike_kwh"] = resident_spikes(people["wealth"], people["sap"], self)
+            self._build_occupancy_tables()
+            if self.step_hours != 1:
+                self._apply_step_length()
+        if self.engine is not None:
+            self.engine.close()
+            self.engine = ArrayEngine(self, **self._engine_args)
+
+        for h in self.household_agents:
+            h.reset_energy()
+            h.ambient_tempC = float("nan")
+        for i in self._cap_clipped:
+            self.household_agents[i].clear_cap_clip()
+        self._cap_clipped = []
+        self.current_hour = 0
+        self.total_energy = 0.0
+        self.cumulative_energy = 0.0
+        self.energy_by_type = {t: 0.0 for t in PROPERTY_TYPES}
+        self.energy_by_wealth = dict.fromkeys(WEALTH_GROUPS, 0.0)
+        self.model_dc = self.datacollector = self._model_collector()
+        self.model_dc.collect(self)
+
+    @property
+    def current_hour(self) -> float | int:
+        """Hours since the start, ``ticks * step_hours`` (an int on whole hours)."""
+        return self._current_hour
+
+    @current_hour.setter
+    def current_hour(self, hour: float) -> None:
+        self._set_ticks(round(hour / self._step_frac))
+
+    def _set_ticks(self, ticks: int) -> None:
+        self.ticks = ticks
+        hour = ticks * self._step_frac
+        self._current_hour = int(hour) if hour.denominator == 1 else float(hour)
+
+    def _agent_collect_due(self) -> bool:
+        # exact: the hours elapsed are a whole multiple of agent_collect_every
+        return (self.ticks * self._step_frac) % self.agent_collect_every == 0
+
     def local_hour(self) -> int:
         return int((self._clock0 + self.current_hour) % 24)
 
+    def step_hour(self) -> int:
+        """Local hour of the schedule tables for the tick just taken.
+
+        Hourly tick h (ending at ``current_hour`` h) reads climate row h - 1
+        (see climate_temps) with the schedules of local hour h. A step of any
+        length reads the hourly tick its start falls in, so a 3 h step reads
+        hours h - 2 .. h (the window _apply_step_length builds from h - 2) and
+        a quarter-hour step reads the hour it lies within.
+        """
+        start = (self.ticks - 1) * self._step_frac
+        return int((self._clock0 + math.floor(start) + 1) % 24)
+
     # ------------------------------------------------------------------
     #  Per-tick update
     # ------------------------------------------------------------------
     def step(self) -> None:
-        """Advance simulation by one hour."""
-        self.current_hour += 1
+        """Advance simulation by one tick (``step_hours``)."""
+        self._set_ticks(self.ticks + 1)
 
+        if self.engine is not None:
+            tick_total = self.engine.step()
+        else:
+            tick_total = self._step_agents()
+        if self.step_hours != 1:
+            tick_total = self._scale_tick(tick_total)
+
+        # 5) cumulative total
+        self.total_energy = tick_total
+        self.cumulative_energy += tick_total
+
+        # 6) collect
+        self.model_dc.collect(self)
+        if self.agent_dc is not None and self._agent_collect_due():  # NEW
+            self.agent_dc.collect(self)  # NEW
+
+    @staticmethod
+    def _check_step_hours(step_hours) -> float | int:
+        s = float(step_hours)
+        whole = s.is_integer() or (1 / s).is_integer() if s > 0 else False
+        if not whole or not (24 / s).is_integer():
+            raise ValueError(f"step_hours must divide 24 h into whole steps (e.g. 0.25, 1, 3, 6); got {step_hours}.")
+        return int(s) if s.is_integer() else s  # keep current_hour an int for whole-hour steps
+
+    def _load_model_params(self) -> None:
+        """Copy the typed scalar ``model:`` parameters (``MODEL_SCALARS``) onto the model.
+
+        Baseline is a small meter-derived constant; structural multipliers are
+        applied to heating only (see _compute_hourly_base_kwh in agent.py).
+        """
+        params = self.config.params
+        for name in MODEL_SCALARS:
+            setattr(self, name, getattr(params, name))
+        self.property_type_mult_base: Dict[str, float] = self.config.model.get("property_type_mult_base", {})
+
+    def _load_heatpump_params(self) -> None:
+        self.boiler_efficiency = float(self.config.model.get("boiler_efficiency", 0.90))
+        self.heatpump_cop_ref = float(self.config.model.get("heatpump_cop_ref", 2.8))
+        self.heatpump_adoption_rate = self.config.model.get("heatpump_adoption_rate", 0.0)
+        self.heatpump_class_weight = {**HEATPUMP_CLASS_WEIGHT, **self.config.model.get("heatpump_class_weight", {})}
+
+    def climate_temps(self) -> Optional[np.ndarray]:
+        """Grid temps [P] for the tick just started, or None outside the climate data."""
+        t = self._t0 + float((self.ticks - 1) * self._step_frac)
+        return self.climate.temps_for_step(t, self.step_hours)
+
+    def _apply_step_length(self) -> None:
+        """Turn the [24]-hour tables into per-step tables, indexed by ``step_hour()``.
+
+        Column h of a multi-hour table covers local hours h .. h + step_hours - 1,
+        the hourly ticks the step replaces.
+
+        Household occupancy and spikes stay hourly rates (averaged over a multi-hour
+        step; the occupancy count is the step's peak, and the share of its hours
+        with anyone home scales the climate load as hourly ticks would),
+        scaled with the rest of the tick in _scale_tick. Resident and per-wealth
+        kWh are reported directly, so they become kWh per step here.
+        """
+        s = self.step_hours
+        if s > 1:
+            window = (np.arange(24)[:, None] + np.arange(s)[None, :]) % 24  # [24, s] hours each step covers
+            self.occupancy_by_hour = self.occupancy_by_hour[:, window].max(axis=2)
+            self.occupied_share_by_hour = self.occupied_share_by_hour[:, window].mean(axis=2, dtype=np.float32)
+            self.spike_kwh_by_hour = self.spike_kwh_by_hour[:, window].mean(axis=2)
+            self.person_energy_by_hour = self.person_energy_by_hour[:, window].mean(axis=2)
+            self.energy_by_wealth_by_hour = self.energy_by_wealth_by_hour[window].mean(axis=1)
+        self.person_energy_by_hour = self.person_energy_by_hour * s
+        self.energy_by_wealth_by_hour = self.energy_by_wealth_by_hour * s
+
+    def _scale_tick(self, tick_total: float) -> float:
+        """Scale the tick's hourly-rate outputs to kWh per step (per-wealth kWh already are)."""
+        s = self.step_hours
+        self.energy_by_type = {t: v * s for t, v in self.energy_by_type.items()}
+        if self.engine is not None:
+            self.engine.scale_tick(s)
+        else:
+            for h in self.household_agents:
+                for name in STEP_KWH_ATTRS:
+                    setattr(h, name, getattr(h, name, 0.0) * s)
+            for i in self._cap_clipped:
+                h = self.household_agents[i]
+                for name in CAP_CLIP_ATTRS:
+                    setattr(h, name, getattr(h, name) * s)
+        return tick_total * s
+
+    def _build_occupancy_tables(self) -> None:
+        """Sum resident presence / kWh per household for each local hour (0–23)."""
+        n = len(self.household_agents)
+        people = self.person_table
+        home = people["home_row"]
+        wealth_pos = {w: i for i, w in enumerate(WEALTH_GROUPS)}
+        wealth = np.fromiter((wealth_pos[w] for w in people["wealth"]), dtype=np.int64, count=len(people))
+        presence = self.person_presence_by_hour.astype(np.int64)
+        # per-person kWh by hour (also read by the agent recorder)
+        self.person_energy_by_hour = np.where(
+            self.person_presence_by_hour, people["home_spike_kwh"][:, None], self.energy_per_person_away
+        )
+
+        self.occupancy_by_hour = np.zeros((n, 24), dtype=np.int64)
+        self.spike_kwh_by_hour = np.zeros((n, 24))
+        self.energy_by_wealth_by_hour = np.zeros((24, len(WEALTH_GROUPS)))
+        np.add.at(self.occupancy_by_hour, home, presence)
+        # 0/1 per hour; the share of a step's hours with anyone home once windowed (_apply_step_length)
+        self.occupied_share_by_hour = (self.occupancy_by_hour > 0).astype(np.float32)
+        np.add.at(self.spike_kwh_by_hour, home, self.person_energy_by_hour)
+        np.add.at(self.energy_by_wealth_by_hour.T, wealth, self.person_energy_by_hour)
+
+    def _step_agents(self) -> float:
+        """Per-agent tick (reference path); returns the tick total (kWh)."""
         # 1) reset + add precomputed base load
         for h in self.household_agents:
             h.reset_energy()
             h.base_kwh = h.calc_base_energy()
             h.energy_consumption += h.base_kwh
 
-        # 2) update residents
-        for p in self.person_agents:
-            p.step()
+        # 2) residents: occupancy + spikes from the precomputed hour tables
+        hour = self.step_hour()
+        occupancy = self.occupancy_by_hour[:, hour].tolist()
+        occupied = self.occupied_share_by_hour[:, hour].tolist()
+        spikes = self.spike_kwh_by_hour[:, hour].tolist()
+        for h, occ, spike in zip(self.household_agents, occupancy, spikes):
+            h.occupancy_count = occ
+            h.spike_kwh = spike
+            h.energy_consumption += spike
 
         # 3) climate sampling + apply per dwelling
         if self.climate is not None and self._clim_idx_per_house is not None:
-            t = self._t0 + (self.current_hour - 1)
-            if 0 <= t < len(self.climate.times):
-                vecP = self.climate.temps_at_index(t)  # shape [P]
-                for h in self.household_agents:
+            vecP = self.climate_temps()  # shape [P]
+            if vecP is not None:
+                house_temps = None if self._clim_weights is None else (self._clim_weights @ vecP).tolist()
+                for i, h in enumerate(self.household_agents):
                     idx = h.clim_idx
-                    tempC = float(vecP[idx]) if idx is not None else float("nan")
+                    if idx is None:
+                        tempC = float("nan")
+                    else:
+                        tempC = float(vecP[idx]) if house_temps is None else house_temps[i]
                     occ = h.occupancy_count  # NEW: fast counter (no per-hour loop)
                     h.apply_climate(
                         tempC,
@@ -515,6 +837,7 @@ class EnergyModel(mesa.Model):
                         heat_slope=getattr(h, "heat_slope_kWh_per_deg", self.heating_slope_kWh_per_deg),  # CHANGED
                         cool_slope=self.cooling_slope_kWh_per_deg,
                         occupancy=occ,
+                        occupied_share=occupied[i],
                     )
 
             else:
@@ -528,53 +851,60 @@ class EnergyModel(mesa.Model):
                     )
 
         # 4) aggregate by property type + wealth group
-        # enforce total hourly cap per dwelling after all components (base + climate + spikes)
+        return self._cap_and_aggregate(hour)
+
+    def _cap_and_aggregate(self, hour: int) -> float:
+        """Cap and aggregate the agent loop's tick; returns the tick total (kWh)."""
+        # enforce total hourly cap per dwelling after all components (base + climate + spikes);
+        # the totals are read once, for the cap and the aggregates
+        houses = self.household_agents
+        total = np.fromiter((h.energy_consumption for h in houses), dtype=float, count=len(houses))
         max_total = getattr(self, "max_total_kwh_per_hour", None)
         if max_total is not None:
-            for h in self.household_agents:
-                if h.energy_consumption > max_total:
-                    pre = h.energy_consumption
-                    clip = pre - max_total
-                    # proportional attribution for diagnostics
-                    base = getattr(h, "base_kwh", 0.0)
-                    heat = getattr(h, "heat_kwh", 0.0)
-                    spike = getattr(h, "spike_kwh", pre - base - heat)
-                    denom = base + heat + spike
-                    if denom <= 0:
-                        fb = fh = fs = 0.0
-                    else:
-                        fb = clip * (base / denom)
-                        fh = clip * (heat / denom)
-                        fs = clip * (spike / denom)
-                    h.cap_clip_total = clip
-                    h.cap_clip_base = fb
-                    h.cap_clip_heat = fh
-                    h.cap_clip_spike = fs
-                    h.energy_consumption = max_total
+            self._cap_households(total, max_total)
 
-        # 4) aggregate by property type + wealth group
-        self.energy_by_type = {t: 0.0 for t in PROPERTY_TYPES}
-        for h in self.household_agents:
-            ptype = getattr(h, "property_type", "")
-            if ptype in self.energy_by_type:
-                self.energy_by_type[ptype] += h.energy_consumption
+        # bincount adds in household order, as a loop over the agents would
+        ptype_idx = self._ptype_idx
+        known = ptype_idx >= 0
+        by_type = np.bincount(ptype_idx[known], weights=total[known], minlength=len(PROPERTY_TYPES))
+        self.energy_by_type = dict(zip(PROPERTY_TYPES, by_type.tolist()))
 
-        self.energy_by_wealth = dict.fromkeys(["high", "medium", "low"], 0.0)
-        for p in self.person_agents:
-            self.energy_by_wealth[p.wealth] += p.energy
+        self.energy_by_wealth = dict(zip(WEALTH_GROUPS, self.energy_by_wealth_by_hour[hour].tolist()))
 
-        # 5) cumulative total
-        tick_total = sum(h.energy_consumption for h in self.household_agents)
-        self.cumulative_energy += tick_total
+        return sum(total.tolist())
+
+    def _cap_households(self, total: np.ndarray, max_total: float) -> None:
+        """Clip the dwelling ``total``s above ``max_total``, in place and on their agents (agent loop).
+
+        Only the clipped dwellings are touched. With cap diagnostics on, the clip
+        and its proportional base / heat / spike shares go to their ``cap_clip_*``;
+        the dwellings clipped the tick before are zeroed first, so every other
+        dwelling keeps reading 0.
+        """
+        houses = self.household_agents
+        for i in self._cap_clipped:
+            houses[i].clear_cap_clip()
+        self._cap_clipped = []
+        over = np.flatnonzero(total > max_total).tolist()
+        if not over:
+            return
+        clipped = [houses[i] for i in over]
+        if self.cap_diagnostics:
+            clip = total[over] - max_total
+            components = [np.fromiter((getattr(h, name) for h in clipped), dtype=float, count=len(clipped))
+                          for name in ("base_kwh", "heat_kwh", "spike_kwh")]
+            values = zip(clip.tolist(), *(v.tolist() for v in clip_attribution(clip, *components)))
+            for h, row in zip(clipped, values):
+                h.cap_clip_total, h.cap_clip_base, h.cap_clip_heat, h.cap_clip_spike = row
+            self._cap_clipped = over
+        total[over] = max_total
+        for h in clipped:
+            h.energy_consumption = max_total
 
-        # 6) collect
-        self.model_dc.collect(self)
-        if self.agent_dc is not None and (self.current_hour % self.agent_collect_every == 0):  # NEW
-            self.agent_dc.collect(self)  # NEW
     def _assign_heatpumps(self) -> None:
         """Assign heat pumps to top X% of eligible candidates (or per-class shares).
         Scoring uses expected kWh reduction from lowering the heating slope via HP.
-        Deterministic (ties broken by object id). Skips homes that already had a HP.
+        Deterministic: the sorts are stable, so ties keep household order. Skips homes that already had a HP.
         """
         rate = self.heatpump_adoption_rate
         if not rate:
@@ -605,7 +935,7 @@ class EnergyModel(mesa.Model):
 
         # Case A: single global fraction
         if isinstance(rate, (int, float)):
-            ranked = sorted(elig, key=lambda h: (-hp_score(h), id(h)))
+            ranked = sorted(elig, key=hp_score, reverse=True)
             n_take = int(len(ranked) * float(rate) + 1e-9)
             for h in ranked[:n_take]:
                 h.has_heatpump = True
@@ -619,7 +949,7 @@ class EnergyModel(mesa.Model):
                 if c in by_class:
                     by_class[c].append(h)
             for c, homes in by_class.items():
-                homes.sort(key=lambda h: (-hp_score(h), id(h)))
+                homes.sort(key=hp_score, reverse=True)
                 frac = float(rate.get(c, 0.0))
                 n_take = int(len(homes) * frac + 1e-9)
                 for h in homes[:n_take]:
@@ -2,26 +2,148 @@
 
 Provides a simple way to externalize model parameters into a YAML/JSON file.
 Defaults live in ``config_defaults.yaml``; users can pass ``config_path`` to override.
+
+``load_config`` parses each (defaults, override) pair once per file version
+(path and mtime) and hands every caller its own copy of the raw dict.  Each
+ModelConfig also carries ``params``: a frozen ModelParams with the ``model:``
+scalars already typed and the property-type, bedroom and heating-system
+multipliers resolved into flat lookup tables, for code that runs per dwelling.
 """
 
 from __future__ import annotations
 
-from dataclasses import dataclass
+import copy
+from dataclasses import MISSING, dataclass, field, fields
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, Optional
+from types import MappingProxyType
+from typing import Any, Dict, Mapping, Optional, Tuple
 
 import yaml
 
+from .agent import PROPERTY_TYPE_MULT_BASE, PROPERTY_TYPE_MULT_HEAT
+
 DEFAULT_PATH = Path(__file__).with_name("config_defaults.yaml")
 
+# systems: entries whose heating_slope_mult the heat slope applies, with the default for each
+SYSTEM_SLOPE_DEFAULTS = {"heat_pump": 0.70, "electric_heating": 1.00, "gas_boiler": 1.00}
+
+def _table() -> Mapping[Any, float]:
+    return MappingProxyType({})
+
+
+@dataclass(frozen=True)
+class ModelParams:
+    """Typed, read-only view of the config the per-dwelling parameters are computed from.
+
+    The scalars are the ``model:`` keys the EnergyModel copies onto itself
+    (``MODEL_SCALARS``), each defaulted and cast like the value it replaces.
+    The tables give a multiplier per key, with the fallback next to them:
+
+    * ``pt_base_mult``: property type -> baseline multiplier (else 1.0)
+    * ``pt_heat_mult``: property type -> heat-slope multiplier (else ``pt_heat_default``)
+    * ``pt_capacity_mult``: property type -> heating-capacity multiplier (else ``pt_heat_default``)
+    * ``bedroom_mult``: size band -> heat-slope multiplier (else 1.0)
+    * ``system_slope_mult``: configured ``SYSTEM_SLOPE_DEFAULTS`` entry -> heat-slope multiplier
+    """
+
+    energy_per_person_home: float = 0.06
+    energy_per_person_away: float = 0.01
+    heating_setpoint_C: float = 18.5
+    cooling_threshold_C: float = 24.0
+    heating_slope_kWh_per_deg: float = 0.05
+    cooling_slope_kWh_per_deg: float = 0.03
+    apply_structural_multipliers: bool = True
+    heat_slope_area_exp: float = 0.6
+    heat_slope_min: float = 0.0
+    heat_slope_max: float = 0.10
+    max_heat_kwh_per_hour: float = 20.0
+    max_total_kwh_per_hour: float = 20.0
+    max_base_kwh_per_hour: float = 1.5
+    loss_to_duty_k: float = 3.0
+    base_heat_capacity: float = 8.0
+    heat_capacity_area_exp: float = 0.5
+    min_heat_capacity: float = 4.0
+    use_epc_for_baseline: bool = False
+    baseline_anchor_kwh_per_hour: float = 0.4
+    baseline_area_ref_m2: float = 70.0
+    baseline_area_exp: float = 0.20
+    baseline_area_clip: Tuple[float, float] = (0.85, 1.25)
+
+    pt_base_mult: Mapping[Any, float] = field(default_factory=_table)
+    pt_heat_mult: Mapping[Any, float] = field(default_factory=_table)
+    pt_capacity_mult: Mapping[Any, float] = field(default_factory=_table)
+    pt_heat_default: float = 1.0
+    bedroom_mult: Mapping[Any, float] = field(default_factory=_table)
+    system_slope_mult: Mapping[str, float] = field(default_factory=_table)
+
+    @classmethod
+    def from_raw(cls, raw: Dict[str, Any]) -> "ModelParams":
+        model = raw.get("model", {})
+        scalars = {
+            name: type(default)(model.get(name, default))
+            for name, default in ((f.name, f.default) for f in fields(cls) if f.name in MODEL_SCALARS)
+        }
+
+        base_cfg = model.get("property_type_mult_base", {})
+        heat_cfg = model.get("pt_heat_mult", {})
+        pt_heat_default = float(heat_cfg.get("default", 1.0))
+        pt_base = {p: float(base_cfg.get(p, PROPERTY_TYPE_MULT_BASE.get(p, 1.0)))
+                   for p in {**PROPERTY_TYPE_MULT_BASE, **base_cfg}}
+        pt_heat = {p: float(heat_cfg.get(p, heat_cfg.get("default", PROPERTY_TYPE_MULT_HEAT.get(p, 1.0))))
+                   for p in {**PROPERTY_TYPE_MULT_HEAT, **heat_cfg}}
+
+        bedroom = {}
+        for band, mult in (raw.get("households", {}).get("bedroom_multiplier") or {}).items():
+            try:
+                bedroom[band] = float(mult)
+            except (TypeError, ValueError):
+                pass  # an unusable multiplier leaves that band unscaled
+        systems = raw.get("systems", {})
+        system_slope = {
+            name: float(systems.get(name, {}).get("heating_slope_mult", default))
+            for name, default in SYSTEM_SLOPE_DEFAULTS.items() if name in systems
+        }
+
+        return cls(
+            **scalars,
+            pt_base_mult=MappingProxyType(pt_base),
+            pt_heat_mult=MappingProxyType(pt_heat),
+            pt_capacity_mult=MappingProxyType({p: float(v) for p, v in heat_cfg.items()}),
+            pt_heat_default=pt_heat_default,
+            bedroom_mult=MappingProxyType(bedroom),
+            system_slope_mult=MappingProxyType(system_slope),
+        )
+
+
+MODEL_SCALARS: Tuple[str, ...] = tuple(
+    f.name for f in fields(ModelParams) if f.default_factory is MISSING and f.name != "pt_heat_default"
+)
+
+
 @dataclass
 class ModelConfig:
     """Lightweight container for model-level parameters.
 
     We keep this intentionally loose; unknown fields are preserved in the raw dict.
+    ``params`` is derived from ``raw`` when not given; build a new ModelConfig
+    rather than editing ``raw`` in place, or the two disagree.
     """
 
     raw: Dict[str, Any]
+    params: Optional[ModelParams] = field(default=None, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        if self.params is None:
+            self.params = ModelParams.from_raw(self.raw)
+
+    def __getstate__(self) -> dict:
+        # mapping proxies don't pickle; params are derived again on load
+        return {"raw": self.raw}
+
+    def __setstate__(self, state: dict) -> None:
+        self.raw = state["raw"]
+        self.params = ModelParams.from_raw(self.raw)
 
     @property
     def meta(self) -> Dict[str, Any]:
@@ -88,17 +210,35 @@ def _deep_merge(base: Dict[str, Any], overrides: Dict[str, Any]) -> Dict[str, An
     return out
 
 
+def _file_key(path: Path) -> Tuple[str, int, int]:
+    stat = path.stat()
+    return str(path.resolve()), stat.st_mtime_ns, stat.st_size
+
+
+@lru_cache(maxsize=32)
+def _parsed(defaults: Tuple[str, int, int], override: Optional[Tuple[str, int, int]]) -> ModelConfig:
+    # keyed on path, mtime and size, so an edited file is read again
+    base = _load_yaml(Path(defaults[0]))
+    if override is not None:
+        base = _deep_merge(base, _load_yaml(Path(override[0])))
+    return ModelConfig(raw=base)
+
+
 def load_config(config_path: Optional[str | Path] = None) -> ModelConfig:
-    """Load defaults and merge optional overrides from ``config_path``."""
+    """Load defaults and merge optional overrides from ``config_path``.
 
-    base = _load_yaml(DEFAULT_PATH)
+    Files are parsed once per version; each call gets its own copy of the
+    raw dict (callers may change it) sharing the frozen ``params``.
+    """
+
+    override = None
     if config_path:
         override_path = Path(config_path)
         if not override_path.exists():
             raise FileNotFoundError(f"Config override not found: {override_path}")
-        overrides = _load_yaml(override_path)
-        base = _deep_merge(base, overrides)
-    return ModelConfig(raw=base)
+        override = _file_key(override_path)
+    cached = _parsed(_file_key(DEFAULT_PATH), override)
+    return ModelConfig(raw=copy.deepcopy(cached.raw), params=cached.params)
 
 
-__all__ = ["ModelConfig", "load_config", "DEFAULT_PATH"]
+__all__ = ["ModelConfig", "ModelParams", "MODEL_SCALARS", "load_config", "DEFAULT_PATH"]
@@ -0,0 +1,213 @@
+"""
+recorder.py
+===========
+
+Columnar, preallocated recorder for agent-level energy traces.
+
+Replaces ``mesa.DataCollector(agent_reporters=...)`` for the per-agent
+``energy`` / ``energy_consumption`` series.  Instead of calling two
+``getattr`` lambdas per agent and building a tuple per row, each collection
+step is a single slice copy into float32 arrays of shape
+``[n_collect_steps, n_households]`` (and ``[n_collect_steps, n_persons]``
+when resident traces are kept).
+
+Tables are only materialised on demand:
+
+* ``get_agent_vars_dataframe()`` – same (Step, AgentID) layout as Mesa, so
+  existing consumers keep working;
+* ``to_arrow()`` / ``to_parquet(path)`` – long-format Arrow table.
+
+For long runs the recorder can stream instead: give it a ``sink`` and it
+keeps only ``flush_every`` collection steps in memory, handing each full
+chunk to ``sink.write(columns)`` (e.g. one Parquet row group or one DB batch)
+and reusing the buffer.  Peak memory is then bounded by the chunk size, not
+the run length.  A sink is any object with ``write(columns)`` and ``close()``;
+``columns`` is a dict of equal-length arrays: Step, AgentID, energy,
+energy_consumption.  Step is the model's hours since the start, which is the
+step number for the default one-hour steps.
+
+Whether streaming or not, the recorder also keeps running per-household
+totals and the overall min/max household value over every collected step,
+so run summaries don't need the trace read back.
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import TYPE_CHECKING, Optional, Protocol
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+if TYPE_CHECKING:  # pragma: no cover - typing only
+    from .model import EnergyModel
+
+
+class AgentSink(Protocol):
+    """Destination for streamed agent-trace chunks."""
+
+    def write(self, columns: dict) -> None: ...
+
+    def close(self) -> None: ...
+
+
+def columns_to_arrow(columns: dict) -> pa.Table:
+    """Long-format recorder columns → Arrow table."""
+    cols = dict(columns)
+    cols["AgentID"] = pa.array(cols["AgentID"].tolist(), type=pa.string())
+    return pa.table(cols)
+
+
+class ParquetSink:
+    """Append each flushed chunk to a Parquet file as one row group."""
+
+    def __init__(self, path: str | Path, **writer_kwargs) -> None:
+        self.path = Path(path)
+        self.writer_kwargs = writer_kwargs
+        self._writer: Optional[pq.ParquetWriter] = None
+        self.rows_written = 0
+
+    def write(self, columns: dict) -> None:
+        table = columns_to_arrow(columns)
+        if self._writer is None:
+            self._writer = pq.ParquetWriter(self.path, table.schema, **self.writer_kwargs)
+        self._writer.write_table(table)
+        self.rows_written += table.num_rows
+
+    def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+
+class AgentRecorder:
+    """Preallocated float32 store of per-agent energy, one row per collection step."""
+
+    def __init__(
+        self,
+        model: "EnergyModel",
+        *,
+        n_collect: Optional[int] = None,
+        include_persons: bool = True,
+        dtype=np.float32,
+        sink: Optional[AgentSink] = None,
+        flush_every: int = 24,
+    ) -> None:
+        self.include_persons = include_persons
+        self.sink = sink
+        self.rows_flushed = 0
+        self.dtype = dtype
+        self.household_ids = np.array([str(h.unique_id) for h in model.household_agents], dtype=object)
+        self.person_ids = np.array(
+            [str(p.unique_id) for p in model.person_agents] if include_persons else [], dtype=object
+        )
+        if sink is not None:
+            capacity = max(1, int(flush_every))  # fixed-size chunk buffer
+        else:
+            capacity = max(1, int(n_collect)) if n_collect else 64
+        self.steps = np.zeros(capacity, dtype=np.int64)
+        self.household_energy = np.zeros((capacity, len(self.household_ids)), dtype=dtype)
+        self.person_energy = np.zeros((capacity, len(self.person_ids)), dtype=dtype)
+        self.n_rows = 0
+        # running statistics over every collected step (survive flushes)
+        self.household_total = np.zeros(len(self.household_ids))
+        self.household_min = np.inf
+        self.household_max = -np.inf
+
+    @property
+    def capacity(self) -> int:
+        return len(self.steps)
+
+    def _grow(self) -> None:
+        """Double capacity (only when the run is longer than preallocated)."""
+        extra = self.capacity
+        self.steps = np.concatenate([self.steps, np.zeros(extra, dtype=np.int64)])
+        self.household_energy = np.concatenate(
+            [self.household_energy, np.zeros((extra, self.household_energy.shape[1]), dtype=self.dtype)]
+        )
+        self.person_energy = np.concatenate(
+            [self.person_energy, np.zeros((extra, self.person_energy.shape[1]), dtype=self.dtype)]
+        )
+
+    # ------------------------------------------------------------------
+    #  Collection
+    # ------------------------------------------------------------------
+    def collect(self, model: "EnergyModel") -> None:
+        """Copy the current tick's per-agent energy into the next row."""
+        if self.n_rows == self.capacity:
+            self._grow()  # only reachable without a sink; streaming flushes when full
+        k = self.n_rows
+        self.steps[k] = int(model.current_hour)  # hours, whatever the step length
+        if model.engine is not None:
+            self.household_energy[k] = model.engine.energy_consumption
+        else:
+            self.household_energy[k] = np.fromiter(
+                (h.energy_consumption for h in model.household_agents),
+                dtype=float, count=len(self.household_ids),
+            )
+        row = self.household_energy[k]
+        self.household_total += row
+        if row.size:
+            self.household_min = min(self.household_min, float(row.min()))
+            self.household_max = max(self.household_max, float(row.max()))
+        if self.include_persons:
+            # residents have not been stepped at t = 0
+            if model.current_hour == 0:
+                self.person_energy[k] = 0.0
+            else:
+                self.person_energy[k] = model.person_energy_by_hour[:, model.step_hour()]
+        self.n_rows += 1
+        if self.sink is not None and self.n_rows == self.capacity:
+            self.flush()
+
+    def flush(self) -> None:
+        """Hand buffered rows to the sink and reuse the buffer."""
+        if self.sink is None or self.n_rows == 0:
+            return
+        self.sink.write(self._long_columns())
+        self.rows_flushed += self.n_rows
+        self.n_rows = 0
+
+    def close(self) -> None:
+        """Flush any partial chunk and close the sink (no-op when not streaming)."""
+        if self.sink is None:
+            return
+        self.flush()
+        self.sink.close()
+
+    # ------------------------------------------------------------------
+    #  Export (on demand)
+    # ------------------------------------------------------------------
+    def _long_columns(self) -> dict:
+        k = self.n_rows
+        hh = self.household_energy[:k]
+        pp = self.person_energy[:k]
+        n_agents = hh.shape[1] + pp.shape[1]
+        ids = np.concatenate([self.household_ids, self.person_ids])
+        return {
+            "Step": np.repeat(self.steps[:k], n_agents),
+            "AgentID": np.tile(ids, k),
+            "energy": np.concatenate([np.zeros_like(hh), pp], axis=1).ravel(),
+            "energy_consumption": np.concatenate([hh, np.zeros_like(pp)], axis=1).ravel(),
+        }
+
+    def get_agent_vars_dataframe(self) -> pd.DataFrame:
+        """(Step, AgentID)-indexed frame matching Mesa's agent DataCollector layout.
+
+        When streaming, only rows not yet flushed to the sink are included.
+        """
+        cols = self._long_columns()
+        index = pd.MultiIndex.from_arrays([cols.pop("Step"), cols.pop("AgentID")], names=["Step", "AgentID"])
+        return pd.DataFrame(cols, index=index)
+
+    def to_arrow(self) -> pa.Table:
+        return columns_to_arrow(self._long_columns())
+
+    def to_parquet(self, path: str, **kwargs) -> None:
+        pq.write_table(self.to_arrow(), path, **kwargs)
+
+    @property
+    def nbytes(self) -> int:
+        return int(self.household_energy.nbytes + self.person_energy.nbytes + self.steps.nbytes)
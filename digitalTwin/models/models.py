@@ -20,11 +20,12 @@ class Scenario(db.Model):
     init_lat: so.Mapped[int] = so.mapped_column()
     init_lon: so.Mapped[int] = so.mapped_column()
     start_day: so.Mapped[datetime] = so.mapped_column()
-    simulation_step: so.Mapped[int] = so.mapped_column()
+    simulation_step: so.Mapped[float] = so.mapped_column() # hours per model step
     record_every: so.Mapped[int] = so.mapped_column()
     climate_model_id: so.Mapped[Optional[int]] = so.mapped_column()
     policy_id: so.Mapped[Optional[int]] = so.mapped_column()
     population_id: so.Mapped[Optional[int]] = so.mapped_column()
+    agent_results_path: so.Mapped[Optional[str]] = so.mapped_column(sa.String(256)) # set when agent traces live in Parquet
 
     agent_time_series: so.WriteOnlyMapped[Optional['AgentTimeSeries']] = so.relationship(
         back_populates="scenario", 
@@ -41,19 +42,33 @@ class Scenario(db.Model):
         cascade="all, delete-orphan",
         passive_deletes=True
     )
+    summary: so.Mapped[Optional['ScenarioSummary']] = so.relationship(
+        back_populates="scenario", 
+        cascade="all, delete-orphan",
+        passive_deletes=True
+    )
+    ensemble: so.Mapped[Optional['ScenarioEnsemble']] = so.relationship(
+        back_populates="scenario", 
+        cascade="all, delete-orphan",
+        passive_deletes=True
+    )
 
     def __repr__(self):
         return '<scenario {}>'.format(self.scenario_name)
 
 class AgentTimeSeries(db.Model):
     __tablename__ = "agent_time_series"
+    # timeline reads filter on (scenario, step); the energy range is a min/max per scenario
+    __table_args__ = (
+        sa.Index('ix_agent_time_series_scenario_step_agent', 'scenario_id', 'step', 'Agent_id'),
+        sa.Index('ix_agent_time_series_scenario_energy', 'scenario_id', 'energy_consumption'),
+    )
     id: so.Mapped[int] = so.mapped_column(primary_key=True)
     scenario_id: so.Mapped[int] = so.mapped_column(
-        sa.ForeignKey(Scenario.id, ondelete="CASCADE"), 
-        index=True)
+        sa.ForeignKey(Scenario.id, ondelete="CASCADE"))
     scenario: so.Mapped[Scenario] = so.relationship(back_populates='agent_time_series')
-    energy: so.Mapped[int] = so.mapped_column()
-    energy_consumption: so.Mapped[int] = so.mapped_column()
+    energy: so.Mapped[float] = so.mapped_column()
+    energy_consumption: so.Mapped[float] = so.mapped_column()
     step: so.Mapped[int] = so.mapped_column()
     Agent_id: so.Mapped[int] = so.mapped_column()
 
@@ -70,8 +85,8 @@ class EnergyTimeSeries(db.Model):
     step: so.Mapped[int] = so.mapped_column()
     hour: so.Mapped[int] = so.mapped_column()
     day: so.Mapped[int] = so.mapped_column()
-    total_energy: so.Mapped[int] = so.mapped_column()
-    average_energy: so.Mapped[int] = so.mapped_column()
+    total_energy: so.Mapped[float] = so.mapped_column()
+    average_energy: so.Mapped[float] = so.mapped_column()
 
     def __repr__(self):
         return '<energy_ts {}>'.format(self.id)
@@ -102,8 +117,89 @@ class ModelTimeSeries(db.Model):
 
     def __repr__(self):
         return '<model_ts {}>'.format(self.id)
+
+
+class ScenarioSummary(db.Model):
+    """Report aggregates computed once when a scenario finishes, so report pages don't rescan the series."""
+    __tablename__ = "scenario_summary"
+    id: so.Mapped[int] = so.mapped_column(primary_key=True)
+    scenario_id: so.Mapped[int] = so.mapped_column(
+        sa.ForeignKey(Scenario.id, ondelete="CASCADE"), 
+        index=True, unique=True)
+    scenario: so.Mapped[Scenario] = so.relationship(back_populates='summary')
+    timestamp: so.Mapped[datetime] = so.mapped_column(
+        default=lambda: datetime.now(timezone.utc))
+    min_energy: so.Mapped[Optional[float]] = so.mapped_column() # household kWh per recorded step
+    max_energy: so.Mapped[Optional[float]] = so.mapped_column()
+    daily_totals: so.Mapped[List[float]] = so.mapped_column(sa.JSON) # total kWh, one per day
+    day_hour_totals: so.Mapped[List[List[float]]] = so.mapped_column(sa.JSON) # [day][hour] total kWh
+    prop_type_daily_mean: so.Mapped[dict] = so.mapped_column(sa.JSON) # property type -> mean kWh/day
+    wealth_daily_mean: so.Mapped[dict] = so.mapped_column(sa.JSON) # wealth group -> mean kWh/day
+    top_quartile: so.Mapped[List[list]] = so.mapped_column(sa.JSON) # [agent_id, total kWh], highest first
+
+    def __repr__(self):
+        return '<scenario_summary {}>'.format(self.scenario_id)
+
+
+class ScenarioEnsemble(db.Model):
+    """Uncertainty bands from an ensemble of seeded replicas of a scenario (see library/ensembles)."""
+    __tablename__ = "scenario_ensemble"
+    id: so.Mapped[int] = so.mapped_column(primary_key=True)
+    scenario_id: so.Mapped[int] = so.mapped_column(
+        sa.ForeignKey(Scenario.id, ondelete="CASCADE"), 
+        index=True, unique=True)
+    scenario: so.Mapped[Scenario] = so.relationship(back_populates='ensemble')
+    timestamp: so.Mapped[datetime] = so.mapped_column(
+        default=lambda: datetime.now(timezone.utc))
+    replicas: so.Mapped[int] = so.mapped_column()
+    base_seed: so.Mapped[int] = so.mapped_column()
+    daily_bands: so.Mapped[dict] = so.mapped_column(sa.JSON) # column -> {mean, std, min, max, q05, q50, q95: one per day}
+
+    def __repr__(self):
+        return '<scenario_ensemble {}>'.format(self.scenario_id)
     
 
+class Job(db.Model):
+    """A queued scenario run, picked up by the process-pool runner in library/jobQueue."""
+    __tablename__ = "job"
+    id: so.Mapped[int] = so.mapped_column(primary_key=True)
+    scenario_id: so.Mapped[int] = so.mapped_column(
+        sa.ForeignKey(Scenario.id, ondelete="CASCADE"), 
+        index=True)
+    scenario: so.Mapped[Scenario] = so.relationship()
+    status: so.Mapped[str] = so.mapped_column(sa.String(16), index=True, default='queued') # queued, running, completed, failed
+    user_name: so.Mapped[str] = so.mapped_column(sa.String(64))
+    created: so.Mapped[datetime] = so.mapped_column(
+        index=True, default=lambda: datetime.now(timezone.utc))
+    started: so.Mapped[Optional[datetime]] = so.mapped_column()
+    finished: so.Mapped[Optional[datetime]] = so.mapped_column()
+    worker_pid: so.Mapped[Optional[int]] = so.mapped_column()
+    heartbeat: so.Mapped[Optional[datetime]] = so.mapped_column() # lease, renewed by the runner that claimed the job
+    error: so.Mapped[Optional[str]] = so.mapped_column()
+    logs: so.WriteOnlyMapped['JobLog'] = so.relationship(
+        back_populates="job", 
+        cascade="all, delete-orphan",
+        passive_deletes=True
+    )
+
+    def __repr__(self):
+        return '<job {} {}>'.format(self.id, self.status)
+
+class JobLog(db.Model):
+    __tablename__ = "job_log"
+    id: so.Mapped[int] = so.mapped_column(primary_key=True)
+    job_id: so.Mapped[int] = so.mapped_column(
+        sa.ForeignKey(Job.id, ondelete="CASCADE"), 
+        index=True)
+    job: so.Mapped[Job] = so.relationship(back_populates='logs')
+    timestamp: so.Mapped[datetime] = so.mapped_column(
+        default=lambda: datetime.now(timezone.utc))
+    message: so.Mapped[str] = so.mapped_column()
+
+    def __repr__(self):
+        return '<job_log {}>'.format(self.id)
+
+
 class EPCABMdata(db.Model):
     # __bind_key__ = "gis"
     __tablename__ = "epc_abm_data"
@@ -1,6 +1,13 @@
 from ..digitaltwin import bp
+from ..library import jobQueue
 from flask import render_template
 
 @bp.route("/queue")
 def queue():
-    return render_template("temp_page.html")
\ No newline at end of file
+    queued = jobQueue.listJobs(['queued'])
+    running = jobQueue.listJobs(['running'])
+    finished = jobQueue.listJobs(jobQueue.FINISHED, limit=50, order='desc')
+    return render_template("queue.html",
+                           queued = queued,
+                           running = running,
+                           finished = finished)
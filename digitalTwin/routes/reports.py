@@ -1,6 +1,6 @@
 from ..digitaltwin import bp
-from ..library import dataManager, plotting
-from flask import render_template, request, jsonify
+from ..library import dataManager, plotting, summaries
+from flask import render_template, request, jsonify, abort
 
 
 @bp.route('/reports', methods = ['GET', 'POST'])
@@ -14,11 +14,10 @@ def reports():
 @bp.route('/reports/<scenario_name>', methods = ['GET'])
 def specific_report(scenario_name):
     scenario = dataManager.findDBData('Scenario', scenario_name)
-    hi, model_ts, prop_cols, wealth_cols, hourly = plotting.prepare_data(scenario)
-    
-    fig2 = plotting.dailyByPropTypePX(model_ts, prop_cols)
-    fig3 = plotting.dailyByWealth(model_ts, wealth_cols)
-    fig4 = plotting.temporalHeatMap(hourly)
+    summary = summaries.getSummary(scenario)
+    if summary is None:
+        abort(404)
+    fig2, fig3, fig4 = plotting.summaryFigures(summary)
                         
     return render_template("reportTemplate.html",
                             scenario = scenario,
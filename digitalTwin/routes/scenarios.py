@@ -1,13 +1,9 @@
 from ..digitaltwin import bp
 from flask import render_template, redirect, url_for, flash, session, request, current_app, jsonify
-from ..library import dataManager, scenarios, forms, policies, populations
+from ..library import dataManager, scenarios, forms, policies, populations, jobQueue
 from ..models import models
-import threading
-import traceback
 import sqlalchemy as sa
 
-ACTIVE_TASKS = {} # log for run_scemario
-
 @bp.route("/createscenario/", methods=['GET', 'POST'])
 def create_scenario():
     # main access via link
@@ -196,47 +192,21 @@ def success(scenario_name):
 
 @bp.route("/runscenario/<scenario_name>", methods=['GET', 'POST'])
 def runScenario(scenario_name):
-    app = current_app._get_current_object()
-
-    # Register task
-    ACTIVE_TASKS[scenario_name] = {
-        "status": "running", 
-        "logs": ["Starting process..."]
-    }
-
-    # Custom logging function to pass into dataManager
-    def route_logger(message):
-        print(message) # Still print to server console
-        if scenario_name in ACTIVE_TASKS:
-            ACTIVE_TASKS[scenario_name]["logs"].append(message)
-
-    def run_in_background(app, name):
-        with app.app_context():
-            try:
-                scenarios.run_and_save_scenario(name, log_callback=route_logger)
-                ACTIVE_TASKS[name]["status"] = "completed"
-                
-            except Exception as e:
-                error_trace = traceback.format_exc()
-                print(error_trace) 
-                ACTIVE_TASKS[name]["status"] = "failed"
-                ACTIVE_TASKS[name]["logs"].append(f"CRITICAL ERROR: {str(e)}")
-
-    # Start the background thread
-    thread = threading.Thread(target=run_in_background, args=(app, scenario_name))
-    thread.start()
+    # Queue the run; the job runner starts it in a worker process when one is free
+    jobQueue.enqueue(scenario_name)
+    jobQueue.ensureRunner(current_app._get_current_object())
 
     return render_template("scenario_status.html", scenario_name=scenario_name)
 
 @bp.route("/check_status/<scenario_name>")
 def check_status(scenario_name):
-    # Fetch the task dictionary
-    task = ACTIVE_TASKS.get(scenario_name)
+    # Latest job for this scenario, with its stored logs
+    job = jobQueue.latestJob(scenario_name)
     
-    if task:
+    if job:
         return jsonify({
-            "status": task["status"],
-            "logs": task["logs"]
+            "status": job.status,
+            "logs": jobQueue.getLogs(job.id)
         })
     else:
-        return jsonify({"status": "unknown", "logs": []})
\ No newline at end of file
+        return jsonify({"status": "unknown", "logs": []})
@@ -0,0 +1,60 @@
+'''Bring the result tables of an existing app.db up to the current schema, keeping their data.
+
+SQLite cannot change a column's type in place, so each table is rebuilt: the old table is renamed,
+recreated from digitalTwin.models (REAL energy columns, composite indexes), the rows are copied
+across and the old table is dropped. Fresh databases created with `flask db upgrade` do not need this.'''
+
+import sqlite3
+import sqlalchemy as sa
+
+from digitalTwin.models import models
+
+TABLES = [models.AgentTimeSeries, models.EnergyTimeSeries]
+
+
+def rebuildTable(conn, schema):
+    table = schema.__table__
+    name = table.name
+    old = name + '_old'
+    cur = conn.cursor()
+
+    cur.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name = ?", (name,))
+    if cur.fetchone() is None:
+        print(str(name) + " does not exist, skipping.")
+        return
+
+    cur.execute('ALTER TABLE ' + name + ' RENAME TO ' + old)
+    # indexes follow the renamed table but keep their names, so drop them before recreating
+    cur.execute("SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = ? AND sql IS NOT NULL", (old,))
+    for (index,) in cur.fetchall():
+        cur.execute('DROP INDEX ' + index)
+
+    dialect = sa.create_engine('sqlite://').dialect
+    cur.execute(str(sa.schema.CreateTable(table).compile(dialect=dialect)))
+    for index in table.indexes:
+        cur.execute(str(sa.schema.CreateIndex(index).compile(dialect=dialect)))
+
+    columns = ', '.join(column.name for column in table.columns)
+    cur.execute('INSERT INTO ' + name + ' (' + columns + ') SELECT ' + columns + ' FROM ' + old)
+    cur.execute('DROP TABLE ' + old)
+    print("Rebuilt " + str(name) + " (" + str(cur.execute('SELECT count(*) FROM ' + name).fetchone()[0]) + " rows)")
+
+
+def migrate(conn):
+    conn.execute('PRAGMA foreign_keys = OFF') # has no effect inside a transaction
+    conn.execute('BEGIN')
+    try:
+        for schema in TABLES:
+            rebuildTable(conn, schema)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.execute('PRAGMA foreign_keys = ON')
+    conn.execute('ANALYZE')
+
+
+if __name__ == "__main__":
+    with sqlite3.connect('digitalTwin/app.db') as conn:
+        migrate(conn)
@@ -11,11 +11,46 @@ def app():
     yield app
 
 
+@pytest.fixture()
+def db_app(tmp_path):
+    """App bound to an empty, freshly created sqlite database."""
+    from digitalTwin import db
+    app = create_app({
+        "TESTING": True,
+        "SQLALCHEMY_DATABASE_URI": "sqlite:///" + str(tmp_path / "test.db"),
+    })
+    with app.app_context():
+        db.create_all()
+        yield app
+
+
+@pytest.fixture()
+def db_scenario(db_app):
+    """A saved Scenario (3 days, recorded every 3 hours) in the db_app database."""
+    from digitalTwin import db
+    from digitalTwin.models import models
+    from datetime import datetime
+    population = models.Population(user_name="Foo", timestamp=datetime(2025, 1, 1))
+    db.session.add(population)
+    db.session.commit()
+    scenario = models.Scenario(scenario_name="example", user_name="Foo", days=3, city="newcastle",
+                               subset=1, init_lat=0, init_lon=0, start_day=datetime(2020, 1, 1),
+                               simulation_step=1, record_every=3, population_id=population.id)
+    db.session.add(scenario)
+    db.session.commit()
+    return scenario
+
+
 @pytest.fixture()
 def client(app):
     return app.test_client()
 
 
+@pytest.fixture()
+def db_client(db_app):
+    return db_app.test_client()
+
+
 @pytest.fixture()
 def runner(app):
     return app.test_cli_runner()
@@ -71,4 +106,63 @@ def tmp_geodata(tmp_path_factory, dummy_metadata_1,dummy_metadata_2):
     # there's probably a cleaner way to do this with parameterize but this works for now
     populate_dir(results, "example1", dummy_metadata_1 )
     populate_dir(results, "example2", dummy_metadata_2 )    
-    return basedir
\ No newline at end of file
+    return basedir
+
+"""Modelling fixtures: a small synthetic population and climate grid."""
+@pytest.fixture(scope="session")
+def tiny_gdf():
+    """Synthetic GeoDataFrame with the columns energyABM.run passes to EnergyModel."""
+    import numpy as np
+    import pandas as pd
+    import geopandas as gpd
+
+    n = 120
+    rng = np.random.default_rng(0)
+    property_types = ["mid-terraced house", "semi-detached house", "detached house",
+                      "block of flats", "end-terraced house", "bungalow"]
+    schedule_types = ["retired_household", "working_adult_household", "dual_earner_household",
+                      "family_with_children", "single_parent_with_children", "student_household",
+                      "unemployed_or_inactive", None]
+    df = pd.DataFrame({
+        "UPRN": np.arange(1000, 1000 + n),
+        "ward_code": rng.choice(["E05001", "E05002", "E05003"], n),
+        "property_type": rng.choice(property_types, n),
+        "sap_rating": rng.integers(30, 95, n),
+        "energy_cal_kwh": rng.uniform(5_000, 20_000, n),
+        "floor_area_m2": np.where(rng.random(n) < 0.1, np.nan, rng.uniform(30, 200, n)),
+        "main_fuel_type": rng.choice(["mains gas", "electricity", "oil", "solid fuel"], n),
+        "main_heating_system": rng.choice(["boiler and radiators", "heat pump", "electric storage"], n),
+        "retrofit_envelope_score": rng.random(n),
+        "is_heatpump_candidate": rng.integers(0, 2, n),
+        "heatpump_candidate_class": rng.choice(["priority", "possible", "difficult", "non-possible"], n),
+        "hh_n_people": rng.integers(1, 6, n),
+        "hh_children": rng.choice([True, False], n),
+        "schedule_type": rng.choice(schedule_types, n),
+        "size_band": rng.integers(1, 5, n),
+    })
+    lon = -1.7 + rng.random(n) * 0.2
+    lat = 54.95 + rng.random(n) * 0.1
+    return gpd.GeoDataFrame(df, geometry=gpd.points_from_xy(lon, lat), crs="EPSG:4326")
+
+
+@pytest.fixture(scope="session")
+def tiny_climate(tmp_path_factory):
+    """Ten days of hourly temps on a 4×5 grid, written as a climate parquet."""
+    import numpy as np
+    import pandas as pd
+
+    rng = np.random.default_rng(1)
+    times = pd.date_range("2020-01-01", periods=24 * 10, freq="h", tz="UTC")
+    lat, lon = np.meshgrid(np.linspace(54.9, 55.1, 4), np.linspace(-1.8, -1.4, 5))
+    points = np.c_[lat.ravel(), lon.ravel()]
+    T, P = len(times), len(points)
+    temps = 5 + 8 * np.sin(np.arange(T) / 24 * 2 * np.pi)[:, None] + rng.normal(0, 2, (T, P))
+    df = pd.DataFrame({
+        "timestamp": np.repeat(times, P),
+        "latitude": np.tile(points[:, 0], T),
+        "longitude": np.tile(points[:, 1], T),
+        "temp_C": temps.ravel().astype("float32"),
+    })
+    path = tmp_path_factory.mktemp("tiny_climate") / "climate.parquet"
+    df.to_parquet(path)
+    return str(path)
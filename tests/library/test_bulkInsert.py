@@ -0,0 +1,33 @@
+from digitalTwin import db
+from digitalTwin.library import bulkInsert
+from digitalTwin.models import models
+import numpy as np
+import sqlalchemy as sa
+
+"""Tests for insertColumns"""
+def test_insertColumns_numpy(db_scenario):
+      "Check NumPy columns and broadcast scalars land row-for-row across several chunks"
+      scenario_id = db_scenario.id
+      n = 1000
+      stats = bulkInsert.InsertStats("agents")
+      written = bulkInsert.insertColumns(models.AgentTimeSeries, {
+            "scenario_id": scenario_id,
+            "step": np.repeat(np.arange(10), 100),
+            "Agent_id": np.tile(np.arange(100), 10),
+            "energy": np.zeros(n, dtype=np.float32),
+            "energy_consumption": np.arange(n, dtype=np.float32),
+      }, chunk_size=300, stats=stats)
+      assert written == n
+      assert stats.rows == n
+      rows = db.session.execute(sa.select(models.AgentTimeSeries.step,
+                                          models.AgentTimeSeries.Agent_id,
+                                          models.AgentTimeSeries.energy_consumption)
+                                .order_by(models.AgentTimeSeries.id)).all()
+      assert len(rows) == n
+      assert rows[123] == (1, 23, 123)
+      assert "rows/s" in str(stats)
+
+def test_insertColumns_empty(db_app):
+      "Check an empty batch writes nothing"
+      assert bulkInsert.insertColumns(models.EnergyTimeSeries, {"step": np.array([])}) == 0
+      assert db.session.scalar(sa.select(sa.func.count(models.EnergyTimeSeries.id))) == 0
@@ -0,0 +1,86 @@
+from digitalTwin import db
+from digitalTwin.library import ensembles
+from digitalTwin.modelling import energyABM
+from digitalTwin.modelling.model import EnergyModel
+from digitalTwin.models import models
+import numpy as np
+import pytest
+
+"""Tests for the streaming ensemble statistics"""
+def test_welford_matches_numpy():
+      "Running mean, variance and range equal the batch ones"
+      x = np.random.default_rng(0).normal(10, 3, (40, 6, 2))
+      moments = ensembles.Welford((6, 2))
+      for row in x:
+            moments.update(row)
+      np.testing.assert_allclose(moments.mean, x.mean(axis=0))
+      np.testing.assert_allclose(moments.variance, x.var(axis=0, ddof=1))
+      np.testing.assert_array_equal(moments.min, x.min(axis=0))
+      np.testing.assert_array_equal(moments.max, x.max(axis=0))
+
+def test_quantile_sketch():
+      "Quantiles are exact while buffered and close on long streams once the markers take over"
+      x = np.random.default_rng(1).gamma(2, 3, (3000, 50))
+      sketch = ensembles.QuantileSketch((50,), exact=16)
+      for k, row in enumerate(x):
+            sketch.update(row)
+            if k == 9:
+                  np.testing.assert_allclose(sketch.values(), np.quantile(x[:10], ensembles.QUANTILES, axis=0))
+      assert sketch.buffer is None
+      error = np.abs(sketch.values() - np.quantile(x, ensembles.QUANTILES, axis=0)).mean(axis=1)
+      assert np.all(error < [0.05, 0.05, 0.2])
+
+def test_ensemble_stats_shape_checked():
+      "Replicas of a different length are rejected"
+      stats = ensembles.EnsembleStats(["a", "b"])
+      stats.update(np.ones((4, 2)))
+      with pytest.raises(ValueError):
+            stats.update(np.ones((5, 2)))
+
+@pytest.mark.parametrize("step_hours", [1, 3, 0.2])
+def test_daily_totals(step_hours):
+      "Ticks after t = 0 are summed into the days they cover, with no partial day for the initial row"
+      ticks = round(48 / step_hours)
+      series = np.ones((ticks + 1, 2))
+      series[0] = 1e6
+      np.testing.assert_array_equal(ensembles.dailyTotals(series, step_hours), [[ticks / 2] * 2] * 2)
+
+"""Tests for runEnsemble"""
+@pytest.fixture()
+def tiny_scenario_run(monkeypatch, tiny_gdf, tiny_climate):
+      "energyABM.run over the test households and climate for two days, without the population tables"
+      def run(scenario, log_callback=print, agent_sink=None, collect_agent_level=True, seed=None, **model_kwargs):
+            model = EnergyModel(gdf=tiny_gdf.copy(), climate_parquet=tiny_climate, climate_start="2020-01-01",
+                                engine="array", collect_agent_level=collect_agent_level, seed=seed, **model_kwargs)
+            for _ in range(48):
+                  model.step()
+            return model, []
+      monkeypatch.setattr(energyABM, "run", run)
+
+def test_run_ensemble(db_scenario, tiny_scenario_run):
+      "Seeded replicas differ, repeat with their seed, and reduce to the batch statistics"
+      seeds = ensembles.replicaSeeds(7, 6)
+      replicas = np.stack([ensembles.replicaSeries(db_scenario, seed) for seed in seeds])
+      assert replicas.shape == (6, 49, len(ensembles.ENSEMBLE_COLUMNS)) # as model_time_series: t = 0 and each step
+      assert not np.array_equal(replicas[0], replicas[1])
+      np.testing.assert_array_equal(ensembles.replicaSeries(db_scenario, seeds[2]), replicas[2])
+
+      by_step, by_day = ensembles.runEnsemble(db_scenario.scenario_name, 6, workers=1, base_seed=7,
+                                              log_callback=lambda msg: None)
+      assert by_step.count == by_day.count == 6
+      np.testing.assert_allclose(by_step.moments.mean, replicas.mean(axis=0))
+      np.testing.assert_allclose(by_step.moments.std, replicas.std(axis=0, ddof=1), atol=1e-9)
+      day = np.arange(48) // 24  # row 0 is the state before the first step
+      daily = np.stack([replicas[:, 1:][:, day == d].sum(axis=1) for d in range(2)], axis=1)
+      assert by_day.moments.mean.shape == (2, len(ensembles.ENSEMBLE_COLUMNS))
+      np.testing.assert_allclose(by_day.sketch.values(), np.quantile(daily, ensembles.QUANTILES, axis=0))
+
+      table = by_step.frame()
+      assert len(table) == 49 * len(ensembles.ENSEMBLE_COLUMNS)
+      assert {"step", "column", "mean", "std", "q05", "q50", "q95"} <= set(table.columns)
+
+      ensembles.saveEnsemble(db_scenario, by_day, base_seed=7)
+      ensembles.saveEnsemble(db_scenario, by_day, base_seed=7)
+      assert db.session.scalar(db.select(db.func.count(models.ScenarioEnsemble.id))) == 1
+      assert db_scenario.ensemble.replicas == 6
+      assert db_scenario.ensemble.daily_bands["total_energy"]["mean"] == pytest.approx(daily.mean(axis=0)[:, -1])
@@ -0,0 +1,74 @@
+from digitalTwin import db
+from digitalTwin.library import jobQueue, scenarios
+from digitalTwin.models import models
+from datetime import datetime, timedelta, timezone
+import sqlalchemy as sa
+import time
+
+"""Tests for the persistent job queue"""
+def test_claim_in_order(db_scenario):
+      "Jobs are claimed oldest first, and each only once"
+      first = jobQueue.enqueue("example")
+      second = jobQueue.enqueue("example")
+      assert jobQueue.claimNext() == first.id
+      assert jobQueue.claimNext() == second.id
+      assert jobQueue.claimNext() is None
+      assert jobQueue.countRunning() == 2
+
+def test_runJob_logs_and_status(db_app, db_scenario, monkeypatch):
+      "A run's log messages and final status are stored against the job"
+      def fake_run(scenario_name, log_callback=print):
+            log_callback(f"running {scenario_name}")
+      monkeypatch.setattr(scenarios, "run_and_save_scenario", fake_run)
+      job_id = jobQueue.enqueue("example").id
+      jobQueue.claimNext()
+      assert jobQueue.runJob(job_id, {"SQLALCHEMY_DATABASE_URI": db_app.config["SQLALCHEMY_DATABASE_URI"]}) == "completed"
+      job = jobQueue.latestJob("example")
+      db.session.refresh(job)
+      assert job.status == "completed"
+      assert job.finished is not None
+      assert "running example" in jobQueue.getLogs(job_id)
+
+def test_requeueInterrupted(db_scenario):
+      "Only running jobs whose lease has expired go back on the queue"
+      live, stopped, legacy = (jobQueue.enqueue("example").id for _ in range(3))
+      for _ in range(3):
+            jobQueue.claimNext()
+      db.session.execute(sa.update(models.Job).where(models.Job.id == stopped)
+                         .values(heartbeat=datetime.now(timezone.utc) - timedelta(minutes=5)))
+      db.session.execute(sa.update(models.Job).where(models.Job.id == legacy).values(heartbeat=None))
+      db.session.commit()
+      assert jobQueue.requeueInterrupted(60) == 2
+      db.session.expire_all()
+      assert [db.session.get(models.Job, i).status for i in (live, stopped, legacy)] == ["running", "queued", "queued"]
+      assert any("Re-queued" in msg for msg in jobQueue.getLogs(stopped))
+      assert not jobQueue.getLogs(live)[1:]
+
+def test_renewLeases(db_scenario):
+      "A renewed lease keeps a long run from being re-queued"
+      job_id = jobQueue.enqueue("example").id
+      jobQueue.claimNext()
+      db.session.execute(sa.update(models.Job).where(models.Job.id == job_id)
+                         .values(heartbeat=datetime.now(timezone.utc) - timedelta(minutes=5)))
+      db.session.commit()
+      jobQueue.renewLeases([job_id])
+      assert jobQueue.requeueInterrupted(60) == 0
+      assert jobQueue.countRunning() == 1
+
+def test_runner_process_pool(db_app, db_scenario):
+      "The runner executes a queued job in a worker process and records its failure"
+      job_id = jobQueue.enqueue("example").id # no population data in the test database, so the run fails
+      runner = jobQueue.JobRunner(db_app, workers=1, poll_seconds=0.2).start()
+      try:
+            deadline = time.time() + 120
+            while time.time() < deadline:
+                  db.session.expire_all()
+                  job = db.session.get(models.Job, job_id)
+                  if job.status in jobQueue.FINISHED:
+                        break
+                  time.sleep(0.2)
+      finally:
+            runner.stop()
+      assert job.status == "failed"
+      assert job.worker_pid is not None
+      assert any(msg.startswith("CRITICAL ERROR") for msg in jobQueue.getLogs(job_id))
@@ -0,0 +1,48 @@
+from digitalTwin.library import resultStore
+import numpy as np
+import pytest
+
+"""Tests for the Parquet agent result store"""
+@pytest.fixture()
+def store(tmp_path):
+      "Three days of hourly traces for 5 agents, written in 10-step chunks"
+      sink = resultStore.AgentParquetSink(7, results_dir=tmp_path, log_callback=lambda msg: None)
+      ids = np.array([str(i) for i in range(5)], dtype=object)
+      for start in range(0, 72, 10):
+            steps = np.arange(start, min(start + 10, 72))
+            sink.write({"Step": np.repeat(steps, 5),
+                        "AgentID": np.tile(ids, len(steps)),
+                        "energy": np.zeros(len(steps) * 5, dtype=np.float32),
+                        "energy_consumption": (np.repeat(steps, 5) + np.tile(np.arange(5), len(steps)) / 10).astype(np.float32)})
+      sink.close()
+      return sink
+
+def test_partitions(store):
+      "Check the dataset is split into one directory per day under the scenario"
+      assert store.path.name == "scenario=7"
+      assert sorted(p.name for p in store.path.iterdir()) == ["day=0", "day=1", "day=2"]
+      assert store.rows_written == 72 * 5
+
+def test_readAgentSeries_steps(store):
+      "Check a step filter returns just those steps and the requested columns"
+      df = resultStore.readAgentSeries(store.path, ["step", "Agent_id", "energy_consumption"], steps=[25, 30])
+      assert list(df.columns) == ["step", "Agent_id", "energy_consumption"]
+      assert sorted(df["step"].unique()) == [25, 30]
+      assert len(df) == 10
+
+def test_readAgentSeries_all(store):
+      "Check an unfiltered read returns the full trace with the agent_time_series columns"
+      df = resultStore.readAgentSeries(store.path)
+      assert list(df.columns) == ["step", "Agent_id", "energy", "energy_consumption"]
+      assert len(df) == 72 * 5
+
+def test_energyRange(store):
+      "Check min and max consumption"
+      low, high = resultStore.energyRange(store.path)
+      assert low == 0
+      assert high == pytest.approx(71.4)
+
+def test_rerun_replaces(store):
+      "Check re-creating a sink for the same scenario clears its old results"
+      resultStore.AgentParquetSink(7, results_dir=store.path.parent, log_callback=lambda msg: None)
+      assert list(store.path.iterdir()) == []
@@ -0,0 +1,60 @@
+from digitalTwin import db
+from digitalTwin.library import bulkInsert, scenarios, summaries
+from digitalTwin.modelling.model import EnergyModel
+from digitalTwin.models import models
+import pandas as pd
+import pytest
+import random
+
+"""Tests for ScenarioSummary"""
+@pytest.fixture()
+def saved_run(db_scenario, tiny_gdf, tiny_climate):
+      "Three simulated days saved the way run_and_save_scenario does, without a stored summary"
+      scenario = db_scenario
+      random.seed(1)
+      model = EnergyModel(gdf=tiny_gdf.copy(), climate_parquet=tiny_climate, climate_start="2020-01-01",
+                          agent_collect_every=3, n_steps=72, agent_flush_every=5,
+                          agent_sink=scenarios.AgentTimeSeriesSink(scenario.id, log_callback=lambda msg: None))
+      records = []
+      for step in range(72):
+            model.step()
+            records.append(dict(step=step, hour=step % 24, day=step // 24, total_energy=model.total_energy,
+                               average_energy=model.total_energy / len(model.household_agents)))
+      model.agent_dc.close()
+      bulkInsert.insertColumns(models.EnergyTimeSeries, {
+            "scenario_id": scenario.id, **{k: [r[k] for r in records] for k in records[0]}})
+      model_df = model.datacollector.get_model_vars_dataframe()
+      model_ts = pd.DataFrame({c: model_df[name].to_numpy() for c, name in scenarios.MODEL_TS_COLUMNS.items()})
+      bulkInsert.insertColumns(models.ModelTimeSeries, {
+            "scenario_id": scenario.id, **{c: model_ts[c].to_numpy() for c in model_ts.columns}})
+      return scenario, model, records, model_ts
+
+def test_summary_from_run_matches_results(saved_run):
+      "The summary built from the run's running totals equals one recomputed from the stored series"
+      scenario, model, records, model_ts = saved_run
+      from_run = summaries.summaryFromRun(scenario.id, model, records, model_ts)
+      from_db = summaries.summaryFromResults(scenario)
+      assert from_run.min_energy == pytest.approx(from_db.min_energy, rel=1e-6)
+      assert from_run.max_energy == pytest.approx(from_db.max_energy, rel=1e-6)
+      assert from_run.daily_totals == pytest.approx(from_db.daily_totals)
+      assert len(from_run.daily_totals) == 3
+      assert len(from_run.day_hour_totals) == 3 and len(from_run.day_hour_totals[0]) == 24
+      assert from_run.prop_type_daily_mean == pytest.approx(from_db.prop_type_daily_mean)
+      assert from_run.wealth_daily_mean == pytest.approx(from_db.wealth_daily_mean)
+      assert [a for a, _ in from_run.top_quartile] == [str(a) for a, _ in from_db.top_quartile]
+
+def test_getSummary_backfills_once(saved_run):
+      "A scenario without a summary gets one stored on first request"
+      scenario = saved_run[0]
+      assert scenario.summary is None
+      summary = summaries.getSummary(scenario)
+      assert summary.scenario_id == scenario.id
+      assert summaries.getSummary(scenario).id == summary.id
+      assert db.session.scalar(db.select(db.func.count(models.ScenarioSummary.id))) == 1
+
+def test_summaryFigures(saved_run):
+      "Report figures build from the stored summary alone"
+      from digitalTwin.library import plotting
+      figs = plotting.summaryFigures(summaries.getSummary(saved_run[0]))
+      assert len(figs) == 3
+      assert all(fig.startswith("{") for fig in figs)
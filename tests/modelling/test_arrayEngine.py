@@ -0,0 +1,174 @@
+from digitalTwin.modelling.model import EnergyModel
+import numpy as np
+import pandas as pd
+import random
+import pytest
+
+"""Tests for the vectorised ArrayEngine against the per-agent loop"""
+def build_and_run(gdf, climate, engine, steps, **kwargs):
+      random.seed(1)  # unseeded models draw their seed from the global RNG
+      kwargs.setdefault("agent_collect_every", 5)
+      model = EnergyModel(gdf=gdf.copy(), climate_parquet=climate, climate_start="2020-01-01 05:00",
+                          engine=engine, **kwargs)
+      for _ in range(steps):
+            model.step()
+      return model
+
+@pytest.fixture(scope="module")
+def both_engines(tiny_gdf, tiny_climate):
+      "Run past the end of the climate file so the no-data branch is covered too"
+      steps = 24 * 10 + 6
+      return (build_and_run(tiny_gdf, tiny_climate, "agents", steps),
+              build_and_run(tiny_gdf, tiny_climate, "array", steps))
+
+def test_model_dc_matches(both_engines):
+      "Model-level reporters agree within floating point tolerance"
+      agents, array = both_engines
+      a = agents.model_dc.get_model_vars_dataframe().select_dtypes("number")
+      b = array.model_dc.get_model_vars_dataframe().select_dtypes("number")
+      pd.testing.assert_frame_equal(a, b, rtol=1e-9, atol=1e-9)
+
+def test_agent_dc_matches(both_engines):
+      "Agent-level traces agree once the engine syncs back onto the agents"
+      agents, array = both_engines
+      pd.testing.assert_frame_equal(agents.agent_dc.get_agent_vars_dataframe(),
+                                    array.agent_dc.get_agent_vars_dataframe(), rtol=1e-9, atol=1e-9)
+
+"""Tests for partitioned parallel stepping"""
+@pytest.mark.parametrize("partition_by", ["clim_idx", "ward_code"])
+def test_parallel_matches_serial(both_engines, tiny_gdf, tiny_climate, partition_by):
+      "Per-dwelling values are identical to the serial engine; reduced totals agree to rounding"
+      serial = both_engines[1]
+      parallel = build_and_run(tiny_gdf, tiny_climate, "array", 24 * 10 + 6, engine_workers=3, partition_by=partition_by)
+      assert len(parallel.engine.blocks) == 3
+      assert sorted(np.concatenate([b.idx for b in parallel.engine.blocks]).tolist()) == list(range(len(tiny_gdf)))
+      np.testing.assert_array_equal(parallel.agent_dc.household_energy, serial.agent_dc.household_energy)
+      a = serial.model_dc.get_model_vars_dataframe().select_dtypes("number")
+      b = parallel.model_dc.get_model_vars_dataframe().select_dtypes("number")
+      pd.testing.assert_frame_equal(a, b, rtol=1e-12, atol=1e-12)
+      parallel.engine.close()
+
+def test_parallel_needs_array_engine(tiny_gdf):
+      with pytest.raises(ValueError):
+            EnergyModel(gdf=tiny_gdf.copy(), engine="agents", engine_workers=2)
+
+def test_unknown_engine(tiny_gdf):
+      with pytest.raises(ValueError):
+            EnergyModel(gdf=tiny_gdf.copy(), engine="gpu")
+
+"""Tests for the per-dwelling cap"""
+CLIP_ATTRS = ["cap_clip_total", "cap_clip_base", "cap_clip_heat", "cap_clip_spike"]
+
+@pytest.fixture()
+def low_cap(tmp_path):
+      path = tmp_path / "low_cap.yaml"
+      path.write_text("model:\n  max_total_kwh_per_hour: 1.5\n")
+      return str(path)
+
+@pytest.mark.parametrize("step_hours", [1, 3])
+def test_cap_diagnostics_match(tiny_gdf, tiny_climate, low_cap, step_hours):
+      "The agent loop and the engine, serial and partitioned, clip and attribute alike tick after tick"
+      kwargs = dict(config_path=low_cap, cap_diagnostics=True, step_hours=step_hours, collect_agent_level=False)
+      models = [build_and_run(tiny_gdf, tiny_climate, engine, 0, **kwargs) for engine in ("agents", "array")]
+      models.append(build_and_run(tiny_gdf, tiny_climate, "array", 0, engine_workers=3, partition_by="ward_code", **kwargs))
+      clipped = set()
+      for _ in range(int(48 / step_hours)):
+            for model in models:
+                  model.step()
+            agents, array, parallel = models
+            clips = np.array([[getattr(h, name) for name in CLIP_ATTRS] for h in agents.household_agents])
+            for name, column in zip(CLIP_ATTRS, clips.T):
+                  np.testing.assert_allclose(getattr(array.engine, name), column, rtol=1e-12, atol=1e-15)
+                  np.testing.assert_array_equal(getattr(parallel.engine, name), getattr(array.engine, name))
+            over = clips[:, 0] > 0
+            np.testing.assert_allclose(clips[:, 1:].sum(axis=1), clips[:, 0], rtol=1e-12)
+            assert all(h.energy_consumption == pytest.approx(1.5 * step_hours)
+                       for h, o in zip(agents.household_agents, over) if o)
+            clipped |= set(np.flatnonzero(over).tolist())
+      assert clipped and len(clipped) < len(tiny_gdf)
+      parallel.engine.close()
+
+def test_cap_diagnostics_off(tiny_gdf, tiny_climate, low_cap):
+      "Without diagnostics the cap still applies but nothing is kept per dwelling"
+      on = build_and_run(tiny_gdf, tiny_climate, "agents", 24, config_path=low_cap, cap_diagnostics=True)
+      for engine in ("agents", "array"):
+            off = build_and_run(tiny_gdf, tiny_climate, engine, 24, config_path=low_cap)
+            assert off.cumulative_energy == pytest.approx(on.cumulative_energy, rel=1e-12)
+            assert not any(hasattr(h, "cap_clip_total") for h in off.household_agents)
+      assert off.engine.cap_clip_total is None
+
+"""Tests for IDW climate interpolation in both engines"""
+def test_idw_engines_match(tiny_gdf, tiny_climate):
+      "Both engines apply the same interpolated temperatures, serial and partitioned"
+      steps = 48
+      agents = build_and_run(tiny_gdf, tiny_climate, "agents", steps, climate_interpolation="idw")
+      array = build_and_run(tiny_gdf, tiny_climate, "array", steps, climate_interpolation="idw")
+      parallel = build_and_run(tiny_gdf, tiny_climate, "array", steps, climate_interpolation="idw", engine_workers=3)
+      nearest = build_and_run(tiny_gdf, tiny_climate, "array", steps)
+      temps = [h.ambient_tempC for h in agents.household_agents]
+      np.testing.assert_allclose(array.engine.ambient_tempC, temps, rtol=1e-12)
+      np.testing.assert_array_equal(parallel.engine.ambient_tempC, array.engine.ambient_tempC)
+      assert not np.allclose(nearest.engine.ambient_tempC, array.engine.ambient_tempC)
+      pd.testing.assert_frame_equal(agents.agent_dc.get_agent_vars_dataframe(),
+                                    array.agent_dc.get_agent_vars_dataframe(), rtol=1e-9, atol=1e-9)
+      parallel.engine.close()
+
+"""Tests for step lengths other than one hour"""
+def run_day(gdf, climate, engine, step_hours):
+      return build_and_run(gdf, climate, engine, int(24 / step_hours), step_hours=step_hours, agent_collect_every=6)
+
+@pytest.mark.parametrize("step_hours", [0.25, 3])
+def test_step_hours_engines_match(tiny_gdf, tiny_climate, step_hours):
+      "Both engines agree for sub-hourly and multi-hour steps, and traces are indexed by hour"
+      agents = run_day(tiny_gdf, tiny_climate, "agents", step_hours)
+      array = run_day(tiny_gdf, tiny_climate, "array", step_hours)
+      assert agents.current_hour == array.current_hour == 24
+      a = agents.model_dc.get_model_vars_dataframe().select_dtypes("number")
+      b = array.model_dc.get_model_vars_dataframe().select_dtypes("number")
+      pd.testing.assert_frame_equal(a, b, rtol=1e-9, atol=1e-9)
+      assert array.agent_dc.steps[:array.agent_dc.n_rows].tolist() == [0, 6, 12, 18, 24]
+
+@pytest.mark.parametrize("step_hours", [0.2, 0.1])
+def test_inexact_step_hours_keep_time(tiny_gdf, tiny_climate, step_hours):
+      "Steps that aren't exact in binary don't drift: hours and agent collection stay on the hour"
+      model = build_and_run(tiny_gdf, tiny_climate, "array", round(48 / step_hours), step_hours=step_hours,
+                            agent_collect_every=1)
+      assert model.current_hour == 48 and model.ticks == round(48 / step_hours)
+      assert model.agent_dc.steps[:model.agent_dc.n_rows].tolist() == list(range(49))
+
+@pytest.mark.parametrize("engine", ["agents", "array"])
+@pytest.mark.parametrize("step_hours", [0.25, 3, 6])
+def test_steps_cover_their_hourly_ticks(tiny_gdf, tiny_climate, engine, step_hours):
+      "Every step's schedule loads and temperatures are those of the hourly ticks it replaces"
+      hourly = run_day(tiny_gdf, tiny_climate, engine, 1).model_dc.get_model_vars_dataframe().iloc[1:]
+      steps = run_day(tiny_gdf, tiny_climate, engine, step_hours).model_dc.get_model_vars_dataframe().iloc[1:]
+      wealth = ["high", "medium", "low"]
+      if step_hours < 1:
+            per_hour = int(1 / step_hours)
+            expected = np.repeat(hourly[wealth].to_numpy() * step_hours, per_hour, axis=0)
+      else:
+            groups = np.arange(24) // step_hours
+            expected = hourly[wealth].groupby(groups).sum().to_numpy()
+            np.testing.assert_allclose(steps["ambient_mean_tempC"],
+                                       hourly["ambient_mean_tempC"].groupby(groups).mean(), rtol=1e-5)
+      np.testing.assert_allclose(steps[wealth].to_numpy(), expected, rtol=1e-9)
+
+@pytest.mark.parametrize("engine", ["agents", "array"])
+@pytest.mark.parametrize("step_hours", [3, 6])
+def test_step_hours_total_energy(tiny_gdf, tiny_climate, engine, step_hours):
+      "Multi-hour steps damp climate load for the hours nobody is home, keeping totals near the hourly run"
+      hourly = build_and_run(tiny_gdf, tiny_climate, engine, 72, seed=4, collect_agent_level=False)
+      other = build_and_run(tiny_gdf, tiny_climate, engine, 72 // step_hours, seed=4, step_hours=step_hours,
+                            collect_agent_level=False)
+      assert other.cumulative_energy == pytest.approx(hourly.cumulative_energy, rel=0.01)
+
+@pytest.mark.parametrize("step_hours", [0.25, 3])
+def test_step_hours_without_climate(tiny_gdf, step_hours):
+      "Without climate a day's energy doesn't depend on the step length"
+      hourly = run_day(tiny_gdf, None, "array", 1)
+      other = run_day(tiny_gdf, None, "array", step_hours)
+      assert other.cumulative_energy == pytest.approx(hourly.cumulative_energy, rel=1e-9)
+
+def test_bad_step_hours(tiny_gdf):
+      with pytest.raises(ValueError):
+            EnergyModel(gdf=tiny_gdf.copy(), step_hours=5)
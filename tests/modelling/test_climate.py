@@ -0,0 +1,269 @@
+from digitalTwin.modelling.climate import ClimateCache, ClimateField
+from digitalTwin.modelling.model import EnergyModel
+import numpy as np
+import os
+import pandas as pd
+import pytest
+import random
+import shutil
+import threading
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+"""Tests for the memory-mapped climate cache"""
+def test_cache_matches_parquet(tiny_climate, tmp_path):
+      "The memory-mapped field holds the same grid as the in-memory parquet decode"
+      cached = ClimateField(tiny_climate, cache_dir=str(tmp_path / "cache"))
+      loaded = ClimateField(tiny_climate, cache=False)
+      assert isinstance(cached.temps, np.memmap)
+      np.testing.assert_array_equal(cached.times, loaded.times)
+      np.testing.assert_array_equal(cached.points, loaded.points)
+      np.testing.assert_array_equal(cached.temps, loaded.temps)
+      assert cached.time_index_for("2020-01-03") == loaded.time_index_for("2020-01-03")
+
+def test_cache_rebuilt_when_parquet_changes(tiny_climate, tmp_path):
+      "A cache is reused while the parquet is unchanged and rebuilt after it is rewritten"
+      path = str(tmp_path / "climate.parquet")
+      shutil.copy(tiny_climate, path)
+      cache_dir = ClimateField.build_cache(path)
+      assert cache_dir == path + ".npcache"
+      built = os.path.getmtime(os.path.join(cache_dir, "temps.npy"))
+      assert ClimateField.build_cache(path) == cache_dir
+      assert os.path.getmtime(os.path.join(cache_dir, "temps.npy")) == built
+
+      df = pd.read_parquet(path)
+      df["temp_C"] += 1
+      df.to_parquet(path)
+      assert not ClimateField.cache_is_current(path)
+      field = ClimateField(path)
+      np.testing.assert_allclose(field.temps_at_index(0), ClimateField(tiny_climate).temps_at_index(0) + 1, rtol=1e-6)
+
+"""Tests for loading a time window and bounding box"""
+@pytest.mark.parametrize("cache", [True, False])
+def test_window_and_bbox(tiny_climate, cache):
+      "Only hours in [start, end) and points inside the bbox are loaded, with the values of the full grid"
+      full = ClimateField(tiny_climate, cache=False)
+      bbox = (54.95, -1.75, 55.2, -1.45)
+      field = ClimateField(tiny_climate, start="2020-01-03", end="2020-01-05", bbox=bbox, cache=cache)
+      assert field.times[0] == np.datetime64("2020-01-03T00:00")
+      assert len(field.times) == 48
+      keep = ((full.points[:, 0] >= bbox[0]) & (full.points[:, 0] <= bbox[2])
+              & (full.points[:, 1] >= bbox[1]) & (full.points[:, 1] <= bbox[3]))
+      assert 0 < keep.sum() < len(full.points)
+      np.testing.assert_array_equal(field.points, full.points[keep])
+      t0 = full.time_index_for("2020-01-03")
+      np.testing.assert_array_equal(field.temps, full.temps[t0:t0 + 48][:, keep])
+
+def test_bbox_field_stays_mapped(tiny_climate):
+      "A windowed cached field reads its points from the shared file instead of holding a copy"
+      bbox = (54.95, -1.75, 55.2, -1.45)
+      field = ClimateField(tiny_climate, start="2020-01-03", end="2020-01-05", bbox=bbox)
+      copied = ClimateField(tiny_climate, start="2020-01-03", end="2020-01-05", bbox=bbox, cache=False)
+      assert field.is_mapped and isinstance(field._grid, np.memmap) and not copied.is_mapped
+      assert field.nbytes < copied.nbytes - copied.temps.nbytes + 1024
+      for t, hours in [(5, 1), (5.25, 0.25), (6, 3)]:
+            np.testing.assert_array_equal(field.temps_for_step(t, hours), copied.temps_for_step(t, hours))
+      np.testing.assert_array_equal(field.variant("extreme", 2.0).temps_at_index(7),
+                                    copied.variant("extreme", 2.0).temps_at_index(7))
+
+def test_empty_window(tiny_climate):
+      "A window outside the file is an error rather than an empty field"
+      with pytest.raises(ValueError):
+            ClimateField(tiny_climate, start="2030-01-01", cache=False)
+      with pytest.raises(ValueError):
+            ClimateField(tiny_climate, start="2030-01-01")
+
+def test_model_with_climate_window(tiny_gdf, tiny_climate):
+      "A model given its climate window and area steps exactly as one given the whole file"
+      energy = []
+      for kwargs in [{}, dict(climate_end="2020-01-03", climate_bbox_margin=0.5)]:
+            random.seed(1)
+            model = EnergyModel(gdf=tiny_gdf.copy(), climate_parquet=tiny_climate, climate_start="2020-01-01T06:00",
+                                engine="array", collect_agent_level=False, **kwargs)
+            for _ in range(30):
+                  model.step()
+            energy.append([h.energy_consumption for h in model.household_agents])
+      assert len(model.climate.times) == 42
+      np.testing.assert_array_equal(energy[0], energy[1])
+
+"""Tests for the process-wide climate cache"""
+def test_climate_cache_reuses_fields(tiny_climate, tmp_path):
+      "Repeat requests share one read-only field; a new window or a rewritten file loads again"
+      cache = ClimateCache()
+      field = cache.get(tiny_climate, start="2020-01-02")
+      assert cache.get(tiny_climate, start=pd.Timestamp("2020-01-02", tz="UTC")) is field
+      assert cache.get(tiny_climate, start="2020-01-03") is not field
+      assert (cache.hits, cache.misses) == (1, 2)
+      assert not field.temps.flags.writeable
+
+      path = str(tmp_path / "climate.parquet")
+      shutil.copy(tiny_climate, path)
+      first = cache.get(path)
+      os.utime(path, ns=(0, 0))
+      assert cache.get(path) is not first
+
+def test_climate_cache_budget(tiny_climate):
+      "Least recently used fields are dropped once the budget is exceeded"
+      one_field = ClimateField(tiny_climate, start="2020-01-02", cache=False).nbytes
+      cache = ClimateCache(max_bytes=int(one_field * 3.5))
+      windows = ["2020-01-02T00:00", "2020-01-02T01:00", "2020-01-02T02:00"]
+      fields = [cache.get(tiny_climate, start=w, cache=False) for w in windows]
+      assert cache.get(tiny_climate, start=windows[0], cache=False) is fields[0]  # now most recent
+      cache.get(tiny_climate, start="2020-01-02T03:00", cache=False)  # evicts windows[1]
+      assert cache.get(tiny_climate, start=windows[1], cache=False) is not fields[1]
+      assert cache.nbytes <= cache.max_bytes
+
+def test_climate_cache_loads_keys_concurrently(tiny_climate, monkeypatch):
+      "Loads of different fields overlap; a second request for a loading field waits for it"
+      import digitalTwin.modelling.climate as climate
+      barrier = threading.Barrier(2, timeout=5)
+      loads = []
+      class SlowField(ClimateField):
+            def __init__(self, path, **kwargs):
+                  loads.append(kwargs["start"])
+                  barrier.wait()  # both loads must be in flight at once
+                  super().__init__(path, **kwargs)
+      monkeypatch.setattr(climate, "ClimateField", SlowField)
+      cache = ClimateCache()
+      with ThreadPoolExecutor(4) as pool:
+            got = list(pool.map(lambda start: cache.get(tiny_climate, start=start),
+                                ["2020-01-02", "2020-01-03", "2020-01-02", "2020-01-03"]))
+      assert got[0] is got[2] and got[1] is got[3] and got[0] is not got[1]
+      assert sorted(loads) == ["2020-01-02", "2020-01-03"] and cache.misses == 2
+
+def test_models_share_climate(tiny_gdf, tiny_climate):
+      "Back-to-back models over the same file and window reuse the loaded field"
+      models = [EnergyModel(gdf=tiny_gdf.copy(), climate_parquet=tiny_climate, climate_start="2020-01-01",
+                            climate_end="2020-01-02", collect_agent_level=False) for _ in range(2)]
+      assert models[0].climate is models[1].climate
+
+"""Tests for inverse-distance weights"""
+def test_idw_weights(tiny_climate):
+      "Rows are convex weights over the k nearest points; k=1 and on-grid houses reduce to nearest"
+      field = ClimateField(tiny_climate)
+      rng = np.random.default_rng(0)
+      lats = rng.uniform(54.9, 55.1, 50).astype(np.float32)
+      lons = rng.uniform(-1.8, -1.4, 50).astype(np.float32)
+      w = field.idw_weights(lats, lons, k=4)
+      assert w.shape == (50, len(field.points)) and w.nnz == 200
+      np.testing.assert_allclose(np.asarray(w.sum(axis=1)).ravel(), 1.0)
+      vec = field.temps_at_index(5)
+      interp = w @ vec
+      lo, hi = vec[w.indices.reshape(50, 4)].min(axis=1), vec[w.indices.reshape(50, 4)].max(axis=1)
+      assert np.all((interp >= lo - 1e-6) & (interp <= hi + 1e-6))
+      nearest = field.map_households(lats, lons)
+      np.testing.assert_array_equal(field.idw_weights(lats, lons, k=1) @ vec, vec[nearest])
+      on_grid = field.idw_weights(field.points[:3, 0], field.points[:3, 1])
+      np.testing.assert_allclose(on_grid @ vec, vec[:3])
+
+"""Tests for climate over steps other than one hour"""
+def test_temps_for_step(tiny_climate):
+      "Hourly steps return the row, shorter steps interpolate, longer steps average"
+      field = ClimateField(tiny_climate)
+      np.testing.assert_array_equal(field.temps_for_step(5), field.temps_at_index(5))
+      np.testing.assert_allclose(field.temps_for_step(5.25, 0.25),
+                                 0.75 * field.temps[5] + 0.25 * field.temps[6], rtol=1e-6)
+      np.testing.assert_allclose(field.temps_for_step(6, 3), field.temps[6:9].mean(axis=0), rtol=1e-6)
+      last = len(field.times) - 1
+      np.testing.assert_allclose(field.temps_for_step(last, 3), field.temps[last], rtol=1e-6)
+      assert field.temps_for_step(last + 1) is None
+      assert field.temps_for_step(-1) is None
+
+"""Tests for the streaming validator"""
+@pytest.mark.parametrize("allow_duplicates", [True, False])
+def test_streaming_validator_matches(tiny_climate, tmp_path, allow_duplicates):
+      "Batch scanning reports the same summary as the pandas check, for clean and broken grids"
+      df = pd.read_parquet(tiny_climate)
+      broken = pd.concat([df.drop(index=[7, 500, 501]), df.iloc[[3, 3, 900]]]).sample(frac=1, random_state=0)
+      broken_path = str(tmp_path / "broken.parquet")
+      broken.to_parquet(broken_path, row_group_size=1000)
+      for path, rectangular in [(tiny_climate, True), (broken_path, False)]:
+            expected = ClimateField.validate_parquet(path, verbose=False, return_summary=True,
+                                                     allow_duplicates=allow_duplicates)
+            streamed = ClimateField.validate_parquet(path, verbose=False, return_summary=True, streaming=True,
+                                                     allow_duplicates=allow_duplicates, batch_size=700)
+            assert streamed == expected
+            assert streamed["rectangular"] is rectangular
+
+def test_streaming_validator_scattered_points(tmp_path):
+      "Points off a regular grid are counted as they occur, not as the lat × lon product"
+      rng = np.random.default_rng(0)
+      n, T = 4000, 8
+      lat, lon = rng.uniform(50, 55, n), rng.uniform(-3, 1, n)
+      times = pd.date_range("2020-01-01", periods=T, freq="h", tz="UTC")
+      df = pd.DataFrame({"timestamp": np.repeat(times, n), "latitude": np.tile(lat, T),
+                         "longitude": np.tile(lon, T), "temp_C": rng.normal(5, 3, n * T)})
+      df = pd.concat([df, df.iloc[[0, n + 1, n * T - 1]]]).sample(frac=1, random_state=1)
+      path = str(tmp_path / "scattered.parquet")
+      df.to_parquet(path, row_group_size=5000)
+      tracemalloc.start()
+      rows, dupes, per_ts, points = ClimateField._scan_grid_counts(path, batch_size=3000)
+      peak = tracemalloc.get_traced_memory()[1]
+      tracemalloc.stop()
+      assert (rows, dupes, points) == (n * T, 3, n)
+      assert (per_ts == n).all() and len(per_ts) == T
+      assert peak < T * n * n // 8 // 4  # far below a lat × lon bitmap (16 MB here)
+      expected = ClimateField.validate_parquet(path, verbose=False, return_summary=True)
+      assert ClimateField.validate_parquet(path, verbose=False, return_summary=True, streaming=True,
+                                           batch_size=3000) == expected
+
+"""Tests for climate-model variants"""
+def test_variants_share_base(tiny_climate):
+      "Variants perturb temps as they are read and share the base arrays"
+      base = ClimateField(tiny_climate)
+      warm = base.variant("add", 1.5)
+      cold = warm.variant("subtract", 2)
+      extreme = base.variant("extreme", 1)
+      assert warm.temps is base.temps and cold.temps is base.temps and extreme._tree is base._tree
+      assert base.variant("base") is base and warm.variant("add", 0) is base
+      row = base.temps_at_index(30)
+      np.testing.assert_allclose(warm.temps_at_index(30), row + 1.5, rtol=1e-6)
+      np.testing.assert_allclose(cold.temps_for_step(30), row - 2, rtol=1e-6)
+      np.testing.assert_allclose(warm.temps_for_step(30, 3), base.temps_for_step(30, 3) + 1.5, rtol=1e-6)
+      mean = base.temps.mean(axis=0)  # the whole file is loaded, so its mean is the reference
+      np.testing.assert_allclose(np.abs(extreme.temps_at_index(30) - mean), np.abs(row - mean) + 1, rtol=1e-5)
+      with pytest.raises(ValueError):
+            base.variant("double", 2)
+
+@pytest.mark.parametrize("cache", [True, False])
+def test_extreme_reference_is_the_whole_file(tiny_climate, cache):
+      "Extreme hours are pushed away from each point's mean over the file, whatever window is loaded"
+      full = ClimateField(tiny_climate, cache=False)
+      bbox = (54.95, -1.75, 55.2, -1.45)
+      field = ClimateField(tiny_climate, start="2020-01-03", end="2020-01-04", bbox=bbox, cache=cache)
+      keep = ((full.points[:, 0] >= bbox[0]) & (full.points[:, 0] <= bbox[2])
+              & (full.points[:, 1] >= bbox[1]) & (full.points[:, 1] <= bbox[3]))
+      np.testing.assert_allclose(field.point_mean(), full.temps[:, keep].mean(axis=0), rtol=1e-6)
+      assert not np.allclose(field.point_mean(), field.temps.mean(axis=0), rtol=1e-3)
+      t0 = full.time_index_for("2020-01-03")
+      for t in range(24):
+            np.testing.assert_array_equal(field.variant("extreme", 2).temps_at_index(t),
+                                          full.variant("extreme", 2).temps_at_index(t0 + t)[keep])
+
+def test_climate_source(db_scenario):
+      "A scenario's ClimateModel picks the base data and variation; none means the default data"
+      from digitalTwin import db
+      from digitalTwin.config import Config
+      from digitalTwin.models import models
+      from digitalTwin.modelling import energyABM
+      assert energyABM.climateSource(db_scenario) == (Config.CLIMATE_DATA, None)
+      climate_model = models.ClimateModel(model_name="warm", user_name="Foo", base_data="ncc_2t_timeseries",
+                                          temp_var_Type="add", temp_scale=1.5)
+      db.session.add(climate_model)
+      db.session.commit()
+      db_scenario.climate_model_id = climate_model.id
+      assert energyABM.climateSource(db_scenario) == (Config.CLIMATE_DATA, ("add", 1.5))
+
+def test_ensemble_models_share_climate(tiny_gdf, tiny_climate):
+      "Models over several variants of one climate share its temps and respond to the variation"
+      energy = {}
+      for transform in [("base", 0), ("add", 3), ("subtract", 3)]:
+            random.seed(1)
+            model = EnergyModel(gdf=tiny_gdf.copy(), climate_parquet=tiny_climate, climate_start="2020-01-01",
+                                climate_end="2020-01-02", climate_transform=transform, engine="array",
+                                collect_agent_level=False)
+            for _ in range(24):
+                  model.step()
+            energy[transform[0]] = (model.cumulative_energy, model.climate.temps)
+      assert energy["add"][1] is energy["base"][1] is energy["subtract"][1]
+      assert energy["add"][0] < energy["base"][0] < energy["subtract"][0]
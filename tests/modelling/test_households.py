@@ -0,0 +1,98 @@
+from digitalTwin.modelling.agent import HOUSEHOLD_STATIC_ATTRS, HouseholdAgent, PersonAgent
+from digitalTwin.modelling.households import household_params
+from digitalTwin.modelling.model import EnergyModel
+import math
+import numpy as np
+import pytest
+
+# HouseholdAgent keyword arguments read straight from the gdf column of the same name
+KWARGS = ["floor_area_m2", "property_age", "main_fuel_type", "main_heating_system", "retrofit_envelope_score",
+          "imd_decile", "heating_controls", "meter_type", "cwi_flag", "swi_flag", "loft_ins_flag",
+          "floor_ins_flag", "glazing_flag", "is_electric_heating", "is_gas", "is_oil", "is_solid_fuel",
+          "is_off_gas", "is_heatpump_candidate", "heatpump_candidate_class", "hidp", "hh_n_people",
+          "hh_children", "hh_income", "hh_income_band", "hh_edu_detail", "dwelling_bucket", "tenure",
+          "size_band", "schedule_type"]
+# per-tick state the model sets after construction
+TICK_STATE = {"residents", "clim_idx", "occupancy_count", "has_calibrated_energy"}
+
+@pytest.fixture(scope="module")
+def messy_gdf(tiny_gdf):
+      "The test households with missing, blank and oddly typed values mixed in"
+      gdf = tiny_gdf.copy()
+      n = len(gdf)
+      rng = np.random.default_rng(5)
+      gdf["floor_area_m2"] = gdf["floor_area_m2"].astype(object)
+      gdf.loc[gdf.index[:10], "floor_area_m2"] = None # None and NaN areas are treated apart
+      gdf["retrofit_envelope_score"] = np.where(rng.random(n) < 0.2, np.nan, gdf["retrofit_envelope_score"])
+      gdf["size_band"] = np.where(rng.random(n) < 0.3, np.nan, gdf["size_band"])
+      gdf["hidp"] = rng.choice(["", " h1 ", None, "77"], n)
+      gdf["hh_children"] = rng.choice([True, False, None, "yes"], n)
+      gdf["hh_income"] = rng.choice(["", "123.5", None, 99], n)
+      gdf["tenure"] = rng.choice(["", "owner", None], n)
+      gdf["cwi_flag"] = rng.choice([1.0, 0.0, np.nan], n)
+      gdf["imd_decile"] = rng.integers(1, 10, n)
+      gdf["main_heating_system"] = gdf["main_heating_system"].where(rng.random(n) > 0.2, None)
+      return gdf
+
+@pytest.fixture(scope="module")
+def config_path(tmp_path_factory):
+      path = tmp_path_factory.mktemp("households") / "config.yaml"
+      path.write_text("households:\n  bedroom_multiplier: {1: 0.8, 2: 0.9, 3: 1.0, 4: 1.2}\n"
+                      "systems:\n  heat_pump: {heating_slope_mult: 0.7}\n  gas_boiler: {heating_slope_mult: 1.05}\n")
+      return str(path)
+
+def same(a, b):
+      if isinstance(a, float) and isinstance(b, float):
+            return (math.isnan(a) and math.isnan(b)) or a == pytest.approx(b, rel=1e-12)
+      return type(a) is type(b) and a == b
+
+"""Tests for the column-wise household construction"""
+def test_bulk_households_match_constructor(messy_gdf, tiny_climate, config_path):
+      "Every static attribute and derived parameter equals what HouseholdAgent.__init__ gives"
+      model = EnergyModel(gdf=messy_gdf.copy(), climate_parquet=tiny_climate, climate_start="2020-01-01",
+                          config_path=config_path, seed=1)
+      for (_, row), house in zip(messy_gdf.iterrows(), model.household_agents):
+            built = HouseholdAgent(unique_id=str(row["UPRN"]), model=model, geometry=row["geometry"],
+                                   property_type=row["property_type"], sap_rating=row["sap_rating"],
+                                   annual_energy_kwh=row["energy_cal_kwh"], crs=messy_gdf.crs,
+                                   **{k: row.get(k) for k in KWARGS})
+            built.heat_slope_kWh_per_deg = built._compute_heat_slope(model.heating_slope_kWh_per_deg)
+            attrs = set(vars(built)) - TICK_STATE - {"geometry", "model", "crs", "_crs", "pos"}
+            for name in attrs:
+                  assert same(getattr(built, name), getattr(house, name)), name
+
+def test_household_params_follow_config(tiny_gdf, tiny_climate):
+      "Recomputing for a new config matches the per-agent methods"
+      model = EnergyModel(gdf=tiny_gdf.copy(), climate_parquet=tiny_climate, climate_start="2020-01-01",
+                          collect_agent_level=False, seed=1)
+      model.reconfigure(heating_slope_kWh_per_deg=0.08, base_heat_capacity=10.0, baseline_anchor_kwh_per_hour=0.5)
+      derived = household_params(model.household_table, model)
+      for i, h in enumerate(model.household_agents):
+            assert derived["_hourly_base_kwh"][i] == pytest.approx(h._compute_hourly_base_kwh(), rel=1e-12)
+            assert derived["heat_slope_kWh_per_deg"][i] == pytest.approx(
+                  h._compute_heat_slope(model.heating_slope_kWh_per_deg), rel=1e-12)
+            assert derived["heat_capacity_kWh_per_hour"][i] == pytest.approx(h._compute_heat_capacity(), rel=1e-12)
+            assert h.heat_slope_kWh_per_deg == derived["heat_slope_kWh_per_deg"][i]
+
+def test_compact_agents_keep_static_attributes_in_tables(tiny_gdf, tiny_climate):
+      "Compact agents store only per-tick state; the tables hold every static attribute"
+      model = EnergyModel(gdf=tiny_gdf.copy(), climate_parquet=tiny_climate, climate_start="2020-01-01", seed=3)
+      assert set(model.household_table.columns) == {"unique_id", *HOUSEHOLD_STATIC_ATTRS}
+      house = model.household_agents[0]
+      assert set(vars(house)) == {"model", "unique_id", "pos", "geometry", "_crs"}
+      assert not set(HOUSEHOLD_STATIC_ATTRS) & set(vars(house))
+      assert house.clim_idx is not None and house.residents
+      house.has_heatpump = True
+      assert model.household_table["has_heatpump"][0]
+      house.sap_rating = 55.5 # a value the typed column cannot hold widens it
+      assert house.sap_rating == 55.5 and model.household_table["sap_rating"][1] == model.household_agents[1].sap_rating
+
+def test_compact_residents_match_constructor(tiny_gdf, tiny_climate):
+      "Resident hour tables and spikes equal what PersonAgent.__init__ gives"
+      model = EnergyModel(gdf=tiny_gdf.copy(), climate_parquet=tiny_climate, climate_start="2020-01-01", seed=3)
+      for p in model.person_agents:
+            built = PersonAgent(unique_id=p.unique_id, model=model, home=p.home, schedule_profile=p.schedule_profile,
+                                leave_hour=p.leave_hour, return_hour=p.return_hour, wealth=p.wealth, sap=p.sap)
+            assert list(p.presence_by_hour) == built.presence_by_hour
+            assert list(p.energy_by_hour) == built.energy_by_hour
+            assert p._home_spike_kwh() == built._home_spike_kwh()
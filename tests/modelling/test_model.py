@@ -0,0 +1,90 @@
+from digitalTwin.modelling.model import EnergyModel
+import numpy as np
+import pytest
+
+@pytest.fixture(scope="module")
+def model(tiny_gdf, tiny_climate):
+      return EnergyModel(gdf=tiny_gdf.copy(), climate_parquet=tiny_climate, climate_start="2020-01-01")
+
+"""Tests for the precomputed occupancy tables"""
+def test_presence_by_hour(model):
+      "Residents are away from leave_hour up to (not including) return_hour"
+      for p in model.person_agents:
+            if p.leave_hour is None or p.return_hour is None:
+                  assert all(p.presence_by_hour)
+            else:
+                  assert not p.presence_by_hour[p.leave_hour]
+                  assert p.presence_by_hour[p.return_hour]
+
+def test_occupancy_tables(model):
+      "Household tables are the per-hour sums over that household's residents"
+      for i, h in enumerate(model.household_agents):
+            occ = np.sum([p.presence_by_hour for p in h.residents], axis=0) if h.residents else np.zeros(24)
+            spike = np.sum([p.energy_by_hour for p in h.residents], axis=0) if h.residents else np.zeros(24)
+            np.testing.assert_array_equal(model.occupancy_by_hour[i], occ)
+            np.testing.assert_allclose(model.spike_kwh_by_hour[i], spike)
+      total = model.energy_by_wealth_by_hour.sum(axis=1)
+      np.testing.assert_allclose(total, model.spike_kwh_by_hour.sum(axis=0))
+
+"""Tests for seeded runs"""
+def _seeded_run(gdf, climate, seed):
+      "Residents' draws and two days of model-level series for one seed"
+      model = EnergyModel(gdf=gdf, climate_parquet=climate, climate_start="2020-01-01", seed=seed)
+      for _ in range(48):
+            model.step()
+      people = [(p.schedule_profile, p.leave_hour, p.return_hour, p.wealth) for p in model.person_agents]
+      return people, model.model_dc.get_model_vars_dataframe()
+
+def test_seed_reproduces_run(tiny_gdf, tiny_climate):
+      "The same seed gives identical residents and series, another seed different ones"
+      people, series = _seeded_run(tiny_gdf.copy(), tiny_climate, 11)
+      again_people, again = _seeded_run(tiny_gdf.copy(), tiny_climate, 11)
+      other_people, _ = _seeded_run(tiny_gdf.copy(), tiny_climate, 12)
+      assert people == again_people
+      assert people != other_people
+      assert series.equals(again)
+
+def test_seed_reproduces_run_across_processes(tiny_gdf, tiny_climate):
+      "A run in a fresh interpreter is bit-identical to the same seed's run here"
+      import multiprocessing as mp
+      from concurrent.futures import ProcessPoolExecutor
+      with ProcessPoolExecutor(max_workers=1, mp_context=mp.get_context("spawn")) as pool:
+            people, series = pool.submit(_seeded_run, tiny_gdf.copy(), tiny_climate, 11).result()
+      local_people, local = _seeded_run(tiny_gdf.copy(), tiny_climate, 11)
+      assert people == local_people
+      assert series.equals(local)
+
+def test_seed_from_config(tiny_gdf, tiny_climate, tmp_path):
+      "Without a seed argument the config's model.seed is used"
+      config = tmp_path / "seeded.yaml"
+      config.write_text("model:\n  seed: 11\n")
+      model = EnergyModel(gdf=tiny_gdf.copy(), climate_parquet=tiny_climate, climate_start="2020-01-01",
+                          config_path=str(config))
+      assert model.seed == 11
+
+"""Tests for headless models"""
+def test_headless_matches_interactive(tiny_gdf, tiny_climate):
+      "Coordinates from the gdf map the climate and step exactly as agent geometries do"
+      from shapely.geometry import Point, Polygon
+      gdf = tiny_gdf.copy()
+      geometry = gdf.geometry.copy()
+      geometry.iloc[0] = None
+      geometry.iloc[1] = Point()
+      geometry.iloc[2] = geometry.iloc[2].buffer(0.01) # a polygon, placed at its centroid
+      x, y = geometry.iloc[3].x, geometry.iloc[3].y
+      geometry.iloc[3] = Polygon([(x, y), (x + 0.01, y), (x + 0.02, y)]) # no area: a representative point
+      gdf = gdf.set_geometry(geometry)
+      series = []
+      for headless in (False, True):
+            model = EnergyModel(gdf=gdf.copy(), climate_parquet=tiny_climate, climate_start="2020-01-01",
+                                engine="array", seed=4, headless=headless)
+            for _ in range(24):
+                  model.step()
+            series.append((model.household_x, model.household_y, [h.clim_idx for h in model.household_agents],
+                           model.model_dc.get_model_vars_dataframe()))
+      (x0, y0, idx0, df0), (x1, y1, idx1, df1) = series
+      assert model.space is None and model.household_agents[2].geometry is None
+      np.testing.assert_array_equal(x0, x1)
+      np.testing.assert_array_equal(y0, y1)
+      assert idx0 == idx1 and idx0[0] is None and idx0[2] is not None
+      assert df0.equals(df1)
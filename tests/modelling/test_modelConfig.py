@@ -0,0 +1,61 @@
+from digitalTwin.modelling.agent import PROPERTY_TYPE_MULT_BASE, PROPERTY_TYPE_MULT_HEAT
+from digitalTwin.modelling.modelConfig import MODEL_SCALARS, ModelConfig, load_config
+import dataclasses
+import os
+import pickle
+import pytest
+
+"""Tests for the cached config loader and its typed parameters"""
+def test_load_config_parses_once_and_copies(tmp_path):
+      "Repeat loads share the frozen params but never the raw dicts"
+      path = tmp_path / "config.yaml"
+      path.write_text("model:\n  heating_setpoint_C: 20\n")
+      first, second = load_config(path), load_config(path)
+      assert first.params is second.params
+      assert first.raw == second.raw and first.model is not second.model
+      first.model["heating_setpoint_C"] = 99.0
+      assert load_config(path).model["heating_setpoint_C"] == 20
+      assert type(first.params.heating_setpoint_C) is float
+      with pytest.raises(dataclasses.FrozenInstanceError):
+            first.params.heating_setpoint_C = 1.0
+      with pytest.raises(TypeError):
+            first.params.pt_heat_mult["detached"] = 1.0
+
+def test_load_config_rereads_edited_file(tmp_path):
+      "A new mtime on the override is loaded again"
+      path = tmp_path / "config.yaml"
+      path.write_text("model:\n  heating_setpoint_C: 20\n")
+      assert load_config(path).params.heating_setpoint_C == 20.0
+      path.write_text("model:\n  heating_setpoint_C: 21\n")
+      stat = path.stat()
+      os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+      assert load_config(path).params.heating_setpoint_C == 21.0
+
+def test_params_tables_match_config(tmp_path):
+      "The lookup tables give what the nested config lookups give"
+      path = tmp_path / "config.yaml"
+      path.write_text("model:\n  pt_heat_mult: {default: 0.5, detached house: 2.0}\n"
+                      "households:\n  bedroom_multiplier: {1: 0.8, 2: bad}\n"
+                      "systems:\n  gas_boiler: {heating_slope_mult: 1.05}\n")
+      cfg = load_config(path)
+      heat_cfg = cfg.model["pt_heat_mult"]
+      base_cfg = cfg.model["property_type_mult_base"]
+      p = cfg.params
+      for ptype in [*PROPERTY_TYPE_MULT_HEAT, "unknown"]:
+            assert p.pt_heat_mult.get(ptype, p.pt_heat_default) == heat_cfg.get(
+                  ptype, heat_cfg.get("default", PROPERTY_TYPE_MULT_HEAT.get(ptype, 1.0)))
+            assert p.pt_capacity_mult.get(ptype, p.pt_heat_default) == heat_cfg.get(ptype, heat_cfg.get("default", 1.0))
+            assert p.pt_base_mult.get(ptype, 1.0) == base_cfg.get(ptype, PROPERTY_TYPE_MULT_BASE.get(ptype, 1.0))
+      assert dict(p.bedroom_mult) == {1: 0.8, 3: 1.15, 4: 1.30}
+      assert p.system_slope_mult["gas_boiler"] == 1.05 and p.system_slope_mult["heat_pump"] == 0.70
+      assert p.baseline_area_clip == (0.85, 1.25)
+
+def test_config_pickles_and_rederives_params():
+      "Unpickled and rebuilt configs carry params for their own raw dict"
+      cfg = load_config()
+      copy = pickle.loads(pickle.dumps(cfg))
+      assert copy.raw == cfg.raw and copy.params == cfg.params
+      changed = ModelConfig(raw={**cfg.raw, "model": {**cfg.model, "heat_slope_max": 0.2}})
+      assert changed.params.heat_slope_max == 0.2
+      assert {name: getattr(changed.params, name) for name in MODEL_SCALARS if name != "heat_slope_max"} == \
+             {name: getattr(cfg.params, name) for name in MODEL_SCALARS if name != "heat_slope_max"}
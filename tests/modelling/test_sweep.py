@@ -0,0 +1,69 @@
+from digitalTwin.modelling.model import EnergyModel
+from digitalTwin.modelling.sweep import parameter_grid, run_sweep
+import numpy as np
+import pickle
+import pytest
+import random
+import yaml
+
+POINT = dict(heating_setpoint_C=20.0, heating_slope_kWh_per_deg=0.08, heatpump_adoption_rate=0.5,
+             energy_per_person_home=0.1, loss_to_duty_k=2.0)
+
+def build(tiny_gdf, tiny_climate, **kwargs):
+      random.seed(1)
+      return EnergyModel(gdf=tiny_gdf.copy(), climate_parquet=tiny_climate, climate_start="2020-01-01",
+                         collect_agent_level=False, **kwargs)
+
+def run(model, n=30):
+      for _ in range(n):
+            model.step()
+      df = model.model_dc.get_model_vars_dataframe()
+      return df.select_dtypes("number")
+
+"""Tests for reconfiguring a built model"""
+@pytest.mark.parametrize("engine", ["agents", "array"])
+def test_reconfigure_matches_fresh_build(tiny_gdf, tiny_climate, tmp_path, engine):
+      "A stepped, pickled and reconfigured model steps exactly as one built with those values"
+      config_path = tmp_path / "override.yaml"
+      config_path.write_text(yaml.safe_dump({"model": POINT}))
+      fresh = run(build(tiny_gdf, tiny_climate, engine=engine, config_path=str(config_path)))
+
+      model = build(tiny_gdf, tiny_climate, engine=engine)
+      run(model, 10)
+      model = pickle.loads(pickle.dumps(model))
+      model.reconfigure(**POINT)
+      assert model.current_hour == 0 and model.cumulative_energy == 0
+      np.testing.assert_array_equal(run(model).to_numpy(), fresh.to_numpy())
+
+def test_reconfigure_rejects_build_keys(tiny_gdf, tiny_climate):
+      "Keys fixed at build time, unknown keys and models recording agents are refused"
+      model = build(tiny_gdf, tiny_climate)
+      with pytest.raises(ValueError):
+            model.reconfigure(step_hours=3)
+      with pytest.raises(ValueError):
+            model.reconfigure(heating_setpoint=20)
+      with pytest.raises(ValueError):
+            EnergyModel(gdf=tiny_gdf.copy(), climate_parquet=tiny_climate).reconfigure(loss_to_duty_k=2.0)
+
+"""Tests for run_sweep"""
+def test_parameter_grid():
+      "Every combination, one dict each"
+      points = parameter_grid(a=[1, 2], b=["x", "y", "z"])
+      assert len(points) == 6 and points[0] == {"a": 1, "b": "x"} and points[-1] == {"a": 2, "b": "z"}
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_run_sweep(tiny_gdf, tiny_climate, workers):
+      "Each point's rows equal a model reconfigured to it; in-process sweeps leave the model as it was"
+      model = build(tiny_gdf, tiny_climate, engine="array")
+      points = [dict(heating_setpoint_C=17.0), dict(loss_to_duty_k=2.0), dict(heating_setpoint_C=20.0, loss_to_duty_k=4.0)]
+      table = run_sweep(model, points, n_steps=24, workers=workers)
+      assert len(table) == 3 * 25
+      assert list(table.columns[:4]) == ["point", "heating_setpoint_C", "loss_to_duty_k", "step"]
+      assert table.loc[table.point == 1, "heating_setpoint_C"].eq(18.5).all()  # default kept
+
+      reference = build(tiny_gdf, tiny_climate, engine="array")
+      reference.reconfigure(heating_setpoint_C=20.0, loss_to_duty_k=4.0)
+      expected = run(reference, 24)
+      rows = table[table.point == 2].reset_index(drop=True)
+      np.testing.assert_array_equal(rows[expected.columns].to_numpy(), expected.to_numpy())
+      assert model.heating_setpoint_C == 18.5 and model.loss_to_duty_k == 3.0
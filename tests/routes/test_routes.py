@@ -1,4 +1,5 @@
 import pytest
+from digitalTwin.library import jobQueue
 
 """Test 404"""
 def test_nonexistent_route(client):
@@ -31,10 +32,18 @@ def test_status_code_help(client):
     response = client.get('/help')
     assert response.status_code == 200
 
-def test_status_code_queue(client):
-    response = client.get('/queue')
+def test_status_code_queue(db_client):
+    response = db_client.get('/queue')
     assert response.status_code == 200
 
+def test_queue_lists_jobs(db_client, db_scenario):
+    jobQueue.enqueue("example")
+    response = db_client.get('/queue')
+    assert b"example" in response.data
+    status = db_client.get('/check_status/example').get_json()
+    assert status["status"] == "queued"
+    assert status["logs"]
+
 def test_status_code_report(client):
     response = client.get('/reports')
     assert response.status_code == 200
@@ -0,0 +1,23 @@
+import migrateDB
+import sqlite3
+
+"""Tests for migrateDB"""
+def test_migrate_old_schema():
+      "Check an old-schema agent_time_series keeps its rows and gains REAL columns and composite indexes"
+      conn = sqlite3.connect(":memory:")
+      conn.executescript('''
+            CREATE TABLE scenario (id INTEGER PRIMARY KEY);
+            CREATE TABLE agent_time_series (id INTEGER PRIMARY KEY, scenario_id INTEGER REFERENCES scenario(id),
+                  energy INTEGER, energy_consumption INTEGER, step INTEGER, "Agent_id" INTEGER);
+            CREATE INDEX ix_agent_time_series_scenario_id ON agent_time_series (scenario_id);
+            INSERT INTO scenario VALUES (1);
+            INSERT INTO agent_time_series VALUES (1, 1, 0, 1.5, 0, 42), (2, 1, 0, 2, 1, 42);
+      ''')
+      migrateDB.migrate(conn)
+
+      indexes = {row[1] for row in conn.execute("PRAGMA index_list(agent_time_series)")}
+      assert "ix_agent_time_series_scenario_step_agent" in indexes
+      assert "ix_agent_time_series_scenario_energy" in indexes
+      assert "ix_agent_time_series_scenario_id" not in indexes
+      rows = conn.execute("SELECT energy_consumption, typeof(energy_consumption) FROM agent_time_series ORDER BY id").fetchall()
+      assert rows == [(1.5, "real"), (2.0, "real")]